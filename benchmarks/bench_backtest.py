@@ -0,0 +1,62 @@
+"""
+Benchmark: backtesting engine (smart_currency.backtest)
+
+Fills a temporary history store with ten years of daily rates for every
+country profile (same layout as bench_history.py) and times a backtest of
+all countries, loading included, on the NumPy and pure-Python paths.
+
+Usage:
+    python benchmarks/bench_backtest.py [years]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_history import fill  # noqa: E402
+from smart_currency.backtest import backtest_all, monthly_schedule  # noqa: E402
+from smart_currency.calculator import HAS_NUMPY  # noqa: E402
+from smart_currency.history import HistoryStore  # noqa: E402
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    directory = tempfile.mkdtemp(prefix="rate-backtest-")
+    try:
+        days = fill(directory, years)
+        end = date.today() - timedelta(days=1)
+        start = end - timedelta(days=days - 1)
+        schedule = monthly_schedule(500.0, start, end, day=15)
+        print(f"{years} years x {days:,} days, 500 EUR on the 15th of every month")
+
+        totals = {}
+        for use_numpy in ((True, False) if HAS_NUMPY else (False,)):
+            store = HistoryStore(directory)   # холодный старт: загрузка рядов входит в замер
+            begin = time.perf_counter()
+            results = backtest_all(schedule, start, end, store=store, use_numpy=use_numpy)
+            elapsed = time.perf_counter() - begin
+            label = "NumPy" if use_numpy else "pure Python"
+            print(f"{label:>11}: {len(results)} countries in {elapsed * 1000:.0f} ms")
+            totals[use_numpy] = {c: r.losses for c, r in results.items()}
+
+        if len(totals) == 2:
+            worst = max(abs(totals[True][c][k] - totals[False][c][k])
+                        for c in totals[True] for k in totals[True][c])
+            print(f"NumPy vs pure Python: max total-loss difference {worst:.2e}")
+
+        summary = results["georgia"].summary()
+        print(f"georgia: spent {summary['spent_eur']:,.0f} EUR, best fixed method {summary['best_method']}")
+        for key, loss in summary["loss"].items():
+            print(f"  {key:>8}: loss {loss:10,.2f} ({summary['loss_pct'][key]:.2f}%)"
+                  + (f", wins {summary['wins'][key]} days" if key in summary["wins"] else ""))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: BatchCalculator vs scalar Calculator loop
+
+Scores N card transactions with both engines, checks that the numbers are
+identical and prints throughput (best of REPEAT runs after a warm-up).
+
+Usage:
+    python benchmarks/bench_batch.py [N]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.calculator import BatchCalculator, Calculator, HAS_NUMPY  # noqa: E402
+
+RATES = dict(nbg_rate=3.1566, direct_rate=3.02, eur_usd=1.1753, usd_gel=2.672,
+             street_rate=3.138, ibt_fee=1.5, atm_fee_pct=1.5, atm_fee_fix=1.0)
+REPEAT = 5
+
+
+def scalar_loop(amounts):
+    """The per-transaction path calculate() uses today"""
+    r = RATES
+    out = []
+    for a in amounts:
+        nbg = Calculator.calc_nbg_reference(a, r["nbg_rate"])
+        direct = Calculator.calc_direct(a, r["direct_rate"])
+        transfer = Calculator.calc_transfer(a, r["ibt_fee"], r["eur_usd"], r["usd_gel"])
+        cash = Calculator.calc_cash(a, r["atm_fee_pct"], r["atm_fee_fix"], r["street_rate"])
+        out.append((nbg, direct, transfer, cash,
+                    Calculator.calc_loss_percent(direct, nbg),
+                    Calculator.calc_loss_percent(transfer, nbg),
+                    Calculator.calc_loss_percent(cash, nbg)))
+    return out
+
+
+def check_identical(scalar, columns):
+    keys = ("nbg", "direct", "transfer", "cash", "direct_loss", "transfer_loss", "cash_loss")
+    for i, row in enumerate(scalar):
+        for j, key in enumerate(keys):
+            if float(columns[key][i]) != row[j]:
+                raise AssertionError(f"Mismatch at row {i}, column {key}: {columns[key][i]!r} != {row[j]!r}")
+
+
+def timed(fn, *args, repeat=REPEAT):
+    """Best of ``repeat`` runs after one untimed warm-up (lazy NumPy import, caches)"""
+    result = fn(*args)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    # Includes amounts below the ATM fixed fee (cash == 0 branch)
+    amounts = [round(rng.uniform(0.1, 2000.0), 2) for _ in range(n)]
+    amounts[:3] = [0.5, 1.0, 1.01]
+
+    scalar, t_scalar = timed(scalar_loop, amounts)
+    print(f"Transactions: {n:,}")
+    print(f"{'scalar loop':<22} {t_scalar * 1000:9.1f} ms  {n / t_scalar:14,.0f} rows/s")
+
+    engines = [("batch (pure Python)", BatchCalculator(use_numpy=False))]
+    if HAS_NUMPY:
+        engines.append(("batch (NumPy)", BatchCalculator(use_numpy=True)))
+    else:
+        print("NumPy not installed - skipping vectorized engine")
+
+    for label, engine in engines:
+        columns, elapsed = timed(lambda: engine.evaluate(amounts, **RATES))
+        check_identical(scalar, columns)
+        print(f"{label:<22} {elapsed * 1000:9.1f} ms  {n / elapsed:14,.0f} rows/s"
+              f"  x{t_scalar / elapsed:.1f}  (identical)")
+
+
+if __name__ == "__main__":
+    main()
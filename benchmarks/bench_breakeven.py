@@ -0,0 +1,50 @@
+"""
+Benchmark: closed-form break-even solver (smart_currency.breakeven)
+
+Checks solve_breakeven() ranges against Calculator.compare on random rates
+and amounts for every country profile, then times one solve.
+
+Usage:
+    python benchmarks/bench_breakeven.py [checks]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.breakeven import solve_breakeven, winner_for  # noqa: E402
+from smart_currency.calculator import Calculator  # noqa: E402
+from smart_currency.profiles import COUNTRY_PROFILES, default_inputs  # noqa: E402
+
+
+def main():
+    checks = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(3)
+    mismatches = 0
+    for _ in range(checks):
+        inputs = default_inputs(rng.choice(list(COUNTRY_PROFILES)))
+        # Шевелим курсы и комиссии вокруг значений профиля
+        for key in ("direct_rate", "eur_usd", "usd_gel", "street_rate"):
+            inputs[key] *= rng.uniform(0.97, 1.03)
+        inputs["ibt_fee"] = rng.uniform(0, 3)
+        inputs["atm_fee_pct"] = rng.uniform(0, 3)
+        inputs["atm_fee_fix"] = rng.uniform(0, 10)
+        ranges = solve_breakeven(**inputs)["ranges"]
+        for amount in (rng.uniform(0.01, 20), rng.uniform(0.01, 5000)):
+            if winner_for(ranges, amount) != Calculator.compare(amount, **inputs)["winner"]:
+                mismatches += 1
+    print(f"{checks * 2:,} random amounts checked against Calculator.compare: {mismatches} mismatches")
+
+    inputs = default_inputs("georgia")
+    n = 100_000
+    per_call = timeit.timeit(lambda: solve_breakeven(**inputs), number=n) / n
+    print(f"solve_breakeven: {per_call * 1e6:.1f} us/call")
+    for lo, hi, key in solve_breakeven(**inputs)["ranges"]:
+        print(f"  {key:<9} ({lo:.2f}, {hi:.2f}]")
+
+
+if __name__ == "__main__":
+    main()
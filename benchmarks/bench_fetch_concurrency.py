@@ -0,0 +1,57 @@
+"""
+Benchmark: sequential vs concurrent RateFetcher.fetch_georgia_rates
+
+Runs against a local stub server with injected per-source delays.
+Sequential mode is the same code path with max_workers=1.
+
+Usage:
+    python benchmarks/bench_fetch_concurrency.py [rounds]
+"""
+
+import sys
+import tempfile
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency.fetchers import HttpCache, RateFetcher
+
+DELAYS = {"/nbg": 0.30, "/rico": 0.45, "/frankfurter": 0.20}
+
+
+def run(max_workers, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        rates = RateFetcher.fetch_georgia_rates(max_workers=max_workers)
+        timings.append(time.perf_counter() - start)
+        assert rates and {"EUR", "street_eur", "eur_usd"} <= set(rates), rates
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with StubRateServer(delays=DELAYS) as server, tempfile.TemporaryDirectory() as cache_dir:
+        server.point_rate_fetcher(RateFetcher)
+        # TTL 0 + empty cache: every round really goes to the network
+        RateFetcher.cache = HttpCache(cache_dir)
+        RateFetcher.CACHE_TTLS = {}
+        print("Injected delays: " + ", ".join(f"{k}={v * 1000:.0f} ms" for k, v in DELAYS.items()))
+        print(f"Sum of delays:     {sum(DELAYS.values()) * 1000:7.0f} ms")
+        print(f"Slowest source:    {max(DELAYS.values()) * 1000:7.0f} ms")
+        sequential = run(1, rounds)
+        concurrent = run(None, rounds)
+        print(f"Sequential median: {sequential * 1000:7.0f} ms")
+        print(f"Concurrent median: {concurrent * 1000:7.0f} ms  (x{sequential / concurrent:.2f})")
+
+        # Partial results: one source slower than its timeout, nothing cached
+        server.delays["/rico"] = 1.5
+        RateFetcher.cache = HttpCache(cache_dir + "/partial")
+        start = time.perf_counter()
+        rates = RateFetcher.fetch_georgia_rates(timeouts={"Rico": 0.5})
+        elapsed = time.perf_counter() - start
+        print(f"Rico timed out:    {elapsed * 1000:7.0f} ms  partial keys={sorted(rates or {})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: per-recalc cost of the results table and chart (needs a display)
+
+Times CurrencyCalculatorApp.calculate() and counts Tk widgets allocated per
+recalculation, once with the retained table (current code) and once with
+the old destroy-and-rebuild _update_results_table kept below as baseline.
+Also checks that the comparison-card Canvas keeps a constant item count.
+
+Usage:
+    python benchmarks/bench_gui_recalc.py [recalcs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import currency_calculator_standalone as app_module  # noqa: E402
+
+CREATED = [0]
+_original_init = tk.BaseWidget.__init__
+
+
+def _counting_init(self, *args, **kwargs):
+    CREATED[0] += 1
+    _original_init(self, *args, **kwargs)
+
+
+tk.BaseWidget.__init__ = _counting_init
+
+
+def legacy_update_results_table(self, winner_key):
+    """The pre-retained implementation: destroy everything, build ~20 widgets"""
+    for widget in self.results_container.winfo_children():
+        widget.destroy()
+
+    header = tk.Frame(self.results_container, bg=self.colors["bg_card"])
+    header.pack(fill="x", pady=(0, 5))
+    headers = ["Метод", f"Получите ({self.country['local_currency']})", "Потери (%)",
+               f"Потери ({self.country['local_currency']})"]
+    for i, h in enumerate(headers):
+        tk.Label(header, text=h, font=("Segoe UI", 10, "bold"), bg=self.colors["bg_card"],
+                 fg=self.colors["fg_secondary"], width=18 if i == 0 else 12).pack(side="left", padx=5, pady=8)
+
+    ref_row = tk.Frame(self.results_container, bg=self.colors["border"])
+    ref_row.pack(fill="x", pady=2)
+    for text in (f"🏛️ Эталон ({self.country['central_bank']})", f"{self.results['nbg']:.2f}", "0.00%", "—"):
+        tk.Label(ref_row, text=text, bg=self.colors["border"], fg=self.colors["fg_secondary"],
+                 width=12).pack(side="left", padx=5, pady=8)
+
+    for key in ["direct", "transfer", "cash"]:
+        data = self.results[key]
+        is_winner = (key == winner_key)
+        row_bg = self.colors["profit"] if is_winner else self.colors["bg_card"]
+        text_fg = "#000000" if is_winner else self.colors["fg"]
+        row = tk.Frame(self.results_container, bg=row_bg, highlightthickness=2 if is_winner else 0,
+                       highlightbackground=self.colors["profit"])
+        row.pack(fill="x", pady=2)
+        loss_gel = self.results["nbg"] - data["gel"]
+        for text in (data["name"], f"{data['gel']:.2f}", f"-{data['loss']:.2f}%", f"-{loss_gel:.2f}"):
+            tk.Label(row, text=text, bg=row_bg, fg=text_fg, width=12).pack(side="left", padx=5, pady=12)
+
+
+def measure(label, root, app, recalcs):
+    # Warm-up so one-time construction is not counted
+    app.calculate()
+    root.update_idletasks()
+    CREATED[0] = 0
+    start = time.perf_counter()
+    for i in range(recalcs):
+        app.amount_var.set(str(100 + i))
+        app.calculate()
+        root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / recalcs * 1000:7.2f} ms/recalc  "
+          f"{CREATED[0] / recalcs:6.1f} widgets allocated/recalc  "
+          f"{len(app.chart_canvas.find_all())} chart canvas items")
+
+
+def main():
+    recalcs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        settings_path = os.path.join(tmp, "settings.json")
+        original_init = app_module.SettingsManager.__init__
+
+        def temp_settings_init(self, filepath=settings_path, debounce=1.0):
+            original_init(self, filepath, debounce)
+
+        app_module.SettingsManager.__init__ = temp_settings_init
+
+        root = tk.Tk()
+        root.withdraw()
+        app = app_module.CurrencyCalculatorApp(root)
+
+        measure("retained table (current)", root, app, recalcs)
+        app._update_results_table = legacy_update_results_table.__get__(app)
+        measure("destroy-and-rebuild (old)", root, app, recalcs)
+
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: historical rate store (smart_currency.history)
+
+Fills a temporary store with years of daily rates for every country
+profile (several sources and rates each), then times cold loads, range
+queries and point lookups, and reports disk and column memory.
+
+Usage:
+    python benchmarks/bench_history.py [years] [queries]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.history import HistoryStore  # noqa: E402
+from smart_currency.profiles import COUNTRY_PROFILES  # noqa: E402
+
+SERIES = {"nbg": ("EUR", "USD"), "rico": ("street_eur", "credo_usd"), "frankfurter": ("eur_usd",),
+          "manual": ("direct_rate",)}
+START_VALUES = {"EUR": 3.15, "USD": 2.70, "street_eur": 3.14, "credo_usd": 2.69, "eur_usd": 1.16,
+                "direct_rate": 3.02}
+
+
+def fill(directory, years):
+    """Write the columns directly (as years of appends would leave them)"""
+    from array import array
+    start = date.today() - timedelta(days=365 * years)
+    days = array("i", range(start.toordinal(), date.today().toordinal()))
+    rng = random.Random(7)
+    for country in COUNTRY_PROFILES:
+        for source, rates in SERIES.items():
+            folder = os.path.join(directory, country, source)
+            os.makedirs(folder)
+            for rate in rates:
+                value, values = START_VALUES[rate], array("d")
+                for _ in days:
+                    value *= 1 + rng.gauss(0, 0.004)
+                    values.append(value)
+                with open(os.path.join(folder, rate + ".dates"), "wb") as f:
+                    f.write(days.tobytes())
+                with open(os.path.join(folder, rate + ".values"), "wb") as f:
+                    f.write(values.tobytes())
+    return len(days)
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    directory = tempfile.mkdtemp(prefix="rate-history-")
+    try:
+        days = fill(directory, years)
+        store = HistoryStore(directory)
+        keys = store.keys()
+        disk = sum(os.path.getsize(os.path.join(root, f))
+                   for root, _, files in os.walk(directory) for f in files)
+        print(f"{len(COUNTRY_PROFILES)} countries, {len(keys)} series x {days:,} days "
+              f"= {len(keys) * days:,} points, {disk / 2**20:.1f} MB on disk")
+
+        start = time.perf_counter()
+        for key in keys:
+            store.series(*key)
+        elapsed = time.perf_counter() - start
+        memory = sum(len(s) * (s.dates.itemsize + s.values.itemsize) for s in store._series.values())
+        print(f"Cold load of all series: {elapsed * 1000:.1f} ms, columns {memory / 2**20:.1f} MB in RAM")
+
+        rng = random.Random(1)
+        today = date.today()
+        points = 0
+        start = time.perf_counter()
+        for _ in range(queries):
+            series = store.series(*rng.choice(keys))
+            lo = today - timedelta(days=rng.randrange(days))
+            dates, values = series.range(lo, lo + timedelta(days=365))
+            points += len(values)
+        elapsed = time.perf_counter() - start
+        print(f"{queries:,} one-year range queries: {elapsed / queries * 1e6:.1f} us/query "
+              f"({points / queries:.0f} points each)")
+
+        start = time.perf_counter()
+        for country in COUNTRY_PROFILES:
+            for source, rates in SERIES.items():
+                for rate in rates:
+                    store.query(country, source, rate)
+        elapsed = time.perf_counter() - start
+        print(f"Full history of every series as (date, value) pairs: {elapsed * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            store.series(*rng.choice(keys)).at(today - timedelta(days=rng.randrange(days)))
+        print(f"{queries:,} point lookups: {(time.perf_counter() - start) / queries * 1e6:.1f} us each")
+
+        series = store.series(*keys[0])
+        start = time.perf_counter()
+        for i in range(1000):
+            series.append(today + timedelta(days=i), 3.0 + i / 1000)
+        print(f"Appends: {(time.perf_counter() - start) / 1000 * 1e6:.0f} us each")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: HttpCache under RateFetcher
+
+Runs repeated refreshes against the local stub server and prints the cache
+counters for each phase: cold cache, fresh hits, expired entries
+revalidated with ETag (304), and a dead server served from stale copies.
+Rico is stream-parsed and cut off once its rates are found; its partial
+entry has no validators, so an expired one is downloaded again (a miss,
+not a 304) - but only up to the rates.
+
+Usage:
+    python benchmarks/bench_http_cache.py [refreshes]
+"""
+
+import sys
+import tempfile
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency.fetchers import HttpCache, RateFetcher
+
+
+def phase(label, refreshes):
+    before = RateFetcher.cache.stats()
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        rates = RateFetcher.fetch_georgia_rates(timeouts={"NBG": 1, "Rico": 1, "Frankfurter": 1})
+        assert rates and "EUR" in rates, rates
+    elapsed = (time.perf_counter() - start) / refreshes
+    after = RateFetcher.cache.stats()
+    delta = {k: after[k] - before[k] for k in after}
+    print(f"{label:<24} {elapsed * 1000:7.1f} ms/refresh  {delta}")
+
+
+def main():
+    refreshes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as cache_dir:
+        RateFetcher.cache = HttpCache(cache_dir)
+        server = StubRateServer(delays={"/nbg": 0.05, "/rico": 0.05, "/frankfurter": 0.05})
+        with server:
+            server.point_rate_fetcher(RateFetcher)
+            phase("cold cache", 1)
+            phase("fresh (TTL)", refreshes)
+            RateFetcher.CACHE_TTLS = {}
+            phase("expired -> 304", refreshes)
+            print(f"stub server: hits={server.hits} 304={server.not_modified}")
+        phase("server down -> stale", refreshes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: import cost of the headless core vs the Tk GUI entry point
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters and
+reports the cumulative import time of each module (median of N runs) and
+whether tkinter / ctypes got pulled in.
+
+Usage:
+    python benchmarks/bench_import_time.py [runs]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    "smart_currency",
+    "smart_currency.calculator",
+    "smart_currency.settings",
+    "smart_currency.fetchers",
+    "currency_calculator_standalone",
+]
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module):
+    """Return (cumulative µs of module, set of all imported module names)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative = 0
+    names = set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        names.add(match.group(4))
+        if match.group(4) == module:
+            cumulative = int(match.group(2))
+    return cumulative, names
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'module':<34} {'cumulative':>11}  tkinter  ctypes")
+    for module in TARGETS:
+        samples = []
+        names = set()
+        for _ in range(runs):
+            us, names = import_profile(module)
+            samples.append(us)
+        median = sorted(samples)[len(samples) // 2]
+        print(f"{module:<34} {median / 1000:8.1f} ms  {'yes' if 'tkinter' in names else 'no':>7}"
+              f"  {'yes' if 'ctypes' in names else 'no':>6}")
+
+
+if __name__ == "__main__":
+    main()
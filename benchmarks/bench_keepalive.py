@@ -0,0 +1,96 @@
+"""
+Benchmark: keep-alive connection pooling (smart_currency.httpclient)
+
+Starts the stub rate server over TLS (self-signed certificate made with
+openssl) and runs repeated Georgia refreshes through RateFetcher with
+expired cache entries, so every refresh goes to the network:
+
+- "no pooling": HttpClient(pool_size=0), a new TCP + TLS handshake per
+  request - what urlopen() did,
+- "pooled": the default keep-alive pools.
+
+Then times single Frankfurter-sized requests: urlopen vs the pooled
+client. Reports latency, connections accepted by the server and the
+client counters.
+
+Usage:
+    python benchmarks/bench_keepalive.py [refreshes]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+
+from stub_server import StubRateServer, tls_contexts
+
+from smart_currency.fetchers import HttpCache, RateFetcher
+from smart_currency.history import HistoryStore
+from smart_currency.httpclient import HttpClient
+
+
+def refreshes(server, client, directory, count):
+    RateFetcher.cache = HttpCache(directory, client)
+    RateFetcher.CACHE_TTLS = {}
+    before = server.connections
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        rates = RateFetcher.fetch_georgia_rates(timeouts={"NBG": 5, "Rico": 5, "Frankfurter": 5})
+        times.append(time.perf_counter() - start)
+        assert rates and {"EUR", "street_eur", "eur_usd"} <= set(rates), rates
+    return statistics.median(times), server.connections - before
+
+
+def single_requests(fetch, count):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fetch()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    with tempfile.TemporaryDirectory(prefix="keepalive-") as directory:
+        server_ctx, client_ctx = tls_contexts(directory)
+        RateFetcher.history = HistoryStore(os.path.join(directory, "history"))
+        with StubRateServer(ssl_context=server_ctx) as server:
+            server.point_rate_fetcher(RateFetcher)
+            print(f"{count} refreshes x 3 sources over TLS ({server.base_url})")
+            results = {}
+            for label, pool_size in (("no pooling", 0), ("pooled", 4)):
+                client = HttpClient(pool_size=pool_size, ssl_context=client_ctx)
+                cache_dir = os.path.join(directory, f"cache-{pool_size}")
+                median, connections = refreshes(server, client, cache_dir, count)
+                results[label] = median
+                print(f"  {label:<12} {median * 1000:7.2f} ms/refresh  connections={connections:<4} "
+                      f"client={client.stats()}")
+                client.close()
+            print(f"  speed-up x{results['no pooling'] / results['pooled']:.2f}, "
+                  f"gzipped responses: {server.gzipped}")
+
+            url = server.url("/frankfurter")
+            opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=client_ctx))
+            client = HttpClient(ssl_context=client_ctx)
+
+            def via_urlopen():
+                with opener.open(url, timeout=5) as response:
+                    return response.read()
+
+            def via_pool():
+                return client.get(url, timeout=5).read()
+
+            assert via_urlopen() == via_pool()
+            plain = single_requests(via_urlopen, count * 3)
+            pooled = single_requests(via_pool, count * 3)
+            print(f"single Frankfurter GET: urlopen {plain * 1000:.2f} ms, pooled {pooled * 1000:.2f} ms "
+                  f"(x{plain / pooled:.1f})")
+            client.close()
+
+
+if __name__ == "__main__":
+    main()
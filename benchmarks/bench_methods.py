@@ -0,0 +1,83 @@
+"""
+Benchmark: compiled method registry (smart_currency.methods)
+
+Registers 50 methods and compares one compiled evaluation function per
+profile against evaluating each method's formula separately (eval of a
+pre-compiled code object per method, the obvious interpreter). Also
+shows the cost of the default three methods next to Calculator.compare.
+
+Usage:
+    python benchmarks/bench_methods.py [calls]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.calculator import Calculator  # noqa: E402
+from smart_currency.methods import DEFAULT_METHODS, ExchangeMethod, MethodRegistry, REGISTRY  # noqa: E402
+from smart_currency.profiles import default_inputs  # noqa: E402
+
+
+def make_methods(n):
+    """n synthetic banks: own rate, percentage fee and fixed fee each"""
+    methods = []
+    for i in range(n):
+        methods.append(ExchangeMethod(
+            f"bank{i}",
+            f"0.0 if amount <= fix{i} else (amount - fix{i}) / (1 + pct{i} / 100) * rate{i}",
+            name=f"Bank {i}",
+            inputs={f"rate{i}": ("Курс", 3.0 + i * 0.001),
+                    f"pct{i}": ("Комиссия (%)", 1.0 + (i % 7) * 0.1),
+                    f"fix{i}": ("Фикс. (EUR)", float(i % 4))}))
+    return methods
+
+
+def interpreted(methods, amount, inputs):
+    """Evaluate each formula on its own, then pick the winner"""
+    env = dict(inputs, amount=amount)
+    nbg = amount * inputs["nbg_rate"]
+    result = {"nbg": nbg}
+    best_key, best = None, None
+    for key, code in methods:
+        value = eval(code, {"min": min, "max": max, "abs": abs}, env)
+        result[key] = {"gel": value, "loss": ((nbg - value) / nbg) * 100 if nbg > 0 else 0.0}
+        if best is None or value > best:
+            best_key, best = key, value
+    result["winner"] = best_key
+    return result
+
+
+def report(label, fn, calls):
+    seconds = timeit.timeit(fn, number=calls) / calls
+    print(f"{label:<44} {seconds * 1e6:8.2f} us/call")
+    return seconds
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    inputs = default_inputs("georgia")
+    amount = 600.0
+
+    default = REGISTRY.compile(DEFAULT_METHODS)
+    assert default.compare(amount, inputs) == Calculator.compare(amount, **inputs)
+    report("Calculator.compare (3 hard-coded)", lambda: Calculator.compare(amount, **inputs), calls)
+    report("compiled registry, 3 methods", lambda: default.compare(amount, inputs), calls)
+
+    registry = MethodRegistry(make_methods(50))
+    compiled = registry.compile(registry.keys())
+    full_inputs = dict(compiled.defaults(), **inputs)
+    codes = [(m.key, compile(m.formula, m.key, "eval")) for m in compiled.methods]
+    assert interpreted(codes, amount, full_inputs) == compiled.compare(amount, full_inputs)
+
+    t_interp = report("per-method eval, 50 methods", lambda: interpreted(codes, amount, full_inputs), calls)
+    t_comp = report("compiled registry, 50 methods", lambda: compiled.compare(amount, full_inputs), calls)
+    args = [full_inputs[n] for n in compiled.input_names]
+    report("compiled evaluate() only, 50 methods", lambda: compiled.evaluate(amount, *args), calls)
+    print(f"compiled vs per-method eval: x{t_interp / t_comp:.1f}")
+
+
+if __name__ == "__main__":
+    main()
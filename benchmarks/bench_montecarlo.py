@@ -0,0 +1,56 @@
+"""
+Benchmark: Monte Carlo risk simulation (smart_currency.montecarlo)
+
+Runs the vectorized engine on one core and across worker processes,
+plus a short pure-Python run for comparison, and prints paths/s and the
+win probabilities.
+
+Usage:
+    python benchmarks/bench_montecarlo.py [paths] [workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.calculator import HAS_NUMPY  # noqa: E402
+from smart_currency.montecarlo import MonteCarlo  # noqa: E402
+from smart_currency.profiles import default_inputs  # noqa: E402
+
+# Курсы карты месячной давности, перевода - двухнедельной, обменника - вчерашние
+AGES = {"direct_rate": 30.0, "eur_usd": 14.0, "usd_gel": 14.0, "street_rate": 1.0}
+
+
+def timed_run(label, mc, paths, workers=1):
+    start = time.perf_counter()
+    result = mc.run(paths, seed=7, workers=workers)
+    elapsed = time.perf_counter() - start
+    probs = "  ".join(f"{m} {p * 100:5.1f}%" for m, p in result["win_prob"].items())
+    print(f"{label:<24} {paths:>11,} paths  {paths / elapsed:12,.0f} paths/s   {probs}")
+    return result
+
+
+def main():
+    paths = int(float(sys.argv[1])) if len(sys.argv) > 1 else 5_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    inputs = default_inputs("georgia")
+    print(f"Amount 600 EUR, Georgia defaults, rate ages {AGES}, CPUs: {os.cpu_count()}")
+
+    if HAS_NUMPY:
+        mc = MonteCarlo(600, inputs, AGES)
+        result = timed_run("NumPy, 1 process", mc, paths)
+        timed_run(f"NumPy, {workers} processes", mc, paths, workers)
+        for method, stats in result["methods"].items():
+            print(f"  {method:<9} mean {stats['mean']:9.2f}  std {stats['std']:7.2f}  "
+                  f"p5 {stats['p5']:9.2f}  p50 {stats['p50']:9.2f}  p95 {stats['p95']:9.2f}")
+    else:
+        print("NumPy not installed - skipping vectorized engine")
+
+    timed_run("pure Python, 1 process", MonteCarlo(600, inputs, AGES, use_numpy=False),
+              min(paths, 200_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: memoized comparisons (smart_currency.quotecache)
+
+Replays a workload where most requests repeat (the GUI recalculating the
+same fields, clients polling the same quote) and compares QuoteService
+with and without the shared QuoteCache.
+
+Usage:
+    python benchmarks/bench_quote_cache.py [requests] [distinct]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.quotecache import QuoteCache  # noqa: E402
+from smart_currency.service import QuoteService  # noqa: E402
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(1)
+    pool = [{"amount": rng.choice((50, 100, 600, 1000)) + i, "country": "georgia",
+             "rates": {"street_rate": 3.1 + rng.random() / 10}} for i in range(distinct)]
+    payloads = [rng.choice(pool) for _ in range(requests)]
+
+    for label, service in (("no cache", QuoteService(cache=None)),
+                           ("QuoteCache", QuoteService(cache=QuoteCache(maxsize=1024)))):
+        start = time.perf_counter()
+        for payload in payloads:
+            service.quote(payload)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>10}: {elapsed / requests * 1e6:.2f} us/quote")
+        if service.cache is not None:
+            print(f"            {service.cache.stats()}")
+
+    # Одинаковые результаты с кэшем и без
+    plain, cached = QuoteService(cache=None), QuoteService(cache=QuoteCache(maxsize=8))
+    mismatches = sum(plain.quote(p) != cached.quote(p) for p in payloads[:5000])
+    print(f"Cached vs uncached: {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: all-country refresh (smart_currency.adapters.refresh_all)
+
+Every adapter (Georgia's three sources and the ECB countries) is pointed
+at the local stub server with injected delays. The ECB countries go
+through "localhost" and Georgia through "127.0.0.1", so the per-host limit
+sees two hosts. Compares a one-at-a-time refresh with the bounded pool and
+prints per-source latency. Each run starts from an empty HTTP cache; the
+ECB countries share one Frankfurter request per run (Georgia makes its
+own for EUR/USD), so the stub should see two /frankfurter hits per run.
+
+Usage:
+    python benchmarks/bench_refresh_all.py [workers] [per_host]
+"""
+
+import sys
+import tempfile
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency.adapters import ADAPTERS, refresh_all
+from smart_currency.adapters.ecb import EcbAdapter
+from smart_currency.fetchers import HttpCache, RateFetcher
+from smart_currency.history import HistoryStore
+
+DELAYS = {"/nbg": 0.30, "/rico": 0.45, "/frankfurter": 0.20}
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with StubRateServer(delays=DELAYS) as server, tempfile.TemporaryDirectory() as tmp:
+        server.point_rate_fetcher(RateFetcher)
+        server.point_ecb_adapter(EcbAdapter, host="localhost")
+        RateFetcher.history = HistoryStore(tmp + "/history")
+        RateFetcher.CACHE_TTLS = {}
+        print(f"{len(ADAPTERS)} countries; delays " + ", ".join(f"{k}={v * 1000:.0f} ms" for k, v in DELAYS.items()))
+
+        # Пустой кэш на каждый прогон: каждый прогон действительно идёт в сеть
+        RateFetcher.cache = HttpCache(tmp + "/cache-sequential")
+        before = server.hits["/frankfurter"]
+        start = time.perf_counter()
+        sequential = refresh_all(max_workers=1, per_host=1)
+        print(f"Sequential (1 worker):           {time.perf_counter() - start:6.2f} s  "
+              f"/frankfurter hits {server.hits['/frankfurter'] - before}")
+
+        RateFetcher.cache = HttpCache(tmp + "/cache-pool")
+        before = server.hits["/frankfurter"]
+        start = time.perf_counter()
+        snapshot = refresh_all(max_workers=workers, per_host=per_host)
+        print(f"Pool ({workers} workers, {per_host} per host):  {time.perf_counter() - start:6.2f} s  "
+              f"/frankfurter hits {server.hits['/frankfurter'] - before}")
+        assert snapshot.rates == sequential.rates and not snapshot.errors, snapshot.errors
+
+        print(f"{len(snapshot.rates)} countries in the snapshot; per-source latency / wait:")
+        for (country, source), latency in sorted(snapshot.latency.items()):
+            print(f"  {country:>12} {source:<12} {latency * 1000:5.0f} ms  "
+                  f"(waited {snapshot.waited[(country, source)] * 1000:5.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: circuit breakers and hedged requests (smart_currency.resilience)
+
+1. Dead source: the stub's /rico answers after 3 s while its timeout is
+   0.5 s. Without a breaker every Georgia refresh waits out the timeout;
+   with one, the source is skipped (cached copy) after FAILURE_THRESHOLD
+   failures.
+2. Slow tail: /frankfurter takes 10 ms, but 1 request in 20 takes 300 ms.
+   Latency percentiles of single-source fetches without and with hedging.
+
+Usage:
+    python benchmarks/bench_resilience.py [refreshes] [requests]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency import resilience
+from smart_currency.fetchers import HttpCache, RateFetcher
+from smart_currency.history import HistoryStore
+from smart_currency.resilience import CircuitBreaker, HealthRegistry
+
+TIMEOUTS = {"NBG": 2.0, "Rico": 0.5, "Frankfurter": 2.0}
+
+
+def dead_source(directory, refreshes):
+    with StubRateServer() as server:
+        server.point_rate_fetcher(RateFetcher)
+        RateFetcher.cache = HttpCache(os.path.join(directory, "cache"))
+        RateFetcher.CACHE_TTLS = {}
+        RateFetcher.fetch_georgia_rates(timeouts=TIMEOUTS)      # прогрев кэша: есть что отдать
+        server.delays["/rico"] = 3.0
+        for label, threshold in (("no breaker", 10 ** 9), ("breaker", resilience.FAILURE_THRESHOLD)):
+            RateFetcher.health = HealthRegistry(lambda: CircuitBreaker(threshold, reset_timeout=60))
+            times = []
+            for _ in range(refreshes):
+                start = time.perf_counter()
+                rates = RateFetcher.fetch_georgia_rates(timeouts=TIMEOUTS)
+                times.append(time.perf_counter() - start)
+                assert rates and "EUR" in rates, rates
+            rico = RateFetcher.health.snapshot()["Rico/georgia"]
+            print(f"  {label:<11} total {sum(times):6.2f} s, last refresh {times[-1] * 1000:6.0f} ms  "
+                  f"rico: state={rico['state']} failures={rico['failures']} "
+                  f"skipped={rico['short_circuited']}  street_eur={rates.get('street_eur')}")
+
+
+def slow_tail(directory, requests):
+    rng = random.Random(23)
+    delays = {"/frankfurter": lambda: 0.3 if rng.random() < 0.05 else 0.01}
+    with StubRateServer(delays) as server:
+        server.point_rate_fetcher(RateFetcher)
+        RateFetcher.cache = HttpCache(os.path.join(directory, "cache-tail"))
+        RateFetcher.CACHE_TTLS = {}
+        min_samples = resilience.HEDGE_MIN_SAMPLES
+        for label, samples in (("no hedging", 10 ** 9), ("hedged", min_samples)):
+            resilience.HEDGE_MIN_SAMPLES = samples
+            RateFetcher.health = HealthRegistry()
+            hits_before = server.hits["/frankfurter"]
+            times = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                RateFetcher.call_source("Frankfurter", RateFetcher._fetch_frankfurter, 2.0)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            stats = RateFetcher.health.snapshot()["Frankfurter"]
+            print(f"  {label:<11} p50 {statistics.median(times) * 1000:6.1f} ms  "
+                  f"p95 {times[int(len(times) * 0.95)] * 1000:6.1f} ms  "
+                  f"p99 {times[int(len(times) * 0.99)] * 1000:6.1f} ms  "
+                  f"upstream={server.hits['/frankfurter'] - hits_before} hedged={stats['hedged']} "
+                  f"wins={stats['hedge_wins']}")
+        resilience.HEDGE_MIN_SAMPLES = min_samples
+
+
+def main():
+    refreshes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    with tempfile.TemporaryDirectory(prefix="resilience-") as directory:
+        RateFetcher.history = HistoryStore(os.path.join(directory, "history"))
+        print(f"Dead source, {refreshes} Georgia refreshes (Rico timeout {TIMEOUTS['Rico']} s):")
+        dead_source(directory, refreshes)
+        print(f"Slow tail, {requests} Frankfurter fetches (5% take 300 ms):")
+        slow_tail(directory, requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: rico.ge street-rate parsing (smart_currency.rico)
+
+Runs the old whole-page regex scan and the streaming parser over the HTML
+fixtures in benchmarks/fixtures. The fixtures are synthetic, written by
+hand to mimic the rico.ge layouts (rates table, EUR/GEL cards with decimal
+commas, rates at the very end of the page); they are not captures of the
+live page. Reports parse time, how much of the page was fed before the
+parser stopped, and whether each result matches rico_expected.json.
+
+Usage:
+    python benchmarks/bench_rico_parse.py [repeats]
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.rico import parse_quotes  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHUNK = 16384
+
+
+def legacy_parse(body: bytes) -> dict:
+    """The pre-streaming RateFetcher._parse_rico (buy prices only)"""
+    html = body.decode("utf-8")
+    quotes = {}
+    eur_match = re.search(r'EUR.*?(\d+\.\d+)', html, re.IGNORECASE | re.DOTALL)
+    usd_match = re.search(r'USD.*?(\d+\.\d+)', html, re.IGNORECASE | re.DOTALL)
+    if eur_match:
+        quotes["EUR"] = float(eur_match.group(1))
+    if usd_match:
+        quotes["USD"] = float(usd_match.group(1))
+    return quotes
+
+
+class CountingChunks:
+    """Chunk iterator that remembers how many bytes the consumer pulled"""
+
+    def __init__(self, body: bytes, size: int = CHUNK):
+        self.body = body
+        self.size = size
+        self.consumed = 0
+
+    def __iter__(self):
+        for start in range(0, len(self.body), self.size):
+            chunk = self.body[start:start + self.size]
+            self.consumed += len(chunk)
+            yield chunk
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with open(os.path.join(FIXTURES, "rico_expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    print(f"{'fixture':<18}{'size':>9}  {'regex':>9} {'ok':>4}  {'stream':>9} {'ok':>4} {'fed':>6}")
+    for name, quotes in expected.items():
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            body = f.read()
+        want = {code: tuple(pair) for code, pair in quotes.items()}
+
+        regex_time, old = timed(lambda: legacy_parse(body), repeats)
+        old_ok = old == {code: pair[0] for code, pair in want.items()}
+
+        stream_time, new = timed(lambda: parse_quotes(iter(CountingChunks(body))), repeats)
+        new_ok = {code: tuple(q) for code, q in new.items()} == want
+        counter = CountingChunks(body)
+        parse_quotes(iter(counter))
+
+        print(f"{name:<18}{len(body) / 1024:>7.0f}KB  {regex_time * 1e3:>7.2f}ms {'yes' if old_ok else 'NO':>4}"
+              f"  {stream_time * 1e3:>7.2f}ms {'yes' if new_ok else 'NO':>4} {counter.consumed / len(body):>6.0%}")
+        if not new_ok:
+            print(f"  streaming parser returned {new}, expected {want}")
+
+
+if __name__ == "__main__":
+    main()
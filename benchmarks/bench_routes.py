@@ -0,0 +1,84 @@
+"""
+Benchmark: best-route optimizer (smart_currency.routes)
+
+Builds a random arbitrage-free graph (hundreds of currencies, thousands of
+provider edges with percentage and fixed fees), times the one-off
+Bellman-Ford potentials per target and then per-query A* search, and
+cross-checks the Georgia graph from RateGraph.from_rates against Calculator.compare.
+
+Usage:
+    python benchmarks/bench_routes.py [currencies] [edges_per_currency] [queries]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.calculator import Calculator  # noqa: E402
+from smart_currency.profiles import COUNTRY_PROFILES, default_inputs  # noqa: E402
+from smart_currency.routes import RateGraph  # noqa: E402
+
+
+def random_graph(currencies, edges_per_currency, rng):
+    # "Справедливая" цена каждой валюты + спред провайдера -> арбитража нет
+    value = {f"C{i:03d}": math.exp(rng.uniform(-4, 4)) for i in range(currencies)}
+    codes = list(value)
+    graph = RateGraph()
+    for src in codes:
+        for _ in range(edges_per_currency):
+            dst = rng.choice(codes)
+            if dst == src:
+                continue
+            rate = value[src] / value[dst] * rng.uniform(0.95, 0.999)
+            graph.add_edge(src, dst, rate, fee_pct=rng.choice((0.0, 0.5, 1.0, 2.0)),
+                           fee_fix=rng.choice((0.0, 0.0, 1.0, 5.0)), provider=f"P{rng.randrange(50)}")
+    return graph, codes
+
+
+def main():
+    currencies = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    per_currency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    rng = random.Random(11)
+
+    graph, codes = random_graph(currencies, per_currency, rng)
+    print(f"Graph: {len(graph.adjacency)} currencies, {graph.edge_count:,} edges")
+
+    # Несколько "домашних" валют, запросы из любых источников
+    targets = codes[:5]
+    start = time.perf_counter()
+    for dst in targets:
+        graph.potentials(dst)
+    elapsed = time.perf_counter() - start
+    print(f"Bellman-Ford potentials: {elapsed / len(targets) * 1000:.1f} ms per target (once, cached)")
+
+    jobs = [(rng.choice(codes), rng.choice(targets), rng.choice((10.0, 100.0, 1000.0)))
+            for _ in range(queries)]
+    for src, dst, amount in jobs[:len(targets)]:
+        graph.best_route(amount, src, dst)   # warm per-target search data
+    hops = 0
+    start = time.perf_counter()
+    for src, dst, amount in jobs:
+        route = graph.best_route(amount, src, dst)
+        hops += len(route.hops) if route else 0
+    elapsed = time.perf_counter() - start
+    print(f"{queries:,} queries: {elapsed / queries * 1e6:.0f} us/query, {hops / queries:.1f} hops on average")
+
+    mismatches = 0
+    for country in COUNTRY_PROFILES:
+        inputs = default_inputs(country)
+        g = RateGraph.from_rates(inputs)
+        for amount in (0.5, 5.0, 50.0, 600.0, 5000.0):
+            result = Calculator.compare(amount, **inputs)
+            if g.best_route(amount, "EUR", "GEL").amount_out != result[result["winner"]]["gel"]:
+                mismatches += 1
+    print(f"from_rates vs Calculator.compare: {mismatches} mismatches")
+    print("Example:", RateGraph.from_rates(default_inputs("georgia")).best_route(600, "EUR", "GEL").describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: background rate scheduler (smart_currency.scheduler)
+
+Readers need the current Georgia rates while the stub sources answer in
+50 ms. "On demand" fetches them on every read (what a refresh did before,
+behind the HTTP cache with no TTL); "scheduled" reads the RateScheduler
+snapshot while the scheduler refreshes every source on a short cadence.
+Reports read latency, upstream hits and snapshot versions seen.
+
+"cadence = TTL" keeps the production relation between SOURCE_CADENCES and
+CACHE_TTLS (scaled down to CADENCE seconds): every scheduled run must
+reach the stub, and the gap between fetches of a source must stay within
+the cadence plus jitter.
+
+Usage:
+    python benchmarks/bench_scheduler.py [seconds] [readers]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency.fetchers import HttpCache, RateFetcher
+from smart_currency.history import HistoryStore
+from smart_currency.resilience import HealthRegistry
+from smart_currency.scheduler import JITTER, RateScheduler
+
+DELAY = 0.05
+CADENCE = 0.5
+
+
+def run_readers(read, seconds, readers):
+    times, versions = [], set()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            version = read()
+            local.append(time.perf_counter() - start)
+            with lock:
+                versions.add(version)
+        with lock:
+            times.extend(local)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    times.sort()
+    return times, versions
+
+
+def report(label, times, hits, versions):
+    print(f"  {label:<10} reads {len(times):8d}  p50 {statistics.median(times) * 1e6:9.1f} us  "
+          f"p99 {times[int(len(times) * 0.99)] * 1e6:9.1f} us  upstream={hits:4d}  versions={versions}")
+
+
+def cadence_vs_ttl(server, directory, seconds):
+    """Scheduled runs against a cache whose TTL equals the cadence"""
+    names = ("NBG", "Rico", "Frankfurter")
+    RateFetcher.cache = HttpCache(os.path.join(directory, "cache-ttl"))
+    RateFetcher.CACHE_TTLS = {name: CADENCE for name in names}
+    scheduler = RateScheduler(["georgia"], cadences={name: CADENCE for name in names}, cache=None)
+    fetched = {name: [] for name in names}
+    before = sum(server.hits.values())
+    scheduler.start()
+    deadline = time.perf_counter() + seconds
+    version = 0
+    runs = 0
+    while time.perf_counter() < deadline:
+        snap = scheduler.wait_for(version, timeout=0.1)
+        runs += snap.version - version
+        version = snap.version
+        for rate in snap.rates("georgia").values():
+            stamps = fetched[rate.source]
+            if not stamps or stamps[-1] != rate.fetched_at:
+                stamps.append(rate.fetched_at)
+    scheduler.stop()
+    hits = sum(server.hits.values()) - before
+    gaps = [b - a for stamps in fetched.values() for a, b in zip(stamps, stamps[1:])]
+    print(f"  runs {runs}, upstream hits {hits}, max gap between fetches {max(gaps):.2f} s "
+          f"(limit {CADENCE * (1 + JITTER) + DELAY:.2f} s)")
+    RateFetcher.CACHE_TTLS = {}
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    delays = {"/nbg": DELAY, "/rico": DELAY, "/frankfurter": DELAY}
+    with tempfile.TemporaryDirectory(prefix="scheduler-") as directory, StubRateServer(delays) as server:
+        server.point_rate_fetcher(RateFetcher)
+        RateFetcher.cache = HttpCache(os.path.join(directory, "cache"))
+        RateFetcher.history = HistoryStore(os.path.join(directory, "history"))
+        RateFetcher.CACHE_TTLS = {}
+        RateFetcher.health = HealthRegistry()
+        print(f"{readers} readers for {seconds:.0f} s, sources answer in {DELAY * 1000:.0f} ms:")
+
+        before = sum(server.hits.values())
+        times, _ = run_readers(lambda: len(RateFetcher.fetch_georgia_rates()), seconds, readers)
+        report("on demand", times, sum(server.hits.values()) - before, "-")
+
+        cadences = {name: CADENCE for name in ("NBG", "Rico", "Frankfurter")}
+        scheduler = RateScheduler(["georgia"], cadences=cadences, cache=None).start()
+        scheduler.wait_for(0, timeout=5)
+        before = sum(server.hits.values())
+        times, versions = run_readers(lambda: scheduler.snapshot().version, seconds, readers)
+        scheduler.stop()
+        report("scheduled", times, sum(server.hits.values()) - before, len(versions))
+        print(f"  georgia inputs: {scheduler.snapshot().inputs('georgia')}")
+
+        print(f"cadence = TTL = {CADENCE} s for {seconds:.0f} s:")
+        cadence_vs_ttl(server, directory, seconds)
+
+
+if __name__ == "__main__":
+    main()
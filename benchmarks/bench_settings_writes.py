@@ -0,0 +1,68 @@
+"""
+Benchmark: settings.json writes per 1,000 recalculations
+
+Replays what calculate() -> _save_current_settings() does to the
+SettingsManager and counts disk writes for the old behaviour (rewrite the
+file on every call) and for the debounced, change-aware request_save().
+
+Usage:
+    python benchmarks/bench_settings_writes.py [recalcs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.settings import SettingsManager  # noqa: E402
+
+DEBOUNCE = 0.05
+
+
+def recalc(settings, amount):
+    """The settings.set() calls of _save_current_settings"""
+    settings.set("last_amount", amount)
+    for key, value in (("nbg_rate", 3.1566), ("eur_usd_rate", 1.1753), ("usd_gel_rate", 2.672),
+                       ("street_rate", 3.138), ("direct_implied_rate", 3.02), ("ibt_transfer_fee", 1.5),
+                       ("atm_fee_pct", 1.5), ("atm_fee_fix", 1.0), ("theme", "dark")):
+        settings.set(key, value)
+
+
+def run(label, recalcs, amounts, save, burst=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = SettingsManager(os.path.join(tmp, "settings.json"), debounce=DEBOUNCE)
+        settings.save()
+        settings.write_count = 0
+        start = time.perf_counter()
+        for i in range(recalcs):
+            recalc(settings, amounts(i))
+            save(settings)
+            if burst and (i + 1) % burst == 0:
+                time.sleep(DEBOUNCE * 2)   # user stops typing
+        elapsed = time.perf_counter() - start
+        time.sleep(DEBOUNCE * 3)   # let the last debounced write land
+        settings.save()
+        print(f"{label:<44} {settings.write_count:5d} writes  {elapsed * 1000:8.1f} ms")
+
+
+def write_always(settings):
+    """Old SettingsManager.save(): unconditional rewrite"""
+    settings._last_saved = None
+    settings.flush()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"{n} recalculations, debounce {DEBOUNCE * 1000:.0f} ms")
+    run("old: save() on every recalc", n, lambda i: 100.0, write_always)
+    run("change-aware save(), same inputs (Enter spam)", n, lambda i: 100.0, SettingsManager.save)
+    run("request_save(), same inputs", n, lambda i: 100.0, SettingsManager.request_save)
+    run("request_save(), amount changes each time", n, lambda i: 100.0 + i, SettingsManager.request_save)
+    run("request_save(), changes in 10 separate bursts", n, lambda i: 100.0 + i,
+        SettingsManager.request_save, burst=max(1, n // 10))
+
+
+if __name__ == "__main__":
+    main()
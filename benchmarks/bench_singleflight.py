@@ -0,0 +1,86 @@
+"""
+Benchmark: request coalescing (smart_currency.singleflight)
+
+N callers (default 1000) ask for Georgia's NBG rate at the same moment
+while the stub answers in 200 ms and the HTTP cache has no TTL (every
+call would go upstream). Without coalescing each caller makes its own
+request (the burst overloads the stub: most of them time out); with it,
+all of them share one.
+
+Usage:
+    python benchmarks/bench_singleflight.py [callers]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from stub_server import StubRateServer
+
+from smart_currency.fetchers import HttpCache, RateFetcher
+from smart_currency.history import HistoryStore
+from smart_currency.resilience import HealthRegistry
+from smart_currency.singleflight import SingleFlight
+
+DELAY = 0.2
+
+
+def burst(callers, country):
+    barrier = threading.Barrier(callers)
+    times, results, errors = [], [], []
+    lock = threading.Lock()
+
+    def caller():
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            rates = RateFetcher.call_source("NBG", RateFetcher._fetch_nbg, 10.0, country=country)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+            return
+        with lock:
+            times.append(time.perf_counter() - start)
+            results.append(rates)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    return times, results, errors, time.perf_counter() - started
+
+
+def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    threading.stack_size(256 * 1024)
+    with tempfile.TemporaryDirectory(prefix="singleflight-") as directory, \
+            StubRateServer({"/nbg": DELAY}) as server:
+        server.point_rate_fetcher(RateFetcher)
+        RateFetcher.cache = HttpCache(os.path.join(directory, "cache"))
+        RateFetcher.history = HistoryStore(os.path.join(directory, "history"))
+        RateFetcher.CACHE_TTLS = {}
+        print(f"{callers} concurrent callers, NBG answers in {DELAY * 1000:.0f} ms:")
+        # country=None: без объединения, как call_source до single-flight
+        for label, country in (("direct", None), ("coalesced", "georgia")):
+            RateFetcher.health = HealthRegistry()
+            RateFetcher.flights = SingleFlight()
+            before = server.hits["/nbg"]
+            times, results, errors, wall = burst(callers, country)
+            hits = server.hits["/nbg"] - before
+            print(f"  {label:<10} upstream hits {hits:5d}  wall {wall * 1000:7.0f} ms  "
+                  f"p50 {statistics.median(times) * 1000:7.0f} ms  max {max(times) * 1000:7.0f} ms  "
+                  f"ok {len(results)}  errors {len(errors)}  flights {RateFetcher.flights.stats()}")
+            assert all(r == results[0] for r in results), "callers got different rates"
+        if hits != 1:
+            print(f"  expected a single upstream hit, got {hits}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
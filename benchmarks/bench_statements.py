@@ -0,0 +1,82 @@
+"""
+Benchmark: bank statement importer (smart_currency.statements)
+
+Writes a synthetic card statement (CSV and OFX) with hundreds of thousands
+of transactions, imports it in one streaming pass and reports throughput,
+peak traced memory and the recovered rates against the generating ones.
+
+Usage:
+    python benchmarks/bench_statements.py [transactions]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.statements import import_file  # noqa: E402
+
+MERCHANTS = ["Carrefour", "Goodwill", "Spar", "Wendy's", "Bolt", "Nikora", "Domino's", "Zoomer"]
+
+
+def write_statements(directory, count, rng):
+    start = date(2023, 1, 1)
+    csv_path = os.path.join(directory, "statement.csv")
+    ofx_path = os.path.join(directory, "statement.ofx")
+    rates = {}
+    with open(csv_path, "w", encoding="utf-8") as csv_f, open(ofx_path, "w", encoding="utf-8") as ofx_f:
+        csv_f.write("Date;Description;Amount EUR;Original amount;Original currency\n")
+        ofx_f.write("OFXHEADER:100\nDATA:OFXSGML\n<OFX><BANKTRANLIST>\n")
+        for i in range(count):
+            day = start + timedelta(days=i * 730 // count)
+            base = rates.setdefault(day, 2.95 + 0.1 * (i / count))
+            rate = base * (1 + rng.gauss(0, 0.002))
+            if rng.random() < 0.01:
+                rate *= rng.choice((0.5, 2.0))   # выбросы: возвраты, ошибки выписки
+            gel = round(rng.uniform(2, 300), 2)
+            eur = round(gel / rate, 2) or 0.01
+            merchant = rng.choice(MERCHANTS)
+            if rng.random() < 0.1:
+                csv_f.write(f"{day:%d.%m.%Y};Transfer;-{eur:.2f};{eur:.2f};EUR\n")
+                continue
+            csv_f.write(f"{day:%d.%m.%Y};{merchant};-{eur:.2f};{gel:.2f};GEL\n")
+            ofx_f.write(f"<STMTTRN><TRNTYPE>POS<DTPOSTED>{day:%Y%m%d}<TRNAMT>-{eur:.2f}"
+                        f"<NAME>{merchant}<MEMO>{gel:.2f} GEL</STMTTRN>\n")
+        ofx_f.write("</BANKTRANLIST></OFX>\n")
+    return csv_path, ofx_path, rates
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory(prefix="statement-") as directory:
+        csv_path, ofx_path, rates = write_statements(directory, count, rng)
+        for path in (csv_path, ofx_path):
+            size = os.path.getsize(path)
+            start = time.perf_counter()
+            summary = import_file(path)
+            elapsed = time.perf_counter() - start
+            # Память - отдельным проходом: tracemalloc в разы замедляет разбор
+            tracemalloc.start()
+            import_file(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            days = summary.days()
+            errors = sorted(abs(days[d]["median"] / rates[d] - 1) for d in days)
+            print(f"{os.path.basename(path)}: {count:,} lines, {size / 2**20:.1f} MB in {elapsed:.2f} s "
+                  f"({count / elapsed:,.0f} lines/s), peak {peak / 2**20:.1f} MB traced")
+            print(f"  {summary.transactions:,} GEL transactions, {len(days)} days, "
+                  f"{len(summary.by_merchant)} merchants; daily median error "
+                  f"p50 {errors[len(errors) // 2] * 100:.3f}% max {errors[-1] * 100:.3f}%")
+            print(f"  suggested rate {summary.suggested_rate():.4f} "
+                  f"(generated {rates[max(rates)]:.4f} on the last day)")
+
+
+if __name__ == "__main__":
+    main()
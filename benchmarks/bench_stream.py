@@ -0,0 +1,75 @@
+"""
+Benchmark: streaming batch mode (smart_currency.stream)
+
+Writes N synthetic card transactions to a temp CSV, scores them with 1 and
+--workers processes, checks the outputs are identical and prints rows/s
+and peak memory of the reading/writing process.
+
+Usage:
+    python benchmarks/bench_stream.py [N] [workers]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from smart_currency.profiles import COUNTRY_PROFILES  # noqa: E402
+
+
+def write_input(path, n):
+    rng = random.Random(42)
+    countries = list(COUNTRY_PROFILES)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("date,amount_eur,country\n")
+        for i in range(n):
+            f.write(f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d},{rng.uniform(0.5, 2000):.2f},"
+                    f"{rng.choice(countries)}\n")
+
+
+def peak_rss_mb(pid_usage):
+    # ru_maxrss: KB on Linux, bytes on macOS
+    return pid_usage / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run(input_path, output_path, workers):
+    # Отдельный процесс, чтобы пиковая память относилась только к этому прогону
+    code = (
+        "import resource, sys\n"
+        f"sys.path.insert(0, {ROOT!r})\n"
+        "from smart_currency.stream import main\n"
+        f"main([{input_path!r}, '-o', {output_path!r}, '--workers', '{workers}'])\n"
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mb(int(result.stdout.strip().splitlines()[-1]))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "tx.csv")
+        write_input(input_path, n)
+        print(f"Rows: {n:,}  input: {os.path.getsize(input_path) / 1e6:.1f} MB  CPUs: {os.cpu_count()}")
+
+        outputs = []
+        for w in (1, workers):
+            output_path = os.path.join(tmp, f"out{w}.csv")
+            elapsed, rss = run(input_path, output_path, w)
+            outputs.append(output_path)
+            print(f"workers={w:<3} {elapsed:7.2f} s  {n / elapsed:12,.0f} rows/s  peak RSS (parent) {rss:6.1f} MB")
+
+        with open(outputs[0], "rb") as a, open(outputs[1], "rb") as b:
+            print("outputs identical" if a.read() == b.read() else "OUTPUTS DIFFER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: parameter sweep engine (smart_currency.sweep)
+
+Sweeps amount x street_rate x atm_fee_fix x ibt_fee (default 10^7 cells)
+with derivatives, spot-checks random cells against Calculator.compare and
+prints cells/s and peak traced memory.
+
+Usage:
+    python benchmarks/bench_sweep.py [cells] [--python]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.calculator import Calculator  # noqa: E402
+from smart_currency.profiles import default_inputs  # noqa: E402
+from smart_currency.sweep import SweepGrid, linspace  # noqa: E402
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    cells = int(float(args[0])) if args else 10_000_000
+    use_numpy = False if "--python" in sys.argv else None
+
+    # Разбиваем число ячеек на 4 оси примерно поровну
+    side = max(2, round(cells ** 0.25))
+    ranges = {
+        "amount": linspace(1, 2000, side),
+        "street_rate": linspace(3.0, 3.3, side),
+        "atm_fee_fix": linspace(0, 10, side),
+        "ibt_fee": linspace(0, 3, max(1, cells // side ** 3)),
+    }
+    base = default_inputs("georgia")
+    grid = SweepGrid(600, ranges, base, use_numpy=use_numpy)
+    engine = "NumPy" if grid.batch.use_numpy else "pure Python"
+    print(f"Grid {' x '.join(map(str, grid.shape))} = {grid.size:,} cells ({engine})")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = grid.run(derivatives=True)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{elapsed:.2f} s  {grid.size / elapsed:,.0f} cells/s  peak traced memory {peak / 1e6:.0f} MB")
+    print("wins:", result.wins)
+
+    rng = random.Random(1)
+    mismatches = 0
+    for _ in range(1000):
+        index = tuple(rng.randrange(n) for n in grid.shape)
+        values = dict(base)
+        for param, axis, i in zip(result.params, result.axes, index):
+            values[param] = axis[i]
+        amount = values.pop("amount")
+        if result.winner_at(*index) != Calculator.compare(amount, **values)["winner"]:
+            mismatches += 1
+    print(f"1000 random cells vs Calculator.compare: {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test for the JSON quote service (smart_currency.service)
+
+Starts the service in-process (or targets --url) and hammers it from N
+client threads, each reusing one keep-alive connection. Reports
+requests/sec and p50/p99 latency for /quote and /quote/batch.
+
+Usage:
+    python benchmarks/load_test_service.py [--clients 8] [--requests 2000]
+                                           [--batch-size 1000] [--url http://127.0.0.1:8765]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_currency.service import QuoteServer  # noqa: E402
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def client(host, port, path, bodies, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+    for body in bodies:
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run(label, host, port, path, make_body, clients, requests_total, rows_per_request=1):
+    per_client = max(1, requests_total // clients)
+    rng = random.Random(7)
+    bodies = [[make_body(rng) for _ in range(per_client)] for _ in range(clients)]
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(host, port, path, b, latencies, errors))
+               for b in bodies]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    done = len(latencies)
+    print(f"{label:<18} {done:6d} req  {done / elapsed:9.0f} req/s  "
+          f"{done * rows_per_request / elapsed:11.0f} quotes/s  "
+          f"p50 {percentile(latencies, 50) * 1000:6.2f} ms  p99 {percentile(latencies, 99) * 1000:6.2f} ms"
+          f"  errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--url", help="existing service; default: start one in-process")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = QuoteServer(("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+    def quote_body(rng):
+        return json.dumps({"amount": round(rng.uniform(5, 2000), 2), "country": "georgia"})
+
+    def batch_body(rng):
+        return json.dumps({"country": "georgia",
+                           "amounts": [round(rng.uniform(5, 2000), 2) for _ in range(args.batch_size)]})
+
+    print(f"{args.clients} keep-alive clients against http://{host}:{port}")
+    run("/quote", host, port, "/quote", quote_body, args.clients, args.requests)
+    run("/quote/batch", host, port, "/quote/batch", batch_body, args.clients,
+        max(args.clients, args.requests // 20), args.batch_size)
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
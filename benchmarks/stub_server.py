@@ -0,0 +1,175 @@
+"""
+Local stub of the rate sources used by the benchmarks.
+
+Serves NBG-like JSON, a rico.ge-like HTML page and a Frankfurter-like JSON
+(with the ECB currencies of the country profiles) on 127.0.0.1 with an injectable per-path delay, ETag / 304 support, and
+counts hits per path. Bodies are gzipped when the client asks for it;
+tls_contexts() makes a self-signed certificate for an https stub.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+NBG_BODY = json.dumps([{
+    "date": "2026-02-20T00:00:00.000Z",
+    "currencies": [
+        {"code": "EUR", "quantity": 1, "rate": 3.1566, "name": "Euro"},
+        {"code": "USD", "quantity": 1, "rate": 2.6859, "name": "US Dollar"},
+        {"code": "RUB", "quantity": 100, "rate": 3.0271, "name": "Russian Ruble"},
+    ],
+}]).encode("utf-8")
+
+RICO_BODY = (
+    "<html><head><title>Rico Credit</title></head><body>"
+    + "<div class='filler'>" + "lorem ipsum " * 2000 + "</div>"
+    + "<table class='rates'><tr><th>Currency</th><th>Buy</th><th>Sell</th></tr>"
+    "<tr><td>USD</td><td>2.6720</td><td>2.6900</td></tr>"
+    "<tr><td>EUR</td><td>3.1380</td><td>3.1640</td></tr>"
+    "<tr><td>GBP</td><td>3.5500</td><td>3.6100</td></tr>"
+    "</table></body></html>"
+).encode("utf-8")
+
+FRANKFURTER_BODY = json.dumps({
+    "amount": 1.0, "base": "EUR", "date": "2026-02-20",
+    "rates": {"USD": 1.1753, "CHF": 0.9412, "CZK": 25.02, "DKK": 7.4611,
+              "GBP": 0.8705, "HUF": 402.5, "ISK": 145.9, "NOK": 11.62, "PLN": 4.215,
+              "RON": 5.085, "SEK": 11.05, "TRY": 48.3},
+}).encode("utf-8")
+
+ROUTES = {
+    "/nbg": ("application/json", NBG_BODY),
+    "/rico": ("text/html; charset=utf-8", RICO_BODY),
+    "/frankfurter": ("application/json", FRANKFURTER_BODY),
+}
+
+GZIPPED = {path: gzip.compress(body, mtime=0) for path, (_, body) in ROUTES.items()}
+
+
+def tls_contexts(directory: str):
+    """(server, client) SSL contexts for a self-signed 127.0.0.1 certificate (needs openssl)"""
+    cert = os.path.join(directory, "stub-cert.pem")
+    key = os.path.join(directory, "stub-key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost"],
+                   check=True, capture_output=True)
+    server_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_ctx.load_cert_chain(cert, key)
+    client_ctx = ssl.create_default_context(cafile=cert)
+    return server_ctx, client_ctx
+
+
+class StubRateServer:
+    """Threaded HTTP server with per-path delays (seconds, or a callable per request) and hit counters"""
+
+    def __init__(self, delays=None, ssl_context=None, compress=True):
+        self.delays = dict(delays or {})
+        self.compress = compress
+        self.gzipped = 0
+        self._sockets = set()
+        self.hits = {path: 0 for path in ROUTES}
+        self.not_modified = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело уходят отдельными write(): без этого keep-alive
+            # упирается в Nagle + delayed ACK (~40 мс на ответ)
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                    server._sockets.add(self.connection)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path not in ROUTES:
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.hits[path] += 1
+                delay = server.delays.get(path, 0.0)
+                time.sleep(delay() if callable(delay) else delay)
+                content_type, body = ROUTES[path]
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("ETag", etag)
+                if server.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = GZIPPED[path]
+                    self.send_header("Content-Encoding", "gzip")
+                    with server._lock:
+                        server.gzipped += 1
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        if ssl_context is not None:
+            self.httpd.socket = ssl_context.wrap_socket(self.httpd.socket, server_side=True)
+        self.scheme = "https" if ssl_context is not None else "http"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def point_rate_fetcher(self, fetcher_cls):
+        """Redirect RateFetcher's source URLs to this server"""
+        fetcher_cls.NBG_URL = self.url("/nbg")
+        fetcher_cls.RICO_URL = self.url("/rico")
+        fetcher_cls.FRANKFURTER_URL = self.url("/frankfurter")
+
+    def point_ecb_adapter(self, adapter_cls, host: str = None):
+        """Redirect the ECB adapter (optionally via another host name, e.g. "localhost")"""
+        url = self.url("/frankfurter")
+        if host:
+            url = url.replace("127.0.0.1", host)
+        adapter_cls.LATEST_URL = url
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        # Keep-alive соединения иначе продолжат обслуживаться после "остановки"
+        with self._lock:
+            sockets, self._sockets = self._sockets, set()
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -3,26 +3,44 @@ Currency Arbitrage Calculator - Standalone Version
 Универсальный калькулятор для сравнения способов обмена валют в разных странах
 
 Работает на стандартном tkinter без дополнительных зависимостей!
+Расчёты, профили стран, настройки и загрузка курсов живут в пакете
+smart_currency (без GUI); этот файл - только Tk-интерфейс.
 
 Author: Created with Antigravity AI
 Version: 1.1
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-import json
-import os
+from tkinter import ttk, messagebox, filedialog
 import ctypes
+import queue
+import sys
+import threading
 from typing import Dict, Optional
 
-# Включаем DPI awareness для Windows (четкие шрифты)
-try:
-    ctypes.windll.shcore.SetProcessDpiAwareness(2)  # Per-monitor DPI aware
-except Exception:
+from smart_currency.adapters import get_adapter, has_adapter
+from smart_currency.breakeven import solve_breakeven
+from smart_currency.fetchers import RateFetcher, RateFetchJob
+from smart_currency.history import HISTORY, MANUAL_RATE_DATES, parse_day
+from smart_currency.methods import DEFAULT_METHODS, REGISTRY, SHARED_INPUTS
+from smart_currency.montecarlo import MonteCarlo, rate_ages
+from smart_currency.profiles import COUNTRY_PROFILES
+from smart_currency.quotecache import QUOTE_CACHE
+from smart_currency.resilience import health_key
+from smart_currency.scheduler import RateScheduler
+from smart_currency.settings import SettingsManager
+from smart_currency.statements import RECENT_DAYS, import_file
+
+
+def _enable_dpi_awareness():
+    """Включаем DPI awareness для Windows (четкие шрифты)"""
     try:
-        ctypes.windll.user32.SetProcessDPIAware()  # Fallback
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # Per-monitor DPI aware
     except Exception:
-        pass
+        try:
+            ctypes.windll.user32.SetProcessDPIAware()  # Fallback
+        except Exception:
+            pass
 
 # Попробуем импортировать matplotlib, если есть
 # ОТКЛЮЧЕНО - используем Apple-style текстовые карточки
@@ -37,209 +55,15 @@ HAS_MATPLOTLIB = False
 #     HAS_MATPLOTLIB = False
 #     print("⚠️ matplotlib не установлен - график будет в текстовом виде")
 
-# Больше не требуем requests хуками, используем urllib.request внутри RateFetcher
+# Сценариев для кнопки риск-анализа (~0.1 с с NumPy)
+RISK_PATHS = 200_000
 
-# ==============================================================================
-# CONSTANTS & DEFAULTS
-# ==============================================================================
-
-SETTINGS_FILE = os.path.join(os.path.dirname(__file__), "settings.json")
-
-# ==============================================================================
-# COUNTRY PROFILES
-# ==============================================================================
+# Как часто GUI забирает снимок курсов у фонового планировщика, мс
+SCHEDULER_POLL_MS = 1000
 
-COUNTRY_PROFILES = {
-    # ===== КАВКАЗ И ЗАКАВКАЗЬЕ =====
-    "georgia": {
-        "name": "Грузия", "flag": "🇬🇪", "city": "Батуми",
-        "local_currency": "GEL", "local_symbol": "₾", "local_name": "Лари",
-        "central_bank": "НБГ", "central_bank_full": "Центробанк Грузии",
-        "central_bank_api": "https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies",
-        "street_exchange": "Valuto/Rico",
-        "default_rates": {"nbg_rate": 3.16, "street_rate": 3.14, "direct_rate": 3.02, "eur_usd_rate": 1.08, "usd_gel_rate": 2.9}
-    },
-    "armenia": {
-        "name": "Армения", "flag": "🇦🇲", "city": "Ереван",
-        "local_currency": "AMD", "local_symbol": "֏", "local_name": "Драм",
-        "central_bank": "ЦБА", "central_bank_full": "ЦБ Армении",
-        "central_bank_api": "", "street_exchange": "Обменник",
-        "default_rates": {"nbg_rate": 430.0, "street_rate": 428.0, "direct_rate": 420.0, "eur_usd_rate": 1.08, "usd_gel_rate": 400.0}
-    },
-    "azerbaijan": {
-        "name": "Азербайджан", "flag": "🇦🇿", "city": "Баку",
-        "local_currency": "AZN", "local_symbol": "₼", "local_name": "Манат",
-        "central_bank": "ЦБА", "central_bank_full": "ЦБ Азербайджана",
-        "central_bank_api": "", "street_exchange": "Обменник",
-        "default_rates": {"nbg_rate": 1.84, "street_rate": 1.82, "direct_rate": 1.78, "eur_usd_rate": 1.08, "usd_gel_rate": 1.7}
-    },
-    
-    # ===== БАЛКАНЫ =====
-    "serbia": {
-        "name": "Сербия", "flag": "🇷🇸", "city": "Белград",
-        "local_currency": "RSD", "local_symbol": "дин", "local_name": "Динар",
-        "central_bank": "НБС", "central_bank_full": "Народный Банк Сербии",
-        "central_bank_api": "https://nbs.rs/", "street_exchange": "Menjačnica",
-        "default_rates": {"nbg_rate": 117.0, "street_rate": 116.5, "direct_rate": 115.0, "eur_usd_rate": 1.08, "usd_gel_rate": 108.0}
-    },
-    "albania": {
-        "name": "Албания", "flag": "🇦🇱", "city": "Тирана",
-        "local_currency": "ALL", "local_symbol": "L", "local_name": "Лек",
-        "central_bank": "БА", "central_bank_full": "Банк Албании",
-        "central_bank_api": "", "street_exchange": "Këmbim Valutor",
-        "default_rates": {"nbg_rate": 100.0, "street_rate": 99.0, "direct_rate": 97.0, "eur_usd_rate": 1.08, "usd_gel_rate": 93.0}
-    },
-    "north_macedonia": {
-        "name": "Сев. Македония", "flag": "🇲🇰", "city": "Скопье",
-        "local_currency": "MKD", "local_symbol": "ден", "local_name": "Денар",
-        "central_bank": "НБМ", "central_bank_full": "НБ Македонии",
-        "central_bank_api": "", "street_exchange": "Менувачница",
-        "default_rates": {"nbg_rate": 61.5, "street_rate": 61.0, "direct_rate": 60.0, "eur_usd_rate": 1.08, "usd_gel_rate": 57.0}
-    },
-    "bosnia": {
-        "name": "Босния", "flag": "🇧🇦", "city": "Сараево",
-        "local_currency": "BAM", "local_symbol": "KM", "local_name": "Марка",
-        "central_bank": "ЦББиГ", "central_bank_full": "ЦБ Боснии",
-        "central_bank_api": "", "street_exchange": "Mjenjačnica",
-        "default_rates": {"nbg_rate": 1.96, "street_rate": 1.95, "direct_rate": 1.92, "eur_usd_rate": 1.08, "usd_gel_rate": 1.81}
-    },
-    
-    # ===== ВОСТОЧНАЯ ЕВРОПА =====
-    "ukraine": {
-        "name": "Украина", "flag": "🇺🇦", "city": "Киев",
-        "local_currency": "UAH", "local_symbol": "₴", "local_name": "Гривна",
-        "central_bank": "НБУ", "central_bank_full": "НБ Украины",
-        "central_bank_api": "", "street_exchange": "Обмін валют",
-        "default_rates": {"nbg_rate": 44.0, "street_rate": 43.5, "direct_rate": 42.0, "eur_usd_rate": 1.08, "usd_gel_rate": 41.0}
-    },
-    "moldova": {
-        "name": "Молдова", "flag": "🇲🇩", "city": "Кишинёв",
-        "local_currency": "MDL", "local_symbol": "L", "local_name": "Лей",
-        "central_bank": "НБМ", "central_bank_full": "НБ Молдовы",
-        "central_bank_api": "", "street_exchange": "Schimb Valutar",
-        "default_rates": {"nbg_rate": 19.5, "street_rate": 19.3, "direct_rate": 19.0, "eur_usd_rate": 1.08, "usd_gel_rate": 18.0}
-    },
-    "belarus": {
-        "name": "Беларусь", "flag": "🇧🇾", "city": "Минск",
-        "local_currency": "BYN", "local_symbol": "Br", "local_name": "Рубль",
-        "central_bank": "НББ", "central_bank_full": "НБ Беларуси",
-        "central_bank_api": "", "street_exchange": "Обменник",
-        "default_rates": {"nbg_rate": 3.5, "street_rate": 3.45, "direct_rate": 3.4, "eur_usd_rate": 1.08, "usd_gel_rate": 3.2}
-    },
-    "russia": {
-        "name": "Россия", "flag": "🇷🇺", "city": "Москва",
-        "local_currency": "RUB", "local_symbol": "₽", "local_name": "Рубль",
-        "central_bank": "ЦБР", "central_bank_full": "ЦБ России",
-        "central_bank_api": "https://cbr.ru/", "street_exchange": "Обменник",
-        "default_rates": {"nbg_rate": 105.0, "street_rate": 103.0, "direct_rate": 100.0, "eur_usd_rate": 1.08, "usd_gel_rate": 97.0}
-    },
-    
-    # ===== ЦЕНТРАЛЬНАЯ ЕВРОПА =====
-    "poland": {
-        "name": "Польша", "flag": "🇵🇱", "city": "Варшава",
-        "local_currency": "PLN", "local_symbol": "zł", "local_name": "Злотый",
-        "central_bank": "НБП", "central_bank_full": "НБ Польши",
-        "central_bank_api": "https://nbp.pl/", "street_exchange": "Kantor",
-        "default_rates": {"nbg_rate": 4.3, "street_rate": 4.25, "direct_rate": 4.15, "eur_usd_rate": 1.08, "usd_gel_rate": 4.0}
-    },
-    "czechia": {
-        "name": "Чехия", "flag": "🇨🇿", "city": "Прага",
-        "local_currency": "CZK", "local_symbol": "Kč", "local_name": "Крона",
-        "central_bank": "ЧНБ", "central_bank_full": "ЧНБ",
-        "central_bank_api": "https://cnb.cz/", "street_exchange": "Směnárna",
-        "default_rates": {"nbg_rate": 25.3, "street_rate": 25.0, "direct_rate": 24.5, "eur_usd_rate": 1.08, "usd_gel_rate": 23.5}
-    },
-    "hungary": {
-        "name": "Венгрия", "flag": "🇭🇺", "city": "Будапешт",
-        "local_currency": "HUF", "local_symbol": "Ft", "local_name": "Форинт",
-        "central_bank": "МНБ", "central_bank_full": "НБ Венгрии",
-        "central_bank_api": "https://mnb.hu/", "street_exchange": "Pénzváltó",
-        "default_rates": {"nbg_rate": 395.0, "street_rate": 390.0, "direct_rate": 380.0, "eur_usd_rate": 1.08, "usd_gel_rate": 365.0}
-    },
-    "romania": {
-        "name": "Румыния", "flag": "🇷🇴", "city": "Бухарест",
-        "local_currency": "RON", "local_symbol": "lei", "local_name": "Лей",
-        "central_bank": "НБР", "central_bank_full": "НБ Румынии",
-        "central_bank_api": "https://bnr.ro/", "street_exchange": "Casa de Schimb",
-        "default_rates": {"nbg_rate": 4.97, "street_rate": 4.92, "direct_rate": 4.85, "eur_usd_rate": 1.08, "usd_gel_rate": 4.6}
-    },
-    "bulgaria": {
-        "name": "Болгария", "flag": "🇧🇬", "city": "София",
-        "local_currency": "BGN", "local_symbol": "лв", "local_name": "Лев",
-        "central_bank": "БНБ", "central_bank_full": "БНБ",
-        "central_bank_api": "https://bnb.bg/", "street_exchange": "Обменно бюро",
-        "default_rates": {"nbg_rate": 1.96, "street_rate": 1.94, "direct_rate": 1.90, "eur_usd_rate": 1.08, "usd_gel_rate": 1.81}
-    },
-    
-    # ===== СКАНДИНАВИЯ =====
-    "sweden": {
-        "name": "Швеция", "flag": "🇸🇪", "city": "Стокгольм",
-        "local_currency": "SEK", "local_symbol": "kr", "local_name": "Крона",
-        "central_bank": "Риксбанк", "central_bank_full": "Riksbank",
-        "central_bank_api": "https://riksbank.se/", "street_exchange": "Forex",
-        "default_rates": {"nbg_rate": 11.5, "street_rate": 11.3, "direct_rate": 11.0, "eur_usd_rate": 1.08, "usd_gel_rate": 10.6}
-    },
-    "norway": {
-        "name": "Норвегия", "flag": "🇳🇴", "city": "Осло",
-        "local_currency": "NOK", "local_symbol": "kr", "local_name": "Крона",
-        "central_bank": "Norges Bank", "central_bank_full": "Norges Bank",
-        "central_bank_api": "https://norges-bank.no/", "street_exchange": "Forex",
-        "default_rates": {"nbg_rate": 11.8, "street_rate": 11.6, "direct_rate": 11.3, "eur_usd_rate": 1.08, "usd_gel_rate": 10.9}
-    },
-    "denmark": {
-        "name": "Дания", "flag": "🇩🇰", "city": "Копенгаген",
-        "local_currency": "DKK", "local_symbol": "kr", "local_name": "Крона",
-        "central_bank": "Danmarks NB", "central_bank_full": "Danmarks Nationalbank",
-        "central_bank_api": "https://nationalbanken.dk/", "street_exchange": "Forex",
-        "default_rates": {"nbg_rate": 7.46, "street_rate": 7.4, "direct_rate": 7.3, "eur_usd_rate": 1.08, "usd_gel_rate": 6.9}
-    },
-    "iceland": {
-        "name": "Исландия", "flag": "🇮🇸", "city": "Рейкьявик",
-        "local_currency": "ISK", "local_symbol": "kr", "local_name": "Крона",
-        "central_bank": "Seðlabanki", "central_bank_full": "ЦБ Исландии",
-        "central_bank_api": "", "street_exchange": "Gjaldeyrisskipti",
-        "default_rates": {"nbg_rate": 150.0, "street_rate": 148.0, "direct_rate": 145.0, "eur_usd_rate": 1.08, "usd_gel_rate": 139.0}
-    },
-    
-    # ===== ЗАПАДНАЯ ЕВРОПА (не EUR) =====
-    "uk": {
-        "name": "Великобритания", "flag": "🇬🇧", "city": "Лондон",
-        "local_currency": "GBP", "local_symbol": "£", "local_name": "Фунт",
-        "central_bank": "BoE", "central_bank_full": "Bank of England",
-        "central_bank_api": "https://bankofengland.co.uk/", "street_exchange": "Bureau de Change",
-        "default_rates": {"nbg_rate": 0.84, "street_rate": 0.83, "direct_rate": 0.82, "eur_usd_rate": 1.08, "usd_gel_rate": 0.78}
-    },
-    "switzerland": {
-        "name": "Швейцария", "flag": "🇨🇭", "city": "Цюрих",
-        "local_currency": "CHF", "local_symbol": "Fr", "local_name": "Франк",
-        "central_bank": "SNB", "central_bank_full": "Swiss National Bank",
-        "central_bank_api": "https://snb.ch/", "street_exchange": "Wechselstube",
-        "default_rates": {"nbg_rate": 0.94, "street_rate": 0.93, "direct_rate": 0.91, "eur_usd_rate": 1.08, "usd_gel_rate": 0.87}
-    },
-    
-    # ===== ТУРЦИЯ =====
-    "turkey": {
-        "name": "Турция", "flag": "🇹🇷", "city": "Стамбул",
-        "local_currency": "TRY", "local_symbol": "₺", "local_name": "Лира",
-        "central_bank": "TCMB", "central_bank_full": "ЦБ Турции",
-        "central_bank_api": "https://tcmb.gov.tr/", "street_exchange": "Döviz Bürosu",
-        "default_rates": {"nbg_rate": 35.0, "street_rate": 34.8, "direct_rate": 34.0, "eur_usd_rate": 1.08, "usd_gel_rate": 32.5}
-    }
-}
+# Опрос фоновых задач (риск-анализ, импорт выписки), мс
+WORKER_POLL_MS = 50
 
-DEFAULT_SETTINGS = {
-    "country": "georgia",             # Выбранная страна
-    "nbg_rate": 3.1595,               # Курс ЦБ EUR -> Local
-    "eur_usd_rate": 1.16,             # IBT cross-rate EUR -> USD
-    "usd_gel_rate": 2.69,             # Credo USD -> Local
-    "street_rate": 3.143,             # Обменник
-    "direct_implied_rate": 3.02,      # Эффективный курс карты IBT
-    "ibt_transfer_fee": 1.5,          # Комиссия перевода IBT %
-    "atm_fee_pct": 1.5,               # Комиссия банкомата %
-    "atm_fee_fix": 1.0,               # Фикс комиссия банкомата EUR
-    "last_amount": 100.0,             # Последняя введенная сумма
-    "theme": "dark"                   # Тема: dark или light
-}
 
 # ==============================================================================
 # THEME COLORS
@@ -451,170 +275,6 @@ class CalendarPopup:
             self.on_select()
         self.popup.destroy()
 
-# ==============================================================================
-# SETTINGS MANAGER
-# ==============================================================================
-
-class SettingsManager:
-    def __init__(self, filepath: str = SETTINGS_FILE):
-        self.filepath = filepath
-        self.settings = self.load()
-        self.countries = self._load_countries()
-    
-    def load(self) -> dict:
-        try:
-            if os.path.exists(self.filepath):
-                with open(self.filepath, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    return {**DEFAULT_SETTINGS, **loaded}
-        except Exception as e:
-            print(f"Settings load error: {e}")
-        return DEFAULT_SETTINGS.copy()
-    
-    def _load_countries(self) -> dict:
-        """Load countries: built-in + custom from settings.json"""
-        # Start with built-in countries
-        countries = COUNTRY_PROFILES.copy()
-        
-        # Add custom countries from settings if present
-        custom = self.settings.get("custom_countries", {})
-        if custom and isinstance(custom, dict):
-            for key, profile in custom.items():
-                # Validate minimum required fields
-                required = ["name", "flag", "local_currency", "local_symbol"]
-                if all(field in profile for field in required):
-                    # Fill in defaults for missing fields
-                    defaults = {
-                        "city": profile.get("name", ""),
-                        "local_name": profile.get("local_currency", ""),
-                        "central_bank": "ЦБ",
-                        "central_bank_full": "Центробанк",
-                        "central_bank_api": "",
-                        "street_exchange": "Обменник",
-                        "default_rates": {
-                            "nbg_rate": 1.0,
-                            "street_rate": 1.0,
-                            "direct_rate": 1.0,
-                            "eur_usd_rate": 1.0,
-                            "usd_gel_rate": 1.0,
-                        }
-                    }
-                    countries[key] = {**defaults, **profile}
-        
-        return countries
-    
-    def get_countries(self) -> dict:
-        """Return all countries (built-in + custom)"""
-        return self.countries
-    
-    def add_country(self, key: str, profile: dict):
-        """Add a custom country"""
-        custom = self.settings.get("custom_countries", {})
-        custom[key] = profile
-        self.settings["custom_countries"] = custom
-        self.countries[key] = profile
-        self.save()
-    
-    def save(self):
-        try:
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Settings save error: {e}")
-    
-    def get(self, key: str, default=None):
-        return self.settings.get(key, default)
-    
-    def set(self, key: str, value):
-        self.settings[key] = value
-
-import urllib.request
-import re
-
-class RateFetcher:
-    """Universal rate fetcher using urllib (no third-party dependencies)"""
-    
-    @staticmethod
-    def get_headers():
-        return {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        
-    @staticmethod
-    def fetch_georgia_rates() -> Optional[Dict[str, float]]:
-        rates = {}
-        
-        # 1. NBG (Central Bank EUR and USD)
-        try:
-            req = urllib.request.Request("https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies/en/json", headers=RateFetcher.get_headers())
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                if data and isinstance(data, list):
-                    currencies = data[0].get("currencies", [])
-                    for curr in currencies:
-                        code = curr.get("code")
-                        if code in ["EUR", "USD"]:
-                            rates[code] = curr.get("rate", 0) / curr.get("quantity", 1)
-        except Exception as e:
-            print(f"NBG API Error: {e}")
-            
-        # 2. Rico (Street Exchange & Credo Approximation)
-        try:
-            req = urllib.request.Request("https://rico.ge/?lang=en", headers=RateFetcher.get_headers())
-            with urllib.request.urlopen(req, timeout=10) as response:
-                html = response.read().decode('utf-8')
-                eur_match = re.search(r'EUR.*?(\d+\.\d+)', html, re.IGNORECASE | re.DOTALL)
-                usd_match = re.search(r'USD.*?(\d+\.\d+)', html, re.IGNORECASE | re.DOTALL)
-                if eur_match:
-                    rates["street_eur"] = float(eur_match.group(1))
-                if usd_match:
-                    rates["credo_usd"] = float(usd_match.group(1))
-        except Exception as e:
-            print(f"Rico Scrape Error: {e}")
-            
-        # 3. Frankfurter (M/C cross-rate EUR->USD proxy)
-        try:
-            req = urllib.request.Request("https://api.frankfurter.dev/v1/latest?base=EUR&symbols=USD", headers=RateFetcher.get_headers())
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                rates["eur_usd"] = data["rates"]["USD"]
-        except Exception as e:
-            print(f"Frankfurter API Error: {e}")
-            
-        return rates if rates else None
-
-# ==============================================================================
-# CALCULATOR LOGIC
-# ==============================================================================
-
-class Calculator:
-    @staticmethod
-    def calc_direct(spend_eur: float, implied_rate: float) -> float:
-        return spend_eur * implied_rate
-    
-    @staticmethod
-    def calc_transfer(spend_eur: float, fee_pct: float, 
-                      eur_usd: float, usd_gel: float) -> float:
-        net_eur = spend_eur / (1 + fee_pct / 100)
-        amount_usd = net_eur * eur_usd
-        return amount_usd * usd_gel
-    
-    @staticmethod
-    def calc_cash(spend_eur: float, fee_pct: float, 
-                  fix_fee: float, street_rate: float) -> float:
-        if spend_eur <= fix_fee:
-            return 0.0
-        net_eur = (spend_eur - fix_fee) / (1 + fee_pct / 100)
-        return net_eur * street_rate
-    
-    @staticmethod
-    def calc_nbg_reference(spend_eur: float, nbg_rate: float) -> float:
-        return spend_eur * nbg_rate
-    
-    @staticmethod
-    def calc_loss_percent(actual: float, reference: float) -> float:
-        if reference <= 0:
-            return 0.0
-        return ((reference - actual) / reference) * 100
-
 # ==============================================================================
 # MAIN APPLICATION
 # ==============================================================================
@@ -661,9 +321,32 @@ class CurrencyCalculatorApp:
         
         self.results = {}
         
+        # Exchange methods of the current country (compiled once per method list)
+        self.method_vars: Dict[str, tk.StringVar] = {}
+        self._load_methods()
+        
+        # Background rate refresh (see _fetch_nbg_rates / _poll_rate_fetch)
+        self._fetch_job: Optional[RateFetchJob] = None
+        self._fetch_poll_id = None
+        self._fetch_done_sources = []
+        
+        # Other background work (see _run_in_worker): task name -> root.after id
+        self._workers: Dict[str, str] = {}
+        
+        # Scheduled refresh per source cadence (see _poll_scheduler)
+        self.scheduler = RateScheduler([self.country_key])
+        self._scheduled_values = {}
+        self._scheduled_version = 0
+        self._scheduler_poll_id = None
+        # Текст, который загрузка последней положила в поле: если он другой, поле правили вручную
+        self._fetched_texts = {key: var.get() for key, var in self._rate_fields().items()}
+        if self.settings.get("auto_refresh", False):
+            self.scheduler.start()
+        
         self._apply_theme()
         self._create_ui()
         self.calculate()
+        self._scheduler_poll_id = self.root.after(SCHEDULER_POLL_MS, self._poll_scheduler)
         
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
@@ -847,6 +530,18 @@ class CurrencyCalculatorApp:
                              command=self._toggle_theme)
         theme_btn.pack(side="right", padx=10, pady=10)
         
+        # Scheduled refresh toggle (off by default: fields change only on request)
+        self.auto_refresh_btn = tk.Button(header,
+                                          text=self._auto_refresh_text(),
+                                          font=("Segoe UI", 10),
+                                          bg=self.colors["bg_card"],
+                                          fg=self.colors["fg"],
+                                          bd=0,
+                                          padx=10,
+                                          cursor="hand2",
+                                          command=self._toggle_auto_refresh)
+        self.auto_refresh_btn.pack(side="right", padx=(10, 0), pady=10)
+        
         # Refresh button
         refresh_text = f"🔄 Авто-Курсы"
         self.refresh_btn = tk.Button(header,
@@ -860,16 +555,35 @@ class CurrencyCalculatorApp:
                                cursor="hand2",
                                command=self._fetch_nbg_rates)
         self.refresh_btn.pack(side="right", padx=10, pady=10)
+        if self._fetch_job is not None:
+            # UI rebuilt (theme toggle) while a refresh is still running
+            self.refresh_btn.configure(text="⏳ Загрузка...", state="disabled")
     
     def _update_window_title(self):
         """Update window title based on current country"""
         c = self.country
         self.root.title(f"💱 Currency Arbitrage Calculator | {c['flag']} {c['city']}")
     
+    def _load_methods(self):
+        """Compile the current country's method list, create vars for their own inputs"""
+        try:
+            self.methods = REGISTRY.for_profile(self.country)
+        except (KeyError, ValueError, SyntaxError) as e:
+            print(f"Methods error ({self.country_key}): {e}")
+            self.methods = REGISTRY.compile(DEFAULT_METHODS)
+        
+        saved = self.settings.get("method_inputs") or {}
+        rates = self.country.get("default_rates", {})
+        for name, default in self.methods.defaults().items():
+            if name not in self.method_vars:
+                value = saved.get(name, rates.get(name, default))
+                self.method_vars[name] = tk.StringVar(value=str(value))
+    
     def _change_country(self, country_key: str):
         """Change country and refresh entire UI"""
         self.country_key = country_key
         self.country = self.all_countries[country_key]
+        self._load_methods()
         
         # Apply default rates for new country
         defaults = self.country.get("default_rates", {})
@@ -879,6 +593,15 @@ class CurrencyCalculatorApp:
             self.direct_var.set(str(defaults.get("direct_rate", 1.0)))
             self.eur_usd_var.set(str(defaults.get("eur_usd_rate", 1.0)))
             self.usd_gel_var.set(str(defaults.get("usd_gel_rate", 1.0)))
+            for name in self.methods.extra_inputs:
+                if name in defaults:
+                    self.method_vars[name].set(str(defaults[name]))
+        
+        # Results of a refresh for the previous country are no longer relevant
+        self._cancel_rate_fetch()
+        self.scheduler.set_countries([country_key])
+        self._scheduled_values = {}
+        self._fetched_texts = {key: var.get() for key, var in self._rate_fields().items()}
         
         # Save country selection
         self.settings.set("country", country_key)
@@ -1138,7 +861,19 @@ class CurrencyCalculatorApp:
                             pady=10,
                             cursor="hand2",
                             command=self.calculate)
-        calc_btn.pack(fill="x", pady=(10, 15))
+        calc_btn.pack(fill="x", pady=(10, 5))
+        
+        # Risk simulation (Monte Carlo over stale rates)
+        self.risk_btn = tk.Button(panel,
+                            text="🎲 Риск: устаревшие курсы",
+                            font=("Segoe UI", 9),
+                            bg=self.colors["bg_card"],
+                            fg=self.colors["fg_secondary"],
+                            bd=0,
+                            pady=4,
+                            cursor="hand2",
+                            command=self._show_risk_simulation)
+        self.risk_btn.pack(fill="x", pady=(0, 15))
         
         # ===== Central Bank Reference (dynamic) =====
         c = self.country
@@ -1178,6 +913,17 @@ class CurrencyCalculatorApp:
             ],
             date_var=self.cash_date_var
         )
+        
+        # ===== Additional methods from the country profile =====
+        for method in self.methods.methods:
+            if method.key in DEFAULT_METHODS or not method.inputs:
+                continue
+            self._create_method_section(
+                panel,
+                f"{method.icon} {method.name.upper()}",
+                self.colors["accent"],
+                [(label, self.method_vars[name]) for name, (label, _) in method.inputs.items()]
+            )
     
     def _create_method1_section(self, parent):
         """Create Method 1 section with built-in rate calculator"""
@@ -1296,6 +1042,15 @@ class CurrencyCalculatorApp:
                              command=self._apply_trans_rate)
         apply_btn.pack(side="right")
         
+        # Bulk: implied rates from a whole bank statement
+        import_btn = tk.Button(calc_frame, text="📄 Импорт выписки (CSV/OFX)",
+                              font=("Segoe UI", 9),
+                              bg=self.colors["bg_secondary"], fg=self.colors["fg"],
+                              bd=0, padx=10, pady=2,
+                              cursor="hand2",
+                              command=self._import_statement)
+        import_btn.pack(anchor="w", padx=8, pady=(3, 5))
+        
         # Current rate field (editable)
         rate_frame = tk.Frame(content, bg=self.colors["bg_card"])
         rate_frame.pack(fill="x", pady=2)
@@ -1334,6 +1089,53 @@ class CurrencyCalculatorApp:
         except:
             pass
     
+    def _import_statement(self):
+        """Implied card rates from a bank statement -> direct rate field + history"""
+        path = filedialog.askopenfilename(
+            title="Выписка банка",
+            filetypes=[("Выписки", "*.csv *.txt *.ofx *.qfx"), ("Все файлы", "*.*")])
+        if not path:
+            return
+        local = self.country["local_currency"]
+        country_key = self.country_key
+        
+        def work():
+            # Разбор и запись истории - в фоне: выписка может быть на сотни тысяч строк
+            summary = import_file(path, local)
+            if summary.suggested_rate() is not None:
+                try:
+                    summary.record_history(HISTORY, country_key)
+                except (OSError, ValueError) as e:
+                    print(f"History write error: {e}")
+            return summary
+        
+        self._run_in_worker("statement", work,
+                            lambda summary, error: self._apply_statement(summary, error, local))
+    
+    def _apply_statement(self, summary, error: Optional[Exception], local: str):
+        """Show an imported statement and put its rate into the direct rate field"""
+        if error is not None:
+            messagebox.showerror("Импорт выписки", f"Не удалось прочитать выписку:\n{error}")
+            return
+        rate = summary.suggested_rate()
+        if rate is None:
+            messagebox.showwarning("Импорт выписки", f"Операций в {local} не найдено")
+            return
+        
+        self.trans_rate_var.set(f"{rate:.4f}")
+        self.trans_rate_label.configure(text=f"{rate:.4f}")
+        self.direct_var.set(f"{rate:.4f}")
+        self.calculate()
+        
+        lines = [f"{summary.transactions:,} операций в {local}, {len(summary.by_day)} дней"
+                 + (f" (возвратов пропущено: {summary.refunds})" if summary.refunds else ""),
+                 f"Курс (медиана за {RECENT_DAYS} дней): {rate:.4f} {local}/EUR", "",
+                 "Продавцы (медиана / усечённое среднее):"]
+        for name, stats in list(summary.merchants().items())[:5]:
+            lines.append(f"  {name[:28]}: {stats['median']:.4f} / {stats['trimmed_mean']:.4f} "
+                         f"({stats['count']} опер.)")
+        messagebox.showinfo("📄 Импорт выписки", "\n".join(lines))
+    
     def _create_method_section(self, parent, title: str, color: str, fields: list, date_var=None):
         """Create a colored section for a method with optional date field"""
         # Section container with colored left border
@@ -1414,7 +1216,8 @@ class CurrencyCalculatorApp:
                             highlightbackground=self.colors["border"],
                             highlightcolor=color)
             entry.pack(fill="x", pady=(2, 0), ipady=4)
-            entry.bind("<Return>", lambda e: self.calculate())
+            entry.bind("<Return>", lambda e: self._commit_rates(recalculate=True))
+            entry.bind("<FocusOut>", lambda e: self._commit_rates())
             
             if hint:
                 hint_lbl = tk.Label(field_frame, text=hint,
@@ -1463,6 +1266,8 @@ class CurrencyCalculatorApp:
         # Results container
         self.results_container = tk.Frame(self.results_panel, bg=self.colors["bg_secondary"])
         self.results_container.pack(fill="both", expand=True)
+        
+        self._build_results_table()
     
     def _create_chart_panel(self, parent):
         """Create chart panel"""
@@ -1479,6 +1284,9 @@ class CurrencyCalculatorApp:
         # Chart container
         self.chart_container = tk.Frame(self.chart_panel, bg=self.colors["bg_secondary"])
         self.chart_container.pack(fill="both", expand=True)
+        
+        if not HAS_MATPLOTLIB:
+            self._build_chart_canvas()
     
     def _create_recommendation_banner(self, parent):
         """Create recommendation banner"""
@@ -1530,60 +1338,69 @@ class CurrencyCalculatorApp:
         except ValueError:
             return default
     
+    def _read_inputs(self) -> dict:
+        """Current rates and fees as Calculator.compare keywords"""
+        return {
+            "nbg_rate": self._get_float(self.nbg_var, 3.1515),
+            "direct_rate": self._get_float(self.direct_var, 3.02),
+            "eur_usd": self._get_float(self.eur_usd_var, 1.16),
+            "usd_gel": self._get_float(self.usd_gel_var, 2.69),
+            "street_rate": self._get_float(self.street_var, 3.143),
+            "ibt_fee": self._get_float(self.ibt_fee_var, 1.5),
+            "atm_fee_pct": self._get_float(self.atm_fee_pct_var, 1.5),
+            "atm_fee_fix": self._get_float(self.atm_fee_fix_var, 1.0),
+            **{name: self._get_float(var) for name, var in self.method_vars.items()},
+        }
+    
     def calculate(self):
         """Perform calculation and update UI"""
         # Get values
         spend_eur = self._get_float(self.amount_var, 100.0)
-        nbg_rate = self._get_float(self.nbg_var, 3.1515)
-        direct_rate = self._get_float(self.direct_var, 3.02)
-        eur_usd = self._get_float(self.eur_usd_var, 1.16)
-        usd_gel = self._get_float(self.usd_gel_var, 2.69)
-        street_rate = self._get_float(self.street_var, 3.143)
-        ibt_fee = self._get_float(self.ibt_fee_var, 1.5)
-        atm_fee_pct = self._get_float(self.atm_fee_pct_var, 1.5)
-        atm_fee_fix = self._get_float(self.atm_fee_fix_var, 1.0)
+        inputs = self._read_inputs()
         
         if spend_eur <= 0:
             messagebox.showwarning("Ошибка", "Введите корректную сумму!")
             return
         
-        # Calculate scenarios
-        nbg_ref = Calculator.calc_nbg_reference(spend_eur, nbg_rate)
-        direct_gel = Calculator.calc_direct(spend_eur, direct_rate)
-        transfer_gel = Calculator.calc_transfer(spend_eur, ibt_fee, eur_usd, usd_gel)
-        cash_gel = Calculator.calc_cash(spend_eur, atm_fee_pct, atm_fee_fix, street_rate)
-        
-        # Calculate losses
-        direct_loss = Calculator.calc_loss_percent(direct_gel, nbg_ref)
-        transfer_loss = Calculator.calc_loss_percent(transfer_gel, nbg_ref)
-        cash_loss = Calculator.calc_loss_percent(cash_gel, nbg_ref)
+        # Calculate scenarios and losses (повторный расчёт тех же полей - из кэша)
+        comparison = QUOTE_CACHE.compare(self.country_key, spend_eur, inputs,
+                                         self.methods.compare, self.methods.keys)
+        winner_key = comparison.pop("winner")
         
         # Store results
-        self.results = {
-            "nbg": nbg_ref,
-            "direct": {"gel": direct_gel, "loss": direct_loss, "name": "💳 Прямая оплата IBT"},
-            "transfer": {"gel": transfer_gel, "loss": transfer_loss, "name": "📲 Перевод IBT→Credo"},
-            "cash": {"gel": cash_gel, "loss": cash_loss, "name": "💵 Наличные (ATM+Обменник)"},
-        }
-        
-        # Find winner
-        winner_key = max(["direct", "transfer", "cash"], 
-                        key=lambda k: self.results[k]["gel"])
+        self.results = comparison
+        for method in self.methods.methods:
+            self.results[method.key]["name"] = method.label
         
         # Update UI
         self._update_results_table(winner_key)
+        self._update_breakeven_hint(inputs)
         self._update_chart()
         self._update_banner(winner_key, spend_eur)
         
         # Save settings
         self._save_current_settings()
     
-    def _update_results_table(self, winner_key: str):
-        """Update results table"""
-        # Clear previous
-        for widget in self.results_container.winfo_children():
-            widget.destroy()
-        
+    def _commit_rates(self, recalculate: bool = False):
+        """A rate field was committed (Enter or focus left it): record the manual rates"""
+        if recalculate:
+            self.calculate()
+        self._record_history(self._read_inputs())
+    
+    def _record_history(self, inputs: dict):
+        """Append the rates in use to the history, dated by the fields' dates"""
+        dates = {"nbg_date": self.nbg_date_var.get(), "direct_date": self.direct_date_var.get(),
+                 "transfer_date": self.transfer_date_var.get(), "cash_date": self.cash_date_var.get()}
+        try:
+            for rate, date_key in MANUAL_RATE_DATES.items():
+                if inputs[rate] > 0:
+                    HISTORY.series(self.country_key, "manual", rate).append(
+                        parse_day(dates[date_key]), inputs[rate])
+        except (OSError, ValueError) as e:
+            print(f"History write error: {e}")
+    
+    def _build_results_table(self):
+        """Create the results table widgets once; calculate() only reconfigures them"""
         # Header
         header = tk.Frame(self.results_container, bg=self.colors["bg_card"])
         header.pack(fill="x", pady=(0, 5))
@@ -1606,11 +1423,12 @@ class CurrencyCalculatorApp:
                 bg=self.colors["border"],
                 fg=self.colors["fg_secondary"],
                 width=18).pack(side="left", padx=5, pady=8)
-        tk.Label(ref_row, text=f"{self.results['nbg']:.2f}",
-                font=("Segoe UI", 10, "bold"),
-                bg=self.colors["border"],
-                fg=self.colors["accent"],
-                width=12).pack(side="left", padx=5, pady=8)
+        self.ref_value_label = tk.Label(ref_row, text="—",
+                                        font=("Segoe UI", 10, "bold"),
+                                        bg=self.colors["border"],
+                                        fg=self.colors["accent"],
+                                        width=12)
+        self.ref_value_label.pack(side="left", padx=5, pady=8)
         tk.Label(ref_row, text="0.00%",
                 bg=self.colors["border"],
                 fg=self.colors["fg_secondary"],
@@ -1620,57 +1438,131 @@ class CurrencyCalculatorApp:
                 fg=self.colors["fg_secondary"],
                 width=12).pack(side="left", padx=5, pady=8)
         
-        # Data rows
-        for key in ["direct", "transfer", "cash"]:
-            data = self.results[key]
-            is_winner = (key == winner_key)
-            
-            row_bg = self.colors["profit"] if is_winner else self.colors["bg_card"]
-            text_fg = "#000000" if is_winner else self.colors["fg"]
-            
-            row = tk.Frame(self.results_container, bg=row_bg,
-                          highlightthickness=2 if is_winner else 0,
+        # Data rows: widgets kept in self.result_rows[key]
+        self.result_rows = {}
+        for key in self.methods.keys:
+            row = tk.Frame(self.results_container, bg=self.colors["bg_card"],
+                          highlightthickness=0,
                           highlightbackground=self.colors["profit"])
             row.pack(fill="x", pady=2)
             
-            # Name
-            name_text = data["name"] + (" 👑" if is_winner else "")
-            tk.Label(row, text=name_text,
-                    font=("Segoe UI", 10, "bold" if is_winner else "normal"),
-                    bg=row_bg,
-                    fg=text_fg,
-                    width=18,
-                    anchor="w").pack(side="left", padx=5, pady=12)
+            name = tk.Label(row, font=("Segoe UI", 10, "normal"),
+                           bg=self.colors["bg_card"], fg=self.colors["fg"],
+                           width=18, anchor="w")
+            name.pack(side="left", padx=5, pady=12)
             
-            # Amount received
-            tk.Label(row, text=f"{data['gel']:.2f} {self.country['local_symbol']}",
-                    font=("Segoe UI", 12, "bold"),
-                    bg=row_bg,
-                    fg=text_fg,
-                    width=12).pack(side="left", padx=5, pady=12)
+            amount = tk.Label(row, font=("Segoe UI", 12, "bold"),
+                             bg=self.colors["bg_card"], fg=self.colors["fg"],
+                             width=12)
+            amount.pack(side="left", padx=5, pady=12)
             
-            # Loss %
-            loss_fg = self.colors["loss"] if not is_winner else text_fg
-            tk.Label(row, text=f"-{data['loss']:.2f}%",
-                    font=("Segoe UI", 10),
-                    bg=row_bg,
-                    fg=loss_fg,
-                    width=12).pack(side="left", padx=5, pady=12)
+            loss_pct = tk.Label(row, font=("Segoe UI", 10),
+                               bg=self.colors["bg_card"], fg=self.colors["loss"],
+                               width=12)
+            loss_pct.pack(side="left", padx=5, pady=12)
+            
+            loss_abs = tk.Label(row, font=("Segoe UI", 10),
+                               bg=self.colors["bg_card"], fg=self.colors["loss"],
+                               width=12)
+            loss_abs.pack(side="left", padx=5, pady=12)
             
-            # Loss in local currency
+            self.result_rows[key] = {"row": row, "name": name, "amount": amount,
+                                     "loss_pct": loss_pct, "loss_abs": loss_abs}
+        
+        # Break-even hint: where each method wins over all amounts
+        self.breakeven_label = tk.Label(self.results_container, text="",
+                                        font=("Segoe UI", 9),
+                                        bg=self.colors["bg_card"],
+                                        fg=self.colors["fg_secondary"],
+                                        anchor="w", justify="left")
+        self.breakeven_label.pack(fill="x", padx=5, pady=(6, 0))
+    
+    def _update_results_table(self, winner_key: str):
+        """Update results table in place (text, colours, winner highlight)"""
+        self.ref_value_label.configure(text=f"{self.results['nbg']:.2f}")
+        
+        for key, widgets in self.result_rows.items():
+            data = self.results[key]
+            is_winner = (key == winner_key)
+            
+            row_bg = self.colors["profit"] if is_winner else self.colors["bg_card"]
+            text_fg = "#000000" if is_winner else self.colors["fg"]
+            loss_fg = self.colors["loss"] if not is_winner else text_fg
             loss_gel = self.results["nbg"] - data["gel"]
-            tk.Label(row, text=f"-{loss_gel:.2f} {self.country['local_symbol']}",
-                    font=("Segoe UI", 10),
-                    bg=row_bg,
-                    fg=loss_fg,
-                    width=12).pack(side="left", padx=5, pady=12)
+            
+            widgets["row"].configure(bg=row_bg, highlightthickness=2 if is_winner else 0)
+            widgets["name"].configure(text=data["name"] + (" 👑" if is_winner else ""),
+                                      font=("Segoe UI", 10, "bold" if is_winner else "normal"),
+                                      bg=row_bg, fg=text_fg)
+            widgets["amount"].configure(text=f"{data['gel']:.2f} {self.country['local_symbol']}",
+                                        bg=row_bg, fg=text_fg)
+            widgets["loss_pct"].configure(text=f"-{data['loss']:.2f}%", bg=row_bg, fg=loss_fg)
+            widgets["loss_abs"].configure(text=f"-{loss_gel:.2f} {self.country['local_symbol']}",
+                                          bg=row_bg, fg=loss_fg)
+    
+    def _update_breakeven_hint(self, inputs: dict):
+        """Show amount ranges where each method wins (closed form, cheap per keystroke)"""
+        if self.methods.keys != DEFAULT_METHODS:
+            # Решатель знает только три встроенных метода
+            self.breakeven_label.configure(text="")
+            return
+        ranges = solve_breakeven(**{k: inputs[k] for k in SHARED_INPUTS})["ranges"]
+        short = {"direct": "💳 карта", "transfer": "📲 перевод", "cash": "💵 наличные"}
+        parts = []
+        for lo, hi, key in ranges:
+            if hi == float("inf"):
+                span = f"от {lo:.2f} EUR" if lo > 0 else "при любой сумме"
+            elif lo <= 0:
+                span = f"до {hi:.2f} EUR"
+            else:
+                span = f"{lo:.2f}–{hi:.2f} EUR"
+            parts.append(f"{short[key]} {span}")
+        self.breakeven_label.configure(text="📐 Выгоднее: " + " · ".join(parts))
+    
+    def _show_risk_simulation(self):
+        """Monte Carlo: how likely each method wins given how old the rates are"""
+        spend_eur = self._get_float(self.amount_var, 100.0)
+        if spend_eur <= 0:
+            messagebox.showwarning("Ошибка", "Введите корректную сумму!")
+            return
+        
+        dates = {"direct_date": self.direct_date_var.get(),
+                 "transfer_date": self.transfer_date_var.get(),
+                 "cash_date": self.cash_date_var.get()}
+        ages = rate_ages(dates)
+        inputs = self._read_inputs()
+        # Модель волатильности описывает только три встроенных метода
+        inputs = {k: inputs[k] for k in SHARED_INPUTS}
+        # 200k сценариев без NumPy ~1 с: считаем в фоне, окно не замирает
+        started = self._run_in_worker("risk", lambda: MonteCarlo(spend_eur, inputs, ages).run(RISK_PATHS),
+                                      lambda result, error: self._show_risk_result(result, error, ages))
+        if started:
+            self.risk_btn.configure(text="⏳ Риск-анализ...", state="disabled")
+    
+    def _show_risk_result(self, result: Optional[dict], error: Optional[Exception], ages: dict):
+        self.risk_btn.configure(text="🎲 Риск: устаревшие курсы", state="normal")
+        if error is not None:
+            messagebox.showerror("🎲 Риск-анализ", f"Не удалось посчитать сценарии:\n{error}")
+            return
+        names = {"direct": "💳 Карта IBT", "transfer": "📲 Перевод", "cash": "💵 Наличные"}
+        symbol = self.country["local_symbol"]
+        lines = [f"Возраст курсов (дней): карта {ages['direct_rate']:.0f}, "
+                 f"перевод {ages['eur_usd']:.0f}, наличные {ages['street_rate']:.0f}", ""]
+        for key, name in names.items():
+            m = result["methods"][key]
+            lines.append(f"{name}: выигрывает в {result['win_prob'][key] * 100:.1f}% случаев")
+            lines.append(f"    90%: {m['p5']:.2f} … {m['p95']:.2f} {symbol} (медиана {m['p50']:.2f})")
+        lines.append("")
+        lines.append(f"{result['paths']:,} сценариев")
+        if self.methods.keys != DEFAULT_METHODS:
+            lines.append("Учтены только встроенные методы (карта, перевод, наличные)")
+        messagebox.showinfo("🎲 Риск-анализ", "\n".join(lines))
     
     def _update_chart(self):
         """Update chart"""
-        for widget in self.chart_container.winfo_children():
-            widget.destroy()
-        
         if HAS_MATPLOTLIB:
+            for widget in self.chart_container.winfo_children():
+                widget.destroy()
             self._draw_matplotlib_chart()
         else:
             self._draw_text_chart()
@@ -1761,229 +1653,200 @@ class CurrencyCalculatorApp:
         canvas.draw()
         canvas.get_tk_widget().pack(fill="both", expand=True)
     
-    def _draw_text_chart(self):
-        """Draw Apple-style card visualization"""
-        # Header with subtle styling
-        header_frame = tk.Frame(self.chart_container, bg=self.colors["bg_secondary"])
-        header_frame.pack(fill="x", pady=(0, 15))
-        
-        tk.Label(header_frame, 
-                text="Сравнение методов",
-                font=("Segoe UI", 13, "bold"),
-                bg=self.colors["bg_secondary"],
-                fg=self.colors["fg"]).pack(side="left")
-        
-        tk.Label(header_frame,
-                text=self.country['local_currency'],
-                font=("Segoe UI", 11),
-                bg=self.colors["bg_secondary"],
-                fg=self.colors["fg_secondary"]).pack(side="right")
-        
-        # Method cards data
-        methods_data = [
-            ("💳", "Карта IBT", "Прямая оплата", 
-             self.results["direct"]["gel"], self.results["direct"]["loss"], 
-             self.colors.get("chart_bar_1", self.colors["loss"])),
-            ("📲", "Перевод Credo", "Через приложение", 
-             self.results["transfer"]["gel"], self.results["transfer"]["loss"],
-             self.colors.get("chart_bar_2", self.colors["warning"])),
-            ("💵", "Наличные", "ATM + Обменник", 
-             self.results["cash"]["gel"], self.results["cash"]["loss"],
-             self.colors.get("chart_bar_3", self.colors["profit"])),
-        ]
+    CHART_TOP = 36          # header height
+    CARD_HEIGHT = 92
+    CARD_GAP = 12
+    REF_CARD_HEIGHT = 72
+    CHART_ANIM_STEPS = 8
+    CHART_ANIM_MS = 16
+    
+    def _build_chart_canvas(self):
+        """Create the card view once: one Canvas with an item per card element"""
+        # UI rebuilt (theme / country) while the old canvas was animating
+        if getattr(self, "_chart_anim_id", None) is not None:
+            self.root.after_cancel(self._chart_anim_id)
+        c = self.colors
+        # Apple-style comparison cards: (key, icon, name, subtitle)
+        self._chart_methods = [(m.key, m.icon, m.name, m.subtitle) for m in self.methods.methods]
+        cards_height = len(self._chart_methods) * (self.CARD_HEIGHT + self.CARD_GAP)
+        cv = tk.Canvas(self.chart_container,
+                       bg=c["bg_secondary"],
+                       highlightthickness=0,
+                       height=self.CHART_TOP + cards_height + 15 + self.REF_CARD_HEIGHT + 4)
+        cv.pack(fill="both", expand=True)
+        self.chart_canvas = cv
+        
+        def text(tags, font, fill, anchor="w", value=""):
+            return cv.create_text(0, 0, text=value, font=font, fill=fill, anchor=anchor, tags=tags)
+        
+        def rect(tags, fill, outline=""):
+            return cv.create_rectangle(0, 0, 0, 0, fill=fill, outline=outline, tags=tags)
+        
+        self._chart_items = {
+            "title": text(("header",), ("Segoe UI", 13, "bold"), c["fg"], value="Сравнение методов"),
+            "currency": text(("header",), ("Segoe UI", 11), c["fg_secondary"], "e",
+                             self.country['local_currency']),
+        }
         
-        max_val = max(d[3] for d in methods_data)
-        nbg_val = self.results["nbg"]
+        loss_gap_color = "#3a2020" if self.current_theme == "dark" else "#ffcccc"
+        for key, icon, name, subtitle in self._chart_methods:
+            tags = ("card", f"card_{key}")
+            self._chart_items[key] = {
+                "bg": rect(tags, c["bg_card"], c["border"]),
+                "icon": text(tags, ("Segoe UI Emoji", 20), c["fg"], value=icon),
+                "name": text(tags, ("Segoe UI", 12, "bold"), c["fg"], value=name),
+                "subtitle": text(tags, ("Segoe UI", 9), c["fg_secondary"], value=subtitle),
+                "value": text(tags, ("Segoe UI", 16, "bold"), c["fg"], "e"),
+                "loss": text(tags, ("Segoe UI", 9), c["fg_secondary"], "e"),
+                # Progress bar: track (NBG = 100%), achieved fill, loss gap
+                "track": rect(tags + ("bar",), c["border"]),
+                "fill": rect(tags + ("bar",), c["profit"]),
+                "gap": rect(tags + ("bar",), loss_gap_color),
+                "pct": text(tags, ("Segoe UI", 8), c["fg"]),
+                "badge": text(tags, ("Segoe UI", 8, "bold"), c["fg"], "e"),
+            }
+        
+        # NBG Reference card (100% full - the benchmark)
+        tags = ("card", "card_ref")
+        self._chart_items["ref"] = {
+            "bg": rect(tags, c["bg_card"], c["accent"]),
+            "icon": text(tags, ("Segoe UI Emoji", 16), c["fg"], value="🏛️"),
+            "name": text(tags, ("Segoe UI", 11, "bold"), c["accent"],
+                         value=f"Эталон {self.country['central_bank']}"),
+            "subtitle": text(tags, ("Segoe UI", 8), c["fg_secondary"],
+                             value=self.country['central_bank_full']),
+            "value": text(tags, ("Segoe UI", 14, "bold"), c["accent"], "e"),
+            "track": rect(tags + ("bar",), c["accent"]),
+            "pct": text(tags, ("Segoe UI", 8, "bold"), c["accent"], value="100%"),
+        }
+        
+        # Bar fill fractions currently on screen / animation target
+        self._chart_shown = {key: 0.0 for key, *_ in self._chart_methods}
+        self._chart_target = dict(self._chart_shown)
+        self._chart_anim_id = None
+        self._chart_anim_step = 0
+        self._chart_anim_start = dict(self._chart_shown)
         
-        for icon, name, subtitle, val, loss, default_color in methods_data:
-            is_best = val == max_val
-            is_worst = val == min(d[3] for d in methods_data)
+        cv.bind("<Configure>", lambda e: self._layout_chart())
+        self._layout_chart()
+    
+    def _chart_width(self) -> int:
+        width = self.chart_canvas.winfo_width()
+        return width if width > 50 else 380   # not mapped yet
+    
+    def _layout_chart(self):
+        """Position every card item for the current canvas width"""
+        cv = self.chart_canvas
+        items = self._chart_items
+        w = self._chart_width()
+        
+        cv.coords(items["title"], 0, self.CHART_TOP / 2 - 4)
+        cv.coords(items["currency"], w, self.CHART_TOP / 2 - 4)
+        
+        y = self.CHART_TOP
+        for key, *_ in self._chart_methods:
+            it = items[key]
+            cv.coords(it["bg"], 1, y, w - 1, y + self.CARD_HEIGHT)
+            cv.coords(it["icon"], 16, y + 32)
+            cv.coords(it["name"], 62, y + 22)
+            cv.coords(it["subtitle"], 62, y + 42)
+            cv.coords(it["value"], w - 18, y + 24)
+            cv.coords(it["loss"], w - 18, y + 46)
+            cv.coords(it["pct"], self._bar_x1(w) + 8, y + 71)
+            cv.coords(it["badge"], w - 18, y + 71)
+            y += self.CARD_HEIGHT + self.CARD_GAP
+        
+        y += 15 - self.CARD_GAP
+        it = items["ref"]
+        cv.coords(it["bg"], 1, y, w - 1, y + self.REF_CARD_HEIGHT)
+        cv.coords(it["icon"], 16, y + 28)
+        cv.coords(it["name"], 56, y + 20)
+        cv.coords(it["subtitle"], 56, y + 38)
+        cv.coords(it["value"], w - 18, y + 22)
+        cv.coords(it["track"], 56, y + 52, self._bar_x1(w), y + 60)
+        cv.coords(it["pct"], self._bar_x1(w) + 8, y + 56)
+        
+        self._place_bars()
+    
+    @staticmethod
+    def _bar_x1(width: int) -> int:
+        return max(120, width - 150)
+    
+    def _place_bars(self):
+        """Set track / fill / gap geometry from self._chart_shown"""
+        cv = self.chart_canvas
+        w = self._chart_width()
+        x0, x1 = 62, self._bar_x1(w)
+        y = self.CHART_TOP
+        for key, *_ in self._chart_methods:
+            it = self._chart_items[key]
+            fill_x = x0 + (x1 - x0) * self._chart_shown[key]
+            cv.coords(it["track"], x0, y + 66, x1, y + 76)
+            cv.coords(it["fill"], x0, y + 66, fill_x, y + 76)
+            cv.coords(it["gap"], fill_x, y + 66, x1, y + 76)
+            y += self.CARD_HEIGHT + self.CARD_GAP
+    
+    def _draw_text_chart(self):
+        """Update the Apple-style cards in place and animate the bars"""
+        cv = self.chart_canvas
+        c = self.colors
+        nbg_val = self.results["nbg"]
+        values = {key: self.results[key]["gel"] for key, *_ in self._chart_methods}
+        max_val = max(values.values())
+        min_val = min(values.values())
+        
+        for key, *_ in self._chart_methods:
+            it = self._chart_items[key]
+            val = values[key]
+            loss = self.results[key]["loss"]
             
             # Choose color based on position
-            if is_best:
-                bar_color = self.colors["profit"]
-                badge_text = "✓ ЛУЧШИЙ"
-                badge_color = self.colors["profit"]
-            elif is_worst:
-                bar_color = self.colors["loss"]
-                badge_text = "✗ ХУДШИЙ"
-                badge_color = self.colors["loss"]
+            if val == max_val:
+                bar_color, badge_text = c["profit"], "✓ ЛУЧШИЙ"
+            elif val == min_val:
+                bar_color, badge_text = c["loss"], "✗ ХУДШИЙ"
             else:
-                bar_color = self.colors["warning"]
-                badge_text = ""
-                badge_color = None
-            
-            # Card container
-            card = tk.Frame(self.chart_container, 
-                           bg=self.colors["bg_card"],
-                           highlightthickness=1,
-                           highlightbackground=self.colors["border"])
-            card.pack(fill="x", pady=6, ipady=12, ipadx=12)
-            
-            # Left side: Icon + Text
-            left_frame = tk.Frame(card, bg=self.colors["bg_card"])
-            left_frame.pack(side="left", fill="y", padx=(10, 15))
-            
-            # Icon in colored circle
-            icon_lbl = tk.Label(left_frame, text=icon,
-                               font=("Segoe UI Emoji", 20),
-                               bg=self.colors["bg_card"],
-                               fg=self.colors["fg"])
-            icon_lbl.pack(side="left", padx=(0, 10))
+                bar_color, badge_text = c["warning"], ""
             
-            # Name and subtitle
-            text_frame = tk.Frame(left_frame, bg=self.colors["bg_card"])
-            text_frame.pack(side="left")
-            
-            tk.Label(text_frame, text=name,
-                    font=("Segoe UI", 12, "bold"),
-                    bg=self.colors["bg_card"],
-                    fg=self.colors["fg"]).pack(anchor="w")
-            
-            tk.Label(text_frame, text=subtitle,
-                    font=("Segoe UI", 9),
-                    bg=self.colors["bg_card"],
-                    fg=self.colors["fg_secondary"]).pack(anchor="w")
-            
-            # Right side: Value + Progress
-            right_frame = tk.Frame(card, bg=self.colors["bg_card"])
-            right_frame.pack(side="right", fill="y", padx=(10, 25))
-            
-            # Value
-            val_frame = tk.Frame(right_frame, bg=self.colors["bg_card"])
-            val_frame.pack(anchor="e")
-            
-            tk.Label(val_frame, text=f"{val:.2f}",
-                    font=("Segoe UI", 16, "bold"),
-                    bg=self.colors["bg_card"],
-                    fg=bar_color).pack(side="left")
-            
-            tk.Label(val_frame, text=f" {self.country['local_symbol']}",
-                    font=("Segoe UI", 12),
-                    bg=self.colors["bg_card"],
-                    fg=self.colors["fg_secondary"]).pack(side="left")
-            
-            # Loss percentage
-            loss_text = f"-{loss:.1f}% от {self.country['central_bank']}"
-            loss_color = self.colors["loss"] if loss > 2 else self.colors["fg_secondary"]
-            tk.Label(right_frame, text=loss_text,
-                    font=("Segoe UI", 9),
-                    bg=self.colors["bg_card"],
-                    fg=loss_color).pack(anchor="e")
-            
-            # Progress bar (iOS style - NBG = 100%)
-            progress_frame = tk.Frame(card, bg=self.colors["bg_card"])
-            progress_frame.pack(side="right", fill="y", padx=10, pady=5)
-            
-            # Background track (this represents 100% = NBG)
-            track_width = 140
-            track_height = 10
-            track = tk.Canvas(progress_frame, 
-                             width=track_width, height=track_height,
-                             bg=self.colors["bg_card"], 
-                             highlightthickness=0)
-            track.pack(pady=5)
-            
-            # Draw full track background (represents NBG = 100%)
-            track.create_rectangle(0, 0, track_width, track_height,
-                                  fill=self.colors["border"], 
-                                  outline="")
-            
-            # Progress fill (percentage of NBG)
             progress_pct = min(val / nbg_val, 1.0) if nbg_val > 0 else 0
-            fill_width = int(track_width * progress_pct)
-            
-            # Fill the achieved amount
-            track.create_rectangle(0, 0, fill_width, track_height,
-                                  fill=bar_color, 
-                                  outline="")
+            self._chart_target[key] = max(progress_pct, 0.0)
             
-            # Show loss gap (the part we're losing)
-            if fill_width < track_width:
-                # Darker area showing loss gap
-                loss_gap_color = "#3a2020" if self.current_theme == "dark" else "#ffcccc"
-                track.create_rectangle(fill_width, 0, track_width, track_height,
-                                      fill=loss_gap_color,
-                                      outline="")
-            
-            # Percentage label below bar
-            pct_text = f"{progress_pct*100:.1f}%"
-            tk.Label(progress_frame, text=pct_text,
-                    font=("Segoe UI", 8),
-                    bg=self.colors["bg_card"],
-                    fg=bar_color).pack()
-            
-            # Badge for best/worst
-            if badge_text:
-                badge_frame = tk.Frame(card, bg=self.colors["bg_card"])
-                badge_frame.pack(side="right", padx=5)
-                
-                tk.Label(badge_frame, text=badge_text,
-                        font=("Segoe UI", 8, "bold"),
-                        bg=self.colors["bg_card"],
-                        fg=badge_color).pack()
-        
-        # NBG Reference bar (100% full - the benchmark)
-        ref_card = tk.Frame(self.chart_container, 
-                           bg=self.colors["bg_card"],
-                           highlightthickness=1,
-                           highlightbackground=self.colors["accent"])
-        ref_card.pack(fill="x", pady=(15, 0), ipady=10, ipadx=10)
-        
-        ref_left = tk.Frame(ref_card, bg=self.colors["bg_card"])
-        ref_left.pack(side="left", padx=10)
-        
-        tk.Label(ref_left, text="🏛️",
-                font=("Segoe UI Emoji", 16),
-                bg=self.colors["bg_card"]).pack(side="left", padx=(0, 8))
-        
-        ref_text = tk.Frame(ref_left, bg=self.colors["bg_card"])
-        ref_text.pack(side="left")
-        
-        tk.Label(ref_text, text=f"Эталон {self.country['central_bank']}",
-                font=("Segoe UI", 11, "bold"),
-                bg=self.colors["bg_card"],
-                fg=self.colors["accent"]).pack(anchor="w")
-        
-        tk.Label(ref_text, text=self.country['central_bank_full'],
-                font=("Segoe UI", 8),
-                bg=self.colors["bg_card"],
-                fg=self.colors["fg_secondary"]).pack(anchor="w")
-        
-        # NBG value and 100% bar
-        ref_right = tk.Frame(ref_card, bg=self.colors["bg_card"])
-        ref_right.pack(side="right", padx=(10, 25))
-        
-        tk.Label(ref_right, text=f"{nbg_val:.2f} {self.country['local_symbol']}",
-                font=("Segoe UI", 14, "bold"),
-                bg=self.colors["bg_card"],
-                fg=self.colors["accent"]).pack(anchor="e")
-        
-        # Full progress bar for NBG
-        ref_bar_frame = tk.Frame(ref_card, bg=self.colors["bg_card"])
-        ref_bar_frame.pack(side="right", padx=10)
-        
-        ref_track = tk.Canvas(ref_bar_frame, 
-                             width=140, height=10,
-                             bg=self.colors["bg_card"], 
-                             highlightthickness=0)
-        ref_track.pack()
-        
-        # Full blue bar = 100%
-        ref_track.create_rectangle(0, 0, 140, 10,
-                                  fill=self.colors["accent"], 
-                                  outline="")
-        
-        tk.Label(ref_bar_frame, text="100%",
-                font=("Segoe UI", 8, "bold"),
-                bg=self.colors["bg_card"],
-                fg=self.colors["accent"]).pack()
+            cv.itemconfigure(it["value"], text=f"{val:.2f} {self.country['local_symbol']}", fill=bar_color)
+            cv.itemconfigure(it["loss"], text=f"-{loss:.1f}% от {self.country['central_bank']}",
+                             fill=c["loss"] if loss > 2 else c["fg_secondary"])
+            cv.itemconfigure(it["fill"], fill=bar_color)
+            cv.itemconfigure(it["pct"], text=f"{progress_pct*100:.1f}%", fill=bar_color)
+            cv.itemconfigure(it["badge"], text=badge_text, fill=bar_color)
+        
+        cv.itemconfigure(self._chart_items["ref"]["value"],
+                         text=f"{nbg_val:.2f} {self.country['local_symbol']}")
+        
+        # Restart the bar animation from whatever is on screen now
+        if self._chart_anim_id is not None:
+            self.root.after_cancel(self._chart_anim_id)
+        self._chart_anim_start = dict(self._chart_shown)
+        self._chart_anim_step = 0
+        self._animate_chart()
+    
+    def _animate_chart(self):
+        """One frame of the bar-width transition (ease-out)"""
+        self._chart_anim_id = None
+        if not self.chart_canvas.winfo_exists():
+            return
+        self._chart_anim_step += 1
+        t = self._chart_anim_step / self.CHART_ANIM_STEPS
+        eased = 1 - (1 - t) ** 3
+        for key, start in self._chart_anim_start.items():
+            self._chart_shown[key] = start + (self._chart_target[key] - start) * eased
+        self._place_bars()
+        if self._chart_anim_step < self.CHART_ANIM_STEPS:
+            self._chart_anim_id = self.root.after(self.CHART_ANIM_MS, self._animate_chart)
     
     def _update_banner(self, winner_key: str, spend_eur: float):
         """Update recommendation banner"""
         winner = self.results[winner_key]
         
-        all_values = [self.results[k]["gel"] for k in ["direct", "transfer", "cash"]]
+        all_values = [self.results[k]["gel"] for k in self.methods.keys]
         min_val = min(all_values)
         savings = winner["gel"] - min_val
         
@@ -1997,11 +1860,17 @@ class CurrencyCalculatorApp:
             subtitle = f"Используйте приложение IBT. Экономия {savings:.2f} {self.country['local_currency']}"
             icon = "📱"
             color = self.colors["warning"]
-        else:
+        elif winner_key == "direct":
             title = "💳 ПЛАТИТЕ КАРТОЙ IBT"
             subtitle = "Странно, но прямая оплата выгоднее (проверьте курсы)"
             icon = "🤔"
             color = self.colors["accent"]
+        else:
+            method = self.methods.by_key[winner_key]
+            title = f"{method.icon} {method.name.upper()}"
+            subtitle = f"{method.subtitle}. Экономия {savings:.2f} {self.country['local_currency']}".lstrip(". ")
+            icon = "🏆"
+            color = self.colors["profit"]
         
         self.banner_icon.configure(text=icon)
         self.banner_title.configure(text=title, fg=color)
@@ -2009,8 +1878,8 @@ class CurrencyCalculatorApp:
         self.banner_savings.configure(text=f"+{winner['gel']:.2f} {self.country['local_symbol']}", fg=color)
         self.banner.configure(highlightbackground=color)
     
-    def _save_current_settings(self):
-        """Save current settings"""
+    def _save_current_settings(self, immediate: bool = False):
+        """Save current settings (debounced unless immediate)"""
         self.settings.set("last_amount", self._get_float(self.amount_var))
         self.settings.set("nbg_rate", self._get_float(self.nbg_var))
         self.settings.set("eur_usd_rate", self._get_float(self.eur_usd_var))
@@ -2020,20 +1889,27 @@ class CurrencyCalculatorApp:
         self.settings.set("ibt_transfer_fee", self._get_float(self.ibt_fee_var))
         self.settings.set("atm_fee_pct", self._get_float(self.atm_fee_pct_var))
         self.settings.set("atm_fee_fix", self._get_float(self.atm_fee_fix_var))
+        if self.method_vars:
+            method_inputs = dict(self.settings.get("method_inputs") or {})
+            method_inputs.update({name: self._get_float(var) for name, var in self.method_vars.items()})
+            self.settings.set("method_inputs", method_inputs)
         self.settings.set("theme", self.current_theme)
         # Save dates
         self.settings.set("nbg_date", self.nbg_date_var.get())
         self.settings.set("direct_date", self.direct_date_var.get())
         self.settings.set("transfer_date", self.transfer_date_var.get())
         self.settings.set("cash_date", self.cash_date_var.get())
-        self.settings.save()
+        if immediate:
+            self.settings.save()
+        else:
+            self.settings.request_save()
     
     def _fetch_nbg_rates(self):
-        """Fetch all available rates automatically"""
+        """Start a background refresh of all available rates"""
         c = self.country
         
-        # Check if API is available for current country
-        if not c.get("central_bank_api"):
+        # Адаптеры: Грузия (NBG + Rico + Frankfurter) и страны с курсами ЕЦБ
+        if not has_adapter(self.country_key):
             messagebox.showwarning(
                 "API недоступен",
                 f"Для {c['name']} автоматическая загрузка курсов пока не реализована.\n"
@@ -2041,56 +1917,224 @@ class CurrencyCalculatorApp:
             )
             return
         
-        # Currently only NBG (Georgia) full API automation is implemented
-        if self.country_key != "georgia":
-            messagebox.showwarning(
-                "API в разработке",
-                f"Автоматизация для {c['name']} пока не реализована.\n"
-                f"Поддерживается только Грузия."
-            )
+        # Already refreshing - ignore repeated clicks
+        if self._fetch_job is not None:
             return
         
-        self.banner_title.configure(text="⏳ Загрузка всех курсов...", 
+        self._fetch_done_sources = []
+        self._fetch_job = RateFetchJob(self.country_key)
+        self._fetch_job.start()
+        self._show_fetch_progress()
+        self._fetch_poll_id = self.root.after(100, self._poll_rate_fetch)
+    
+    def _show_fetch_progress(self):
+        """Show refresh progress in the banner"""
+        total = len(get_adapter(self.country_key).source_names)
+        done = len(self._fetch_done_sources)
+        self.banner_title.configure(text=f"⏳ Загрузка курсов... {done}/{total}",
                                    fg=self.colors["warning"])
-        self.root.update()
+        if self._fetch_done_sources:
+            marks = "  ".join(f"{src} {'✓' if ok else '✗'}" for src, ok in self._fetch_done_sources)
+            self.banner_subtitle.configure(text=marks)
+        else:
+            self.banner_subtitle.configure(text="Запрос к источникам курсов...")
+        self.refresh_btn.configure(text="⏳ Загрузка...", state="disabled")
+    
+    def _poll_rate_fetch(self):
+        """Drain worker messages on the Tk thread"""
+        self._fetch_poll_id = None
+        job = self._fetch_job
+        if job is None or job.cancelled:
+            return
+        
+        while True:
+            try:
+                kind, payload = job.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._fetch_done_sources.append(payload)
+                self._show_fetch_progress()
+            elif kind == "done":
+                self._fetch_job = None
+                self.refresh_btn.configure(text="🔄 Авто-Курсы", state="normal")
+                self._apply_fetched_rates(payload)
+                return
+        
+        self._fetch_poll_id = self.root.after(100, self._poll_rate_fetch)
+    
+    def _run_in_worker(self, name: str, work, on_done) -> bool:
+        """work() in a daemon thread, then on_done(result, error) on the Tk thread.
+
+        Like RateFetchJob the worker never touches Tk; the result is picked
+        up by root.after polling. False if task ``name`` is still running.
+        """
+        if name in self._workers:
+            return False
+        results = queue.Queue(maxsize=1)
+        
+        def run():
+            try:
+                results.put((work(), None))
+            except Exception as e:
+                results.put((None, e))
         
-        rates = RateFetcher.fetch_georgia_rates()
+        threading.Thread(target=run, name=f"Worker-{name}", daemon=True).start()
+        self._workers[name] = self.root.after(WORKER_POLL_MS, self._poll_worker, name, results, on_done)
+        return True
+    
+    def _poll_worker(self, name: str, results: queue.Queue, on_done):
+        try:
+            result, error = results.get_nowait()
+        except queue.Empty:
+            self._workers[name] = self.root.after(WORKER_POLL_MS, self._poll_worker, name, results, on_done)
+            return
+        del self._workers[name]
+        on_done(result, error)
+    
+    def _cancel_rate_fetch(self):
+        """Stop waiting for a running refresh (country switch / window close)"""
+        if self._fetch_poll_id is not None:
+            self.root.after_cancel(self._fetch_poll_id)
+            self._fetch_poll_id = None
+        if self._fetch_job is not None:
+            self._fetch_job.cancel()
+            self._fetch_job = None
+    
+    def _apply_fetched_rates(self, rates: Optional[Dict[str, float]]):
+        """Apply fetched rates to the inputs and recalculate"""
+        success = self._set_fetched_rates(rates)
+        
+        if success:
+            QUOTE_CACHE.invalidate(self.country_key)
+            cache = RateFetcher.cache.stats()
+            success.append(f"🗄 Кэш: {cache['hits']} из кэша, {cache['revalidated']} 304, "
+                           f"{cache['misses']} загружено, {cache['stale']} устаревших")
+            success.extend(self._source_health_lines())
+            self.calculate()
+            messagebox.showinfo("Авто-обновление", "\n".join(success))
+        else:
+            self.banner_title.configure(text="❌ Ошибка загрузки", 
+                                        fg=self.colors["loss"])
+            self.banner_subtitle.configure(text="Проверьте интернет-соединение")
+            messagebox.showerror(
+                "Ошибка API",
+                "\n".join(["Не удалось загрузить курсы.",
+                           "Проверьте интернет-соединение!"] + self._source_health_lines())
+            )
+    
+    def _rate_fields(self) -> Dict[str, tk.StringVar]:
+        """Fetched rate key -> input field it fills"""
+        return {"EUR": self.nbg_var, "street_eur": self.street_var,
+                "credo_usd": self.usd_gel_var, "eur_usd": self.eur_usd_var}
+    
+    def _put_fetched_rate(self, key: str, value: float):
+        var = self._rate_fields()[key]
+        var.set(str(round(value, 4)))
+        self._fetched_texts[key] = var.get()
+    
+    def _set_fetched_rates(self, rates: Optional[Dict[str, float]]) -> list:
+        """Put fetched rates into the input fields; returns a line per rate set"""
+        c = self.country
         success = []
         
         if rates:
             if "EUR" in rates:
-                self.nbg_var.set(str(round(rates["EUR"], 4)))
-                success.append(f"✅ {c['central_bank']}: 1 EUR = {rates['EUR']:.4f} {c['local_currency']}")
+                self._put_fetched_rate("EUR", rates["EUR"])
+                # Для стран ЕЦБ это опорный курс ЕЦБ, а не курс своего центробанка
+                source = (has_adapter(self.country_key)
+                          and get_adapter(self.country_key).reference_source) or c['central_bank']
+                success.append(f"✅ {source}: 1 EUR = {rates['EUR']:.4f} {c['local_currency']}")
                 
             if "street_eur" in rates:
-                self.street_var.set(str(round(rates["street_eur"], 4)))
+                self._put_fetched_rate("street_eur", rates["street_eur"])
                 success.append(f"🏦 Обменник: {rates['street_eur']:.4f}")
                 
             if "credo_usd" in rates:
-                self.usd_gel_var.set(str(round(rates["credo_usd"], 4)))
+                self._put_fetched_rate("credo_usd", rates["credo_usd"])
                 success.append(f"💵 Credo (USD): {rates['credo_usd']:.4f}")
                 
             if "eur_usd" in rates:
-                self.eur_usd_var.set(str(round(rates["eur_usd"], 4)))
+                self._put_fetched_rate("eur_usd", rates["eur_usd"])
                 success.append(f"🌍 EUR/USD кросс-курс: {rates['eur_usd']:.4f}")
                 
             # Если не удалось получить EUR/USD, но есть курсы НБГ, считаем implied
             if "eur_usd" not in rates and "EUR" in rates and "USD" in rates:
                 implied_eur_usd = rates["EUR"] / rates["USD"]
-                self.eur_usd_var.set(str(round(implied_eur_usd, 4)))
+                self._put_fetched_rate("eur_usd", implied_eur_usd)
                 success.append(f"💡 Расчетный EUR/USD: {implied_eur_usd:.4f}")
+        return success
+    
+    def _poll_scheduler(self):
+        """Apply rates the scheduler published since the last poll (Tk thread, never blocks)"""
+        self._scheduler_poll_id = self.root.after(SCHEDULER_POLL_MS, self._poll_scheduler)
+        snapshot = self.scheduler.snapshot()
+        if snapshot.version == self._scheduled_version or self._fetch_job is not None:
+            return
+        self._scheduled_version = snapshot.version
+        
+        # Только курсы, значение которых изменилось (повторная загрузка того же курса
+        # меняет лишь время), и только в поля, которые пользователь не правил вручную
+        stamped = snapshot.rates(self.country_key)
+        changed = {key: rate for key, rate in stamped.items()
+                   if self._scheduled_values.get(key) != rate.value}
+        if not changed:
+            return
+        self._scheduled_values.update({key: rate.value for key, rate in changed.items()})
+        edited = {key for key, var in self._rate_fields().items() if var.get() != self._fetched_texts.get(key)}
+        changed = {key: rate for key, rate in changed.items() if key not in edited}
+        rates = {key: rate.value for key, rate in changed.items()}
+        if "EUR" in rates and "USD" in stamped and "eur_usd" not in edited:
+            rates["USD"] = stamped["USD"].value
+        if not self._set_fetched_rates(rates):
+            return
         
-        if success:
-            messagebox.showinfo("Авто-обновление", "\n".join(success))
-            self.calculate()
+        # Дата курса = когда его выдал источник (раньше выставлялась вручную)
+        from datetime import datetime
+        date_vars = {"EUR": self.nbg_date_var, "street_eur": self.cash_date_var,
+                     "credo_usd": self.transfer_date_var, "eur_usd": self.transfer_date_var}
+        for key, rate in changed.items():
+            if key in date_vars:
+                date_vars[key].set(datetime.fromtimestamp(rate.fetched_at).strftime("%d.%m.%Y"))
+        self.calculate()
+    
+    def _source_health_lines(self) -> list:
+        """Breaker state and latency of the current country's sources"""
+        health = RateFetcher.health.snapshot()
+        lines = []
+        for name in get_adapter(self.country_key).source_names:
+            h = health.get(health_key(name, self.country_key))
+            if h is None:
+                continue
+            if h["state"] == "open":
+                status = f"⛔ отключён после ошибок, проба через {h['retry_in']:.0f} с"
+            elif h["state"] == "half_open":
+                status = "🔁 пробный запрос"
+            elif h["p90_ms"] is not None:
+                status = f"✓ p50 {h['p50_ms']:.0f} мс, p90 {h['p90_ms']:.0f} мс"
+            else:
+                status = "✓"
+            extra = []
+            if h["hedged"]:
+                extra.append(f"дублей {h['hedged']} (выиграли {h['hedge_wins']})")
+            if h["failures"]:
+                extra.append(f"ошибок {h['failures']}")
+            lines.append(f"🩺 {name}: {status}" + (f"; {', '.join(extra)}" if extra else ""))
+        return lines
+    
+    def _auto_refresh_text(self) -> str:
+        return "⏱ По расписанию: вкл" if self.settings.get("auto_refresh", False) else "⏱ По расписанию: выкл"
+    
+    def _toggle_auto_refresh(self):
+        """Start or stop the background rate scheduler"""
+        enabled = not self.settings.get("auto_refresh", False)
+        self.settings.set("auto_refresh", enabled)
+        self.settings.save()
+        if enabled:
+            self.scheduler.start()
         else:
-            messagebox.showerror(
-                "Ошибка API",
-                "Не удалось загрузить курсы.\n"
-                "Проверьте интернет-соединение!"
-            )
-            self.banner_title.configure(text="❌ Ошибка загрузки", 
-                                        fg=self.colors["loss"])
+            self.scheduler.stop()
+        self.auto_refresh_btn.configure(text=self._auto_refresh_text())
     
     def _toggle_theme(self):
         """Toggle between dark and light theme"""
@@ -2107,7 +2151,16 @@ class CurrencyCalculatorApp:
     
     def _on_closing(self):
         """Handle window close"""
-        self._save_current_settings()
+        self._cancel_rate_fetch()
+        for after_id in self._workers.values():
+            self.root.after_cancel(after_id)
+        self._workers.clear()
+        if self._scheduler_poll_id is not None:
+            self.root.after_cancel(self._scheduler_poll_id)
+            self._scheduler_poll_id = None
+        self.scheduler.stop()
+        self._record_history(self._read_inputs())
+        self._save_current_settings(immediate=True)
         self.root.destroy()
 
 # ==============================================================================
@@ -2115,6 +2168,12 @@ class CurrencyCalculatorApp:
 # ==============================================================================
 
 if __name__ == "__main__":
+    # Пакетный режим без GUI: python currency_calculator_standalone.py batch file.csv
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from smart_currency.stream import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    _enable_dpi_awareness()
     # Fallback to pure tkinter if needed
     root = tk.Tk()
     app = CurrencyCalculatorApp(root)
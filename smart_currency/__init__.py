@@ -0,0 +1,63 @@
+"""
+Smart Currency core - GUI-free calculator, country profiles, settings,
+rate fetchers and the JSON quote service.
+
+Nothing here imports tkinter. Submodules are loaded on first attribute
+access, so ``from smart_currency import Calculator`` does not pay for the
+HTTP stack used by the fetchers.
+"""
+
+import importlib
+
+__version__ = "1.1"
+
+_EXPORTS = {
+    "COUNTRY_PROFILES": "profiles",
+    "DEFAULT_SETTINGS": "profiles",
+    "default_inputs": "profiles",
+    "METHODS": "calculator",
+    "Calculator": "calculator",
+    "BatchCalculator": "calculator",
+    "HAS_NUMPY": "calculator",
+    "SETTINGS_FILE": "settings",
+    "SettingsManager": "settings",
+    "atomic_write": "storage",
+    "CACHE_DIR": "fetchers",
+    "HttpCache": "fetchers",
+    "RateFetcher": "fetchers",
+    "RateFetchJob": "fetchers",
+    "QuoteService": "service",
+    "QuoteServer": "service",
+    "run_batch": "stream",
+    "solve_breakeven": "breakeven",
+    "SweepGrid": "sweep",
+    "MonteCarlo": "montecarlo",
+    "ExchangeMethod": "methods",
+    "MethodRegistry": "methods",
+    "REGISTRY": "methods",
+    "RateGraph": "routes",
+    "QuoteCache": "quotecache",
+    "QUOTE_CACHE": "quotecache",
+    "HistoryStore": "history",
+    "HISTORY": "history",
+    "Backtest": "backtest",
+    "backtest_all": "backtest",
+    "import_statement": "statements",
+    "get_adapter": "adapters",
+    "refresh_all": "adapters",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
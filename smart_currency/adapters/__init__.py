@@ -0,0 +1,227 @@
+"""
+Per-country rate fetcher adapters and the all-country refresh.
+
+An adapter lists a country's rate sources (URL + parser). Adapters live
+in their own modules and are imported on first use, so startup only pays
+for the country actually shown:
+
+    get_adapter("poland").fetch()                 # one country, like the GUI button
+    snapshot = refresh_all(max_workers=8, per_host=2)
+    snapshot.rates["poland"]["EUR"], snapshot.latency[("poland", "ECB")]
+
+Rate keys follow _apply_fetched_rates: "EUR"/"USD" (central bank rate per
+unit), "street_eur", "credo_usd", "eur_usd" (the street buy prices also
+come with "street_eur_sell" / "credo_usd_sell").
+"""
+
+import importlib
+import threading
+from abc import ABC, abstractmethod
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from ..fetchers import RateFetcher
+from ..profiles import COUNTRY_PROFILES
+
+# Валюты, которые публикует ЕЦБ (через Frankfurter). Без BGN: с 2026-01-01 Болгария в еврозоне
+ECB_CURRENCIES = frozenset(("CHF", "CZK", "DKK", "GBP", "HUF", "ISK", "NOK", "PLN",
+                            "RON", "SEK", "TRY"))
+
+# Страна -> "модуль:фабрика"; модуль импортируется при первом обращении
+ADAPTERS: Dict[str, str] = {"georgia": "georgia:GeorgiaAdapter"}
+ADAPTERS.update({key: "ecb:EcbAdapter" for key, p in COUNTRY_PROFILES.items()
+                 if p["local_currency"] in ECB_CURRENCIES})
+
+
+class Source(NamedTuple):
+    name: str
+    url: str
+    parse: Callable[[str], Dict[str, float]]
+    ttl: Optional[float] = None   # None: RateFetcher.CACHE_TTLS[name]
+    # Разбор по мере загрузки (может остановиться раньше конца ответа)
+    stream: Optional[Callable[[Iterable[bytes]], Dict[str, float]]] = None
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+    def fetch(self, timeout: float) -> Dict[str, float]:
+        if self.stream is not None:
+            return self.stream(RateFetcher._get_chunks(self.name, self.url, timeout, self.ttl))
+        # Источники разных стран с одним URL (ЕЦБ) делят один запрос, а не только кэш
+        text = RateFetcher.flights.do(("GET", self.url),
+                                      lambda: RateFetcher._get_text(self.name, self.url, timeout, self.ttl))
+        return self.parse(text)
+
+
+class CountryAdapter(ABC):
+    """Rate sources of one country"""
+
+    # Источник курса "EUR" для подписей; None - центральный банк страны
+    reference_source: Optional[str] = None
+
+    def __init__(self, country: str):
+        self.country = country
+        self.profile = COUNTRY_PROFILES[country]
+
+    @abstractmethod
+    def sources(self) -> List[Source]:
+        """Built on every call so URL overrides (tests, benchmarks) take effect"""
+
+    @property
+    def source_names(self) -> Tuple[str, ...]:
+        return tuple(s.name for s in self.sources())
+
+    def fetch(self, progress: Optional[Callable[[str, bool], None]] = None,
+              cancel_event: Optional[threading.Event] = None,
+              timeouts: Optional[Dict[str, float]] = None) -> Optional[Dict[str, float]]:
+        """All sources concurrently, merged (RateFetcher.fetch_sources semantics)"""
+        fetchers = {s.name: s.fetch for s in self.sources()}
+        return RateFetcher.fetch_sources(self.country, fetchers, progress, cancel_event, timeouts)
+
+
+_loaded: Dict[str, CountryAdapter] = {}
+_loaded_lock = threading.Lock()
+
+
+def has_adapter(country: str) -> bool:
+    return country in ADAPTERS
+
+
+def get_adapter(country: str) -> CountryAdapter:
+    """Adapter for a country, importing its module on first use"""
+    with _loaded_lock:
+        adapter = _loaded.get(country)
+        if adapter is None:
+            try:
+                module_name, factory = ADAPTERS[country].split(":")
+            except KeyError:
+                raise KeyError(f"No rate adapter for country: {country}")
+            module = importlib.import_module(f".{module_name}", __name__)
+            adapter = _loaded[country] = getattr(module, factory)(country)
+        return adapter
+
+
+# ============================================================================
+# Refresh all countries
+# ============================================================================
+
+class HostLimiter:
+    """At most ``per_host`` requests in flight to any one host"""
+
+    def __init__(self, per_host: int = 2):
+        self.per_host = per_host
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+        with semaphore:
+            yield
+
+
+class RateSnapshot:
+    """Result of refresh_all: merged rates per country plus per-source timings"""
+
+    def __init__(self, taken_at: float):
+        self.taken_at = taken_at
+        self.rates: Dict[str, Dict[str, float]] = {}
+        self.latency: Dict[Tuple[str, str], float] = {}   # время запроса + разбора, сек
+        self.waited: Dict[Tuple[str, str], float] = {}    # ожидание пула / лимита хоста
+        self.errors: Dict[Tuple[str, str], str] = {}
+        self.elapsed = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "taken_at": self.taken_at,
+            "elapsed": self.elapsed,
+            "rates": self.rates,
+            "sources": {f"{c}/{s}": {"latency": self.latency.get((c, s)),
+                                     "waited": self.waited.get((c, s)),
+                                     "error": self.errors.get((c, s))}
+                        for c, s in sorted(set(self.latency) | set(self.errors))},
+        }
+
+
+def refresh_all(countries: Optional[List[str]] = None, max_workers: int = 8, per_host: int = 2,
+                timeouts: Optional[Dict[str, float]] = None) -> RateSnapshot:
+    """Fetch every country's sources concurrently into one snapshot.
+
+    One bounded pool runs all (country, source) requests; HostLimiter keeps
+    at most ``per_host`` of them on any single host (many countries share
+    the ECB source); hedging is off here, a hedged duplicate would bypass
+    that limit. Failed sources are listed in ``errors``; a country's
+    rates merge its successful sources in declaration order.
+    """
+    adapters = [get_adapter(c) for c in (countries or list(ADAPTERS)) if has_adapter(c)]
+    limiter = HostLimiter(per_host)
+    snapshot = RateSnapshot(time.time())
+    timeouts = timeouts or {}
+    started = time.monotonic()
+
+    def run(country: str, source: Source, submitted: float):
+        timeout = timeouts.get(source.name) or RateFetcher.SOURCE_TIMEOUTS.get(
+            source.name, RateFetcher.DEFAULT_TIMEOUT)
+        with limiter.slot(source.host):
+            begin = time.monotonic()
+            try:
+                # Без дублей: дубль ушёл бы из пула resilience мимо лимита хоста
+                rates, error = RateFetcher.call_source(source.name, source.fetch, timeout,
+                                                       country=country, hedge=False), None
+            except Exception as e:
+                rates, error = None, str(e) or type(e).__name__
+            return rates, error, begin - submitted, time.monotonic() - begin
+
+    results: Dict[Tuple[str, str], Dict[str, float]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="RefreshAll") as pool:
+        futures = {}
+        for adapter in adapters:
+            for source in adapter.sources():
+                futures[pool.submit(run, adapter.country, source, time.monotonic())] = (
+                    adapter.country, source.name)
+        for future in as_completed(futures):
+            key = futures[future]
+            rates, error, waited, latency = future.result()
+            snapshot.latency[key] = latency
+            snapshot.waited[key] = waited
+            if error is not None or not rates:
+                snapshot.errors[key] = error or "no rates"
+            else:
+                results[key] = rates
+
+    for adapter in adapters:
+        per_source = {name: results[(adapter.country, name)] for name in adapter.source_names
+                      if (adapter.country, name) in results}
+        if per_source:
+            RateFetcher._record_history(adapter.country, per_source)
+            merged = {}
+            for rates in per_source.values():
+                merged.update(rates)
+            snapshot.rates[adapter.country] = merged
+    snapshot.elapsed = time.monotonic() - started
+    return snapshot
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Refresh rates of every country with an adapter")
+    parser.add_argument("countries", nargs="*", help="country keys (default: all)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    snapshot = refresh_all(args.countries or None, args.workers, args.per_host)
+    for (country, source), latency in sorted(snapshot.latency.items()):
+        error = snapshot.errors.get((country, source))
+        status = f"error: {error}" if error else ", ".join(
+            f"{k}={v:.4f}" for k, v in sorted(snapshot.rates.get(country, {}).items()))
+        print(f"{country:>16} {source:<12} {latency * 1000:7.0f} ms  {status}")
+    print(f"{len(snapshot.rates)} countries in {snapshot.elapsed:.2f} s, {len(snapshot.errors)} failed sources")
+    return 0 if snapshot.rates else 1
@@ -0,0 +1,36 @@
+"""
+Countries whose currency the ECB publishes. One Frankfurter request for
+all ECB_CURRENCIES serves every such country: the URL is the same for
+all of them, so the HTTP cache and Source.fetch share it, and each
+adapter picks its own reference EUR rate (used as the central bank rate)
+and EUR/USD out of it.
+"""
+
+import json
+from typing import Dict, List
+
+from . import ECB_CURRENCIES, CountryAdapter, Source
+
+# Тот же TTL, что у Frankfurter в RateFetcher: ЕЦБ публикует курсы раз в день
+ECB_TTL = 3600
+
+
+class EcbAdapter(CountryAdapter):
+    LATEST_URL = "https://api.frankfurter.dev/v1/latest"
+    reference_source = "ECB"
+
+    def __init__(self, country: str):
+        super().__init__(country)
+        self.currency = self.profile["local_currency"]
+
+    def sources(self) -> List[Source]:
+        symbols = ",".join(sorted(ECB_CURRENCIES | {"USD"}))
+        url = f"{EcbAdapter.LATEST_URL}?base=EUR&symbols={symbols}"
+        return [Source("ECB", url, self._parse, ECB_TTL)]
+
+    def _parse(self, text: str) -> Dict[str, float]:
+        rates = json.loads(text)["rates"]
+        out = {"EUR": float(rates[self.currency])}
+        if "USD" in rates:
+            out["eur_usd"] = float(rates["USD"])
+        return out
@@ -0,0 +1,18 @@
+"""
+Georgia: NBG official rates, rico.ge street rates, Frankfurter EUR/USD.
+"""
+
+from typing import List
+
+from ..fetchers import RateFetcher
+from . import CountryAdapter, Source
+
+
+class GeorgiaAdapter(CountryAdapter):
+    def sources(self) -> List[Source]:
+        return [
+            Source("NBG", RateFetcher.NBG_URL, RateFetcher._parse_nbg),
+            Source("Rico", RateFetcher.RICO_URL, RateFetcher._parse_rico,
+                   stream=RateFetcher._parse_rico_stream),
+            Source("Frankfurter", RateFetcher.FRANKFURTER_URL, RateFetcher._parse_frankfurter),
+        ]
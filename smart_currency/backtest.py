@@ -0,0 +1,217 @@
+"""
+Backtest: which exchange method would have won on each past day.
+
+Rates come from the history store (or any date-indexed columns, e.g. an
+imported bank statement). Each Calculator input is a column over the date
+axis; days without an observation carry the last known rate forward, and
+days before the first one use the profile default. A spending schedule
+(EUR per day) is replayed through BatchCalculator in one call, so the
+whole date axis is evaluated column-wise - no per-day Python loop on the
+NumPy path.
+
+Reported per method: cumulative loss against the central bank reference
+(local currency), win days, and the same for an oracle that always picks
+the day's best method.
+"""
+
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Union
+
+from .calculator import HAS_NUMPY, METHODS, BatchCalculator
+from .history import HISTORY, HistoryStore
+from .profiles import COUNTRY_PROFILES, default_inputs
+
+# Входы калькулятора -> ряды истории в порядке приоритета
+HISTORY_SOURCES = {
+    "nbg_rate": (("nbg", "EUR"), ("ecb", "EUR"), ("manual", "nbg_rate")),
+    "direct_rate": (("statement", "direct_rate"), ("manual", "direct_rate")),
+    "eur_usd": (("frankfurter", "eur_usd"), ("ecb", "eur_usd"), ("manual", "eur_usd")),
+    "usd_gel": (("rico", "credo_usd"), ("manual", "usd_gel")),
+    "street_rate": (("rico", "street_eur"), ("manual", "street_rate")),
+}
+
+Schedule = Union[float, Dict[date, float], Sequence[float]]
+
+
+def forward_fill(axis: Sequence[int], dates: Sequence[int], values: Sequence[float],
+                 default: float, use_numpy: bool = HAS_NUMPY):
+    """Value in effect on each day of ``axis`` (sorted ordinals); ``default`` before the first"""
+    if use_numpy:
+        import numpy as np
+        if not len(dates):
+            return np.full(len(axis), float(default))
+        index = np.searchsorted(np.asarray(dates), np.asarray(axis), side="right") - 1
+        filled = np.asarray(values, dtype=np.float64)[np.maximum(index, 0)]
+        return np.where(index >= 0, filled, float(default))
+
+    out = []
+    i, n, current = 0, len(dates), float(default)
+    for day in axis:
+        while i < n and dates[i] <= day:
+            current = values[i]
+            i += 1
+        out.append(current)
+    return out
+
+
+class BacktestResult:
+    """Totals and cumulative loss columns of one backtest"""
+
+    def __init__(self, country: str, axis, amounts, columns: dict, use_numpy: bool):
+        self.country = country
+        self.axis = axis
+        self.days = len(axis)
+        if use_numpy:
+            import numpy as np
+            nbg = np.asarray(columns["nbg"])
+            received = np.stack([np.asarray(columns[m]) for m in METHODS])
+            losses = nbg - received
+            oracle = nbg - received.max(axis=0)
+            self.cumulative = {m: np.cumsum(losses[i]) for i, m in enumerate(METHODS)}
+            self.cumulative["oracle"] = np.cumsum(oracle)
+            spending = np.asarray(amounts) > 0
+            counts = np.bincount(np.asarray(columns["winner_index"])[spending], minlength=len(METHODS))
+            self.wins = {m: int(counts[i]) for i, m in enumerate(METHODS)}
+            self.spent = float(np.sum(amounts))
+            self.reference = float(nbg.sum())
+        else:
+            nbg = columns["nbg"]
+            per_method = [columns[m] for m in METHODS]
+            self.cumulative = {m: list(accumulate(r - v for r, v in zip(nbg, per_method[i])))
+                               for i, m in enumerate(METHODS)}
+            self.cumulative["oracle"] = list(accumulate(r - max(vs) for r, *vs in zip(nbg, *per_method)))
+            self.wins = {m: 0 for m in METHODS}
+            for a, w in zip(amounts, columns["winner_index"]):
+                if a > 0:
+                    self.wins[METHODS[w]] += 1
+            self.spent = float(sum(amounts))
+            self.reference = float(sum(nbg))
+
+    @property
+    def losses(self) -> Dict[str, float]:
+        """Total loss (local currency) per method and for the oracle"""
+        return {k: float(col[-1]) if len(col) else 0.0 for k, col in self.cumulative.items()}
+
+    def summary(self) -> dict:
+        losses = self.losses
+        ref = self.reference
+        return {
+            "country": self.country,
+            "days": self.days,
+            "spent_eur": self.spent,
+            "reference": ref,
+            "loss": losses,
+            "loss_pct": {k: v / ref * 100 if ref > 0 else 0.0 for k, v in losses.items()},
+            "wins": self.wins,
+            # Лучший фиксированный выбор задним числом (без учёта оракула)
+            "best_method": min(METHODS, key=losses.__getitem__),
+        }
+
+
+class Backtest:
+    """Replay the Calculator scenarios over a date axis.
+
+    ``inputs`` maps every Calculator.compare keyword to a scalar or a
+    column aligned with ``axis`` (sorted day ordinals).
+    """
+
+    def __init__(self, country: str, axis: Sequence[int], inputs: dict,
+                 use_numpy: Optional[bool] = None):
+        self.country = country
+        self.axis = axis
+        self.inputs = inputs
+        self.batch = BatchCalculator(use_numpy)
+
+    @classmethod
+    def from_history(cls, country: str, start: Optional[date] = None, end: Optional[date] = None,
+                     store: HistoryStore = HISTORY, overrides: Optional[dict] = None,
+                     use_numpy: Optional[bool] = None) -> "Backtest":
+        """Columns from the history store; fees and missing rates from the profile defaults.
+
+        Without start/end the axis spans the country's first to last
+        observation. ``overrides`` replaces inputs with scalars (e.g. fees).
+        """
+        use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+        defaults = default_inputs(country)
+        series = {}
+        for name, candidates in HISTORY_SOURCES.items():
+            for source, rate in candidates:
+                found = store.series(country, source, rate)
+                if len(found):
+                    series[name] = found.range(None, end)
+                    break
+        if start is None or end is None:
+            observed = [dates for dates, _ in series.values() if len(dates)]
+            if not observed:
+                raise ValueError(f"No rate history for {country}")
+            start = start or date.fromordinal(min(d[0] for d in observed))
+            end = end or date.fromordinal(max(d[-1] for d in observed))
+
+        if use_numpy:
+            import numpy as np
+            axis = np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int32)
+        else:
+            axis = range(start.toordinal(), end.toordinal() + 1)
+        inputs = dict(defaults)
+        for name, (dates, values) in series.items():
+            inputs[name] = forward_fill(axis, dates, values, defaults[name], use_numpy)
+        inputs.update(overrides or {})
+        return cls(country, axis, inputs, use_numpy)
+
+    def amounts(self, schedule: Schedule):
+        """Spending schedule -> EUR column over the axis (0 on days without spending)"""
+        n = len(self.axis)
+        if isinstance(schedule, (int, float)):
+            column = [float(schedule)] * n
+        elif isinstance(schedule, dict):
+            first = self.axis[0] if n else 0
+            column = [0.0] * n
+            for day, amount in schedule.items():
+                i = day.toordinal() - first
+                if 0 <= i < n:
+                    column[i] += float(amount)
+        else:
+            column = [float(a) for a in schedule]
+            if len(column) != n:
+                raise ValueError(f"Schedule length {len(column)} does not match {n} days")
+        if self.batch.use_numpy:
+            import numpy as np
+            return np.asarray(column, dtype=np.float64)
+        return column
+
+    def run(self, schedule: Schedule = 100.0) -> BacktestResult:
+        amounts = self.amounts(schedule)
+        columns = self.batch.evaluate(amounts, **self.inputs)
+        return BacktestResult(self.country, self.axis, amounts, columns, self.batch.use_numpy)
+
+
+def backtest_all(schedule: Schedule = 100.0, start: Optional[date] = None, end: Optional[date] = None,
+                 store: HistoryStore = HISTORY, countries: Optional[List[str]] = None,
+                 use_numpy: Optional[bool] = None) -> Dict[str, BacktestResult]:
+    """Backtest every country that has history; countries without any are skipped"""
+    results = {}
+    for country in countries or list(COUNTRY_PROFILES):
+        try:
+            backtest = Backtest.from_history(country, start, end, store, use_numpy=use_numpy)
+        except ValueError:
+            continue
+        results[country] = backtest.run(schedule)
+    return results
+
+
+def monthly_schedule(amount: float, start: date, end: date, day: int = 1) -> Dict[date, float]:
+    """``amount`` EUR on the given day of every month between start and end"""
+    out = {}
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        try:
+            spend = current.replace(day=day)
+        except ValueError:
+            # 31-е в коротком месяце -> последний день месяца
+            spend = (current.replace(month=current.month % 12 + 1, year=current.year + current.month // 12)
+                     - timedelta(days=1))
+        if start <= spend <= end:
+            out[spend] = amount
+        current = (current + timedelta(days=32)).replace(day=1)
+    return out
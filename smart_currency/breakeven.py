@@ -0,0 +1,99 @@
+"""
+Closed-form break-even amounts between the exchange methods.
+
+As a function of the amount x (EUR) every method is (piecewise) linear:
+
+    direct   = d * x                      d = direct_rate
+    transfer = t * x                      t = eur_usd * usd_gel / (1 + ibt_fee/100)
+    cash     = c * (x - f)  for x > f     c = street_rate / (1 + atm_fee_pct/100)
+             = 0            for x <= f    f = atm_fee_fix
+
+so direct and transfer never cross (one of them wins at every amount), and
+cash overtakes a proportional method with slope s at x = c*f / (c - s)
+when c > s. No iteration - a handful of float operations per call.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .calculator import METHODS, Calculator
+
+
+def method_slopes(direct_rate: float, eur_usd: float, usd_gel: float, street_rate: float,
+                  ibt_fee: float, atm_fee_pct: float) -> Dict[str, float]:
+    """Local currency per EUR for each method (cash: above the fixed fee)"""
+    return {
+        "direct": direct_rate,
+        "transfer": eur_usd * usd_gel / (1 + ibt_fee / 100),
+        "cash": street_rate / (1 + atm_fee_pct / 100),
+    }
+
+
+def _crossing(slope_a: float, fix_a: float, slope_b: float, fix_b: float) -> Optional[float]:
+    """Amount > 0 where slope_a*(x - fix_a) == slope_b*(x - fix_b), if any"""
+    if slope_a == slope_b:
+        return None
+    x = (slope_a * fix_a - slope_b * fix_b) / (slope_a - slope_b)
+    # Ниже комиссии наличные = 0, поэтому пересечение имеет смысл только выше неё
+    if x <= 0 or x <= max(fix_a, fix_b):
+        return None
+    return x
+
+
+def solve_breakeven(direct_rate: float, eur_usd: float, usd_gel: float, street_rate: float,
+                    ibt_fee: float, atm_fee_pct: float, atm_fee_fix: float,
+                    nbg_rate: Optional[float] = None) -> dict:
+    """Break-even amounts and winning ranges for one set of rates and fees.
+
+    Takes the same keywords as Calculator.compare (without the amount), so
+    ``solve_breakeven(**default_inputs(country))`` works; ``nbg_rate`` is
+    accepted for that reason but not needed.
+
+    Returns::
+
+        {"pairs": {("direct", "transfer"): None, ("direct", "cash"): 152.3, ...},
+         "ranges": [(0.0, 152.3, "transfer"), (152.3, inf, "cash")]}
+
+    ``pairs`` holds the amount where the two methods give the same sum (None
+    if they never cross above zero). ``ranges`` covers (0, inf) with
+    half-open (lo, hi] intervals; at a break-even amount the tie goes to the
+    first method in METHODS order, as in Calculator.compare.
+    """
+    slopes = method_slopes(direct_rate, eur_usd, usd_gel, street_rate, ibt_fee, atm_fee_pct)
+    # Та же комиссия, что в Calculator.calc_cash (отрицательная - без обрезки до 0)
+    fixes = {"direct": 0.0, "transfer": 0.0, "cash": atm_fee_fix}
+
+    pairs: Dict[Tuple[str, str], Optional[float]] = {}
+    for i, a in enumerate(METHODS):
+        for b in METHODS[i + 1:]:
+            pairs[(a, b)] = _crossing(slopes[a], fixes[a], slopes[b], fixes[b])
+
+    # Границы интервалов: все пересечения + порог комиссии (если он выше нуля)
+    bounds = sorted({x for x in pairs.values() if x is not None}
+                    | ({fixes["cash"]} if fixes["cash"] > 0 else set()))
+    edges = [0.0] + bounds + [math.inf]
+
+    def winner_at(x: float) -> str:
+        values = {"direct": Calculator.calc_direct(x, direct_rate),
+                  "transfer": Calculator.calc_transfer(x, ibt_fee, eur_usd, usd_gel),
+                  "cash": Calculator.calc_cash(x, atm_fee_pct, atm_fee_fix, street_rate)}
+        return max(METHODS, key=values.__getitem__)
+
+    ranges: List[Tuple[float, float, str]] = []
+    for lo, hi in zip(edges, edges[1:]):
+        probe = lo + 1.0 if hi == math.inf else (lo + hi) / 2
+        key = winner_at(probe)
+        if ranges and ranges[-1][2] == key:
+            ranges[-1] = (ranges[-1][0], hi, key)
+        else:
+            ranges.append((lo, hi, key))
+
+    return {"pairs": pairs, "ranges": ranges}
+
+
+def winner_for(ranges: List[Tuple[float, float, str]], amount: float) -> Optional[str]:
+    """Look up the winning method for an amount in solve_breakeven()['ranges']"""
+    for lo, hi, key in ranges:
+        if lo < amount <= hi:
+            return key
+    return None
@@ -0,0 +1,191 @@
+"""
+Calculator logic: scalar scenarios and the column-wise batch engine.
+"""
+
+import importlib.util
+from itertools import repeat
+from typing import Dict, Optional, Sequence
+
+# NumPy опционален - ускоряет пакетные расчёты (BatchCalculator).
+# Импортируется лениво, чтобы не замедлять импорт ядра.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# Способы обмена в порядке отображения (при равенстве побеждает первый)
+METHODS = ("direct", "transfer", "cash")
+
+
+class Calculator:
+    @staticmethod
+    def calc_direct(spend_eur: float, implied_rate: float) -> float:
+        return spend_eur * implied_rate
+    
+    @staticmethod
+    def calc_transfer(spend_eur: float, fee_pct: float, 
+                      eur_usd: float, usd_gel: float) -> float:
+        net_eur = spend_eur / (1 + fee_pct / 100)
+        amount_usd = net_eur * eur_usd
+        return amount_usd * usd_gel
+    
+    @staticmethod
+    def calc_cash(spend_eur: float, fee_pct: float, 
+                  fix_fee: float, street_rate: float) -> float:
+        if spend_eur <= fix_fee:
+            return 0.0
+        net_eur = (spend_eur - fix_fee) / (1 + fee_pct / 100)
+        return net_eur * street_rate
+    
+    @staticmethod
+    def calc_nbg_reference(spend_eur: float, nbg_rate: float) -> float:
+        return spend_eur * nbg_rate
+    
+    @staticmethod
+    def calc_loss_percent(actual: float, reference: float) -> float:
+        if reference <= 0:
+            return 0.0
+        return ((reference - actual) / reference) * 100
+    
+    @staticmethod
+    def compare(spend_eur: float, nbg_rate: float, direct_rate: float, eur_usd: float,
+                usd_gel: float, street_rate: float, ibt_fee: float,
+                atm_fee_pct: float, atm_fee_fix: float) -> dict:
+        """All scenarios for one amount, as calculate() shows them.
+
+        Returns ``{"nbg": ref, "direct"|"transfer"|"cash": {"gel", "loss"},
+        "winner": key}``; ties go to the first method in METHODS order.
+        """
+        nbg_ref = Calculator.calc_nbg_reference(spend_eur, nbg_rate)
+        direct_gel = Calculator.calc_direct(spend_eur, direct_rate)
+        transfer_gel = Calculator.calc_transfer(spend_eur, ibt_fee, eur_usd, usd_gel)
+        cash_gel = Calculator.calc_cash(spend_eur, atm_fee_pct, atm_fee_fix, street_rate)
+        
+        results = {
+            "nbg": nbg_ref,
+            "direct": {"gel": direct_gel, "loss": Calculator.calc_loss_percent(direct_gel, nbg_ref)},
+            "transfer": {"gel": transfer_gel, "loss": Calculator.calc_loss_percent(transfer_gel, nbg_ref)},
+            "cash": {"gel": cash_gel, "loss": Calculator.calc_loss_percent(cash_gel, nbg_ref)},
+        }
+        results["winner"] = max(METHODS, key=lambda k: results[k]["gel"])
+        return results
+
+
+class BatchCalculator:
+    """Column-wise version of Calculator for many amounts at once.
+
+    Every parameter may be a scalar or a sequence with the same length as
+    ``amounts``. Uses NumPy when installed, otherwise a pure-Python loop;
+    both produce exactly the same numbers as the scalar Calculator methods.
+    """
+
+    METHODS = METHODS
+
+    def __init__(self, use_numpy: Optional[bool] = None):
+        self.use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+
+    def evaluate(self, amounts, nbg_rate, direct_rate, eur_usd, usd_gel,
+                 street_rate, ibt_fee, atm_fee_pct, atm_fee_fix) -> Dict[str, Sequence]:
+        """Return columns: nbg, <method>, <method>_loss, winner_index, winner"""
+        if self.use_numpy:
+            return self._evaluate_numpy(amounts, nbg_rate, direct_rate, eur_usd, usd_gel,
+                                        street_rate, ibt_fee, atm_fee_pct, atm_fee_fix)
+        return self._evaluate_python(amounts, nbg_rate, direct_rate, eur_usd, usd_gel,
+                                     street_rate, ibt_fee, atm_fee_pct, atm_fee_fix)
+
+    @staticmethod
+    def _evaluate_numpy(amounts, nbg_rate, direct_rate, eur_usd, usd_gel,
+                        street_rate, ibt_fee, atm_fee_pct, atm_fee_fix) -> Dict[str, Sequence]:
+        import numpy as np
+        # Как скалярные формулы: переполнение даёт inf молча, без RuntimeWarning
+        with np.errstate(over="ignore", invalid="ignore"):
+            a = np.asarray(amounts, dtype=np.float64)
+            n = a.shape[0]
+            # Same operation order as the scalar formulas -> bit-identical results
+            nbg = a * np.asarray(nbg_rate, dtype=np.float64)
+            direct = a * np.asarray(direct_rate, dtype=np.float64)
+            transfer = a / (1 + np.asarray(ibt_fee, dtype=np.float64) / 100)
+            transfer = transfer * np.asarray(eur_usd, dtype=np.float64)
+            transfer = transfer * np.asarray(usd_gel, dtype=np.float64)
+            fix = np.asarray(atm_fee_fix, dtype=np.float64)
+            cash = (a - fix) / (1 + np.asarray(atm_fee_pct, dtype=np.float64) / 100)
+            cash = cash * np.asarray(street_rate, dtype=np.float64)
+            cash = np.where(a <= fix, 0.0, cash)
+
+            columns = {
+                "nbg": np.broadcast_to(nbg, (n,)),
+                "direct": np.broadcast_to(direct, (n,)),
+                "transfer": np.broadcast_to(transfer, (n,)),
+                "cash": np.broadcast_to(cash, (n,)),
+            }
+            valid = columns["nbg"] > 0
+            safe_ref = np.where(valid, columns["nbg"], 1.0)
+            for key in BatchCalculator.METHODS:
+                loss = ((safe_ref - columns[key]) / safe_ref) * 100
+                columns[f"{key}_loss"] = np.where(valid, loss, 0.0)
+
+            # argmax returns the first maximum, as max() does in calculate()
+            stacked = np.stack([columns[k] for k in BatchCalculator.METHODS])
+            winner_index = np.argmax(stacked, axis=0)
+            columns["winner_index"] = winner_index
+            columns["winner"] = np.array(BatchCalculator.METHODS)[winner_index]
+        return columns
+
+    @staticmethod
+    def _evaluate_python(amounts, nbg_rate, direct_rate, eur_usd, usd_gel,
+                         street_rate, ibt_fee, atm_fee_pct, atm_fee_fix) -> Dict[str, Sequence]:
+        amounts = list(amounts)
+        n = len(amounts)
+        params = [BatchCalculator._column(p, n) for p in
+                  (nbg_rate, direct_rate, eur_usd, usd_gel, street_rate, ibt_fee, atm_fee_pct, atm_fee_fix)]
+        methods = BatchCalculator.METHODS
+
+        nbg_col, direct_col, transfer_col, cash_col = [], [], [], []
+        losses = {k: [] for k in methods}
+        winner_index, winner = [], []
+
+        for a, nbg_r, direct_r, eu, ug, street, fee, pct, fix in zip(amounts, *params):
+            ref = a * nbg_r
+            direct = a * direct_r
+            transfer = a / (1 + fee / 100) * eu * ug
+            cash = 0.0 if a <= fix else (a - fix) / (1 + pct / 100) * street
+
+            nbg_col.append(ref)
+            direct_col.append(direct)
+            transfer_col.append(transfer)
+            cash_col.append(cash)
+            if ref <= 0:
+                losses["direct"].append(0.0)
+                losses["transfer"].append(0.0)
+                losses["cash"].append(0.0)
+            else:
+                losses["direct"].append(((ref - direct) / ref) * 100)
+                losses["transfer"].append(((ref - transfer) / ref) * 100)
+                losses["cash"].append(((ref - cash) / ref) * 100)
+
+            best = 0
+            if transfer > direct:
+                best = 1
+            if cash > (transfer if best else direct):
+                best = 2
+            winner_index.append(best)
+            winner.append(methods[best])
+
+        return {
+            "nbg": nbg_col,
+            "direct": direct_col,
+            "transfer": transfer_col,
+            "cash": cash_col,
+            "direct_loss": losses["direct"],
+            "transfer_loss": losses["transfer"],
+            "cash_loss": losses["cash"],
+            "winner_index": winner_index,
+            "winner": winner,
+        }
+
+    @staticmethod
+    def _column(value, n: int) -> Sequence[float]:
+        """Broadcast a scalar parameter to a column of length n"""
+        if isinstance(value, (int, float)):
+            return repeat(float(value), n)
+        column = list(value)
+        if len(column) != n:
+            raise ValueError(f"Parameter length {len(column)} does not match amounts length {n}")
+        return column
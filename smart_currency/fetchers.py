@@ -0,0 +1,441 @@
+"""
+Rate fetchers (standard library only, no third-party dependencies).
+
+All requests go through HttpCache and the shared keep-alive HttpClient.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional
+
+from .history import HISTORY
+from .httpclient import HTTP_CLIENT, HttpClient
+from .resilience import HEALTH
+from .rico import parse_quotes, street_rates
+from .singleflight import FLIGHTS
+from .storage import atomic_write
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".rate_cache")
+
+
+class HttpCache:
+    """On-disk cache for rate source responses.
+
+    Fresh entries (younger than the TTL) are served without a request.
+    Stale entries are revalidated with If-None-Match / If-Modified-Since;
+    if the source is unreachable the stale copy is served instead.
+    """
+    
+    def __init__(self, directory: str = CACHE_DIR, client: Optional[HttpClient] = None):
+        self.directory = directory
+        self.client = client or HTTP_CLIENT
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0          # served fresh from disk
+        self.misses = 0        # full download (200)
+        self.revalidated = 0   # 304 Not Modified
+        self.stale = 0         # source failed, served old copy
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "revalidated": self.revalidated, "stale": self.stale}
+    
+    def _count(self, counter: str, fetched_at: Optional[float] = None):
+        self._local.outcome = counter
+        self._local.fetched_at = fetched_at
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def last_outcome(self) -> Optional[str]:
+        """Counter name of this thread's last request ("hits", "misses", "revalidated", "stale")"""
+        return getattr(self._local, "outcome", None)
+    
+    def last_fetched_at(self) -> Optional[float]:
+        """When the body of this thread's last request came from the source (time.time())"""
+        return getattr(self._local, "fetched_at", None)
+    
+    @contextmanager
+    def offline(self):
+        """No network in this thread: serve cached copies (even stale) or raise ConnectionError"""
+        self._local.offline = True
+        try:
+            yield
+        finally:
+            self._local.offline = False
+    
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+    
+    def _load(self, url: str) -> Optional[dict]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["body"] = f.read()
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def _store(self, url: str, entry: dict):
+        meta_path, body_path = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write(body_path, entry["body"])
+            atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            print(f"Cache write error: {e}")
+    
+    def _open(self, url: str, ttl: float, timeout: float, headers: Optional[dict], partial_ok: bool = False):
+        """(cached body, None, None) or (None, open response, (old entry, new entry))"""
+        self._local.outcome = None
+        entry = self._load(url)
+        if entry and entry.get("partial") and not partial_ok:
+            entry = None        # начало ответа от iter_body: целиком его никто не скачивал
+        now = time.time()
+        if entry and now - entry.get("fetched_at", 0) < ttl:
+            self._count("hits", entry.get("fetched_at"))
+            return entry["body"], None, None
+        
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        
+        try:
+            if getattr(self._local, "offline", False):
+                raise ConnectionError(f"offline: {url}")
+            response = self.client.get(url, request_headers, timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and entry:
+                entry["fetched_at"] = now
+                self._store(url, entry)
+                self._count("revalidated", now)
+                return entry["body"], None, None
+            if entry:
+                self._count("stale", entry.get("fetched_at"))
+                return entry["body"], None, None
+            raise
+        except OSError:
+            # Offline / timeout: old data is better than none
+            if entry:
+                self._count("stale", entry.get("fetched_at"))
+                return entry["body"], None, None
+            raise
+        new_entry = {
+            "url": url,
+            "fetched_at": now,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return None, response, (entry, new_entry)
+    
+    def get(self, url: str, ttl: float, timeout: float, headers: Optional[dict] = None) -> bytes:
+        """Return the response body for url, from disk when possible"""
+        body, response, state = self._open(url, ttl, timeout, headers)
+        if response is None:
+            return body
+        entry, new_entry = state
+        try:
+            with response:
+                body = response.read()
+        except OSError:
+            if entry:
+                self._count("stale", entry.get("fetched_at"))
+                return entry["body"]
+            raise
+        new_entry["body"] = body
+        self._store(url, new_entry)
+        self._count("misses", new_entry["fetched_at"])
+        return body
+    
+    def iter_body(self, url: str, ttl: float, timeout: float, headers: Optional[dict] = None,
+                  chunk_size: int = 16384) -> Iterator[bytes]:
+        """Like get(), but yields the body in chunks as they arrive.
+        
+        The consumer may stop early (close the generator): the transfer is
+        cut off there (the connection is closed, not reused) and the part
+        read so far is cached as a partial entry. Within the TTL it serves
+        iter_body() callers, which stop at the same place; get() ignores it,
+        and it is never revalidated (no validators for a cut body). A read
+        error before the first chunk falls back to the stale copy like
+        get(); later ones propagate.
+        """
+        body, response, state = self._open(url, ttl, timeout, headers, partial_ok=True)
+        if response is None:
+            yield from _split(body, chunk_size)
+            return
+        entry, new_entry = state
+        parts = []
+        try:
+            with response:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    parts.append(chunk)
+                    try:
+                        yield chunk
+                    except GeneratorExit:
+                        # Парсер получил всё нужное: остаток не качаем (with закроет соединение)
+                        new_entry.update(body=b"".join(parts), partial=True, etag=None, last_modified=None)
+                        self._store(url, new_entry)
+                        self._count("misses", new_entry["fetched_at"])
+                        return
+        except OSError:
+            if entry and not parts:
+                self._count("stale", entry.get("fetched_at"))
+                yield from _split(entry["body"], chunk_size)
+                return
+            raise
+        new_entry["body"] = b"".join(parts)
+        self._store(url, new_entry)
+        self._count("misses", new_entry["fetched_at"])
+
+
+def _split(body: bytes, size: int) -> Iterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+class RateFetcher:
+    """Universal rate fetcher (standard library only, no third-party dependencies)"""
+    
+    NBG_URL = "https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies/en/json"
+    RICO_URL = "https://rico.ge/?lang=en"
+    FRANKFURTER_URL = "https://api.frankfurter.dev/v1/latest?base=EUR&symbols=USD"
+    
+    # Источники для Грузии (для индикатора прогресса) и их таймауты, сек
+    GEORGIA_SOURCES = ("NBG", "Rico", "Frankfurter")
+    SOURCE_TIMEOUTS = {"NBG": 10.0, "Rico": 10.0, "Frankfurter": 10.0}
+    DEFAULT_TIMEOUT = 10.0
+    # Сколько секунд ответ считается свежим (ЦБ обновляет курс раз в день)
+    CACHE_TTLS = {"NBG": 6 * 3600, "Rico": 10 * 60, "Frankfurter": 3600}
+    
+    cache = HttpCache()
+    history = HISTORY
+    health = HEALTH
+    flights = FLIGHTS
+    
+    @staticmethod
+    def get_headers():
+        return {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    
+    @staticmethod
+    def _get_text(source: str, url: str, timeout: float, ttl: Optional[float] = None) -> str:
+        if ttl is None:
+            ttl = RateFetcher.CACHE_TTLS.get(source, 0)
+        body = RateFetcher.cache.get(url, ttl, timeout, headers=RateFetcher.get_headers())
+        return body.decode('utf-8')
+    
+    @staticmethod
+    def _get_chunks(source: str, url: str, timeout: float, ttl: Optional[float] = None) -> Iterator[bytes]:
+        """Response body as it arrives (for parsers that can stop early)"""
+        if ttl is None:
+            ttl = RateFetcher.CACHE_TTLS.get(source, 0)
+        return RateFetcher.cache.iter_body(url, ttl, timeout, headers=RateFetcher.get_headers())
+    
+    @staticmethod
+    def _fetch_nbg(timeout: float) -> Dict[str, float]:
+        """NBG (Central Bank EUR and USD)"""
+        return RateFetcher._parse_nbg(RateFetcher._get_text("NBG", RateFetcher.NBG_URL, timeout))
+    
+    @staticmethod
+    def _parse_nbg(text: str) -> Dict[str, float]:
+        rates = {}
+        data = json.loads(text)
+        if data and isinstance(data, list):
+            currencies = data[0].get("currencies", [])
+            for curr in currencies:
+                code = curr.get("code")
+                if code in ["EUR", "USD"]:
+                    rates[code] = curr.get("rate", 0) / curr.get("quantity", 1)
+        return rates
+    
+    @staticmethod
+    def _fetch_rico(timeout: float) -> Dict[str, float]:
+        """Rico (Street Exchange & Credo Approximation)"""
+        return RateFetcher._parse_rico_stream(RateFetcher._get_chunks("Rico", RateFetcher.RICO_URL, timeout))
+    
+    @staticmethod
+    def _parse_rico(html: str) -> Dict[str, float]:
+        return RateFetcher._parse_rico_stream((html,))
+    
+    @staticmethod
+    def _parse_rico_stream(chunks) -> Dict[str, float]:
+        # Покупка EUR/USD обменником (то, что получит пользователь) + продажа
+        return street_rates(parse_quotes(chunks, ("EUR", "USD")))
+    
+    @staticmethod
+    def _fetch_frankfurter(timeout: float) -> Dict[str, float]:
+        """Frankfurter (M/C cross-rate EUR->USD proxy)"""
+        return RateFetcher._parse_frankfurter(
+            RateFetcher._get_text("Frankfurter", RateFetcher.FRANKFURTER_URL, timeout))
+    
+    @staticmethod
+    def _parse_frankfurter(text: str) -> Dict[str, float]:
+        return {"eur_usd": json.loads(text)["rates"]["USD"]}
+    
+    @staticmethod
+    def fetch_georgia_rates(progress: Optional[Callable[[str, bool], None]] = None,
+                            cancel_event: Optional[threading.Event] = None,
+                            timeouts: Optional[Dict[str, float]] = None,
+                            max_workers: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """Fetch NBG, street and cross rates concurrently (see fetch_sources)"""
+        fetchers = {
+            "NBG": RateFetcher._fetch_nbg,
+            "Rico": RateFetcher._fetch_rico,
+            "Frankfurter": RateFetcher._fetch_frankfurter,
+        }
+        return RateFetcher.fetch_sources("georgia", fetchers, progress, cancel_event, timeouts, max_workers)
+    
+    @staticmethod
+    def fetch_sources(country: str, fetchers: Dict[str, Callable[[float], Dict[str, float]]],
+                      progress: Optional[Callable[[str, bool], None]] = None,
+                      cancel_event: Optional[threading.Event] = None,
+                      timeouts: Optional[Dict[str, float]] = None,
+                      max_workers: Optional[int] = None) -> Optional[Dict[str, float]]:
+        """Run one country's sources concurrently and merge their rates.
+
+        ``fetchers`` maps source name -> fetch(timeout); later sources win
+        on key clashes. Each source runs in its own pool thread with its
+        own timeout, so total latency is about the slowest source. Sources
+        that fail or time out are skipped (partial results). Every fetch
+        goes through call_source (single-flight, circuit breaker + hedging).
+        ``progress(source, ok)`` is called as each source finishes and
+        ``cancel_event`` aborts the wait (returns None). No Tk calls happen
+        here.
+        """
+        timeouts = {name: RateFetcher.SOURCE_TIMEOUTS.get(name, RateFetcher.DEFAULT_TIMEOUT)
+                    for name in fetchers} | (timeouts or {})
+        results = {}
+        
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        
+        pool = ThreadPoolExecutor(max_workers=max_workers or len(fetchers),
+                                  thread_name_prefix="RateSource")
+        futures = {pool.submit(RateFetcher.call_source, name, fetch, timeouts[name], None, country): name
+                   for name, fetch in fetchers.items()}
+        # Socket timeout is per operation - also cap each source's total wait
+        started = time.monotonic()
+        deadlines = {future: started + timeouts[name] + 1.0 for future, name in futures.items()}
+        pending = set(futures)
+        try:
+            while pending:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                now = time.monotonic()
+                expired = {future for future in pending if deadlines[future] <= now}
+                for future in expired:
+                    name = futures[future]
+                    print(f"{name} Error: timed out")
+                    if progress:
+                        progress(name, False)
+                pending -= expired
+                if not pending:
+                    break
+                remaining = min(deadlines[future] for future in pending) - now
+                done, pending = wait(pending, timeout=min(0.1, remaining), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        print(f"{name} Error: {e}")
+                    if progress:
+                        progress(name, bool(results.get(name)))
+        finally:
+            # Do not block on stragglers; their results are dropped
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        RateFetcher._record_history(country, results)
+        rates = {}
+        for name in fetchers:
+            rates.update(results.get(name, {}))
+        return rates if rates else None
+    
+    @staticmethod
+    def call_source(name: str, fetch: Callable[[float], Dict[str, float]], timeout: float,
+                    stamp: Optional[dict] = None, country: Optional[str] = None,
+                    hedge: bool = True) -> Dict[str, float]:
+        """fetch(timeout) through the source's breaker and hedging (see resilience).
+
+        Breaker and latencies are kept per (source, country). With
+        ``country``, concurrent calls for the same (source, country) are
+        coalesced into one upstream request (see singleflight) and each
+        caller gets its own copy of the rates. ``stamp`` (a dict) receives
+        the HttpCache "outcome" and "fetched_at" of the answer.
+        ``hedge=False`` turns off the second request on the slow tail.
+        """
+        health = RateFetcher.health.source(name, country)
+        if country is None:
+            return health.call(fetch, timeout, RateFetcher.cache, stamp, hedge)
+        
+        def upstream():
+            origin = {}
+            return health.call(fetch, timeout, RateFetcher.cache, origin, hedge), origin
+        
+        rates, origin = RateFetcher.flights.do((name, country), upstream)
+        if stamp is not None:
+            stamp.update(origin)
+        return dict(rates)
+    
+    @staticmethod
+    def _record_history(country: str, results: Dict[str, Dict[str, float]]):
+        """Append each source's rates to the history store (failures only logged)"""
+        for name, rates in results.items():
+            try:
+                RateFetcher.history.record(country, name.lower(), rates)
+            except (OSError, ValueError) as e:
+                print(f"History write error ({name}): {e}")
+
+
+class RateFetchJob:
+    """Runs RateFetcher in a background thread.
+
+    The worker never touches Tk: it only puts messages into ``self.queue``
+    which the GUI drains from ``root.after`` polling:
+    ``("progress", (source, ok))`` and finally ``("done", rates)``.
+    """
+    
+    def __init__(self, country_key: str):
+        self.country_key = country_key
+        self.queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"RateFetch-{country_key}", daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def cancel(self):
+        """Ask the worker to stop; a request already in flight is simply discarded"""
+        self.cancel_event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+    
+    def _run(self):
+        try:
+            from .adapters import get_adapter
+            rates = get_adapter(self.country_key).fetch(
+                progress=lambda source, ok: self.queue.put(("progress", (source, ok))),
+                cancel_event=self.cancel_event)
+        except Exception as e:
+            print(f"Rate fetch error: {e}")
+            rates = None
+        self.queue.put(("done", rates))
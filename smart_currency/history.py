@@ -0,0 +1,221 @@
+"""
+Append-only history of every rate the app has seen.
+
+One series per (country, source, rate), e.g. ("georgia", "nbg", "EUR") or
+("georgia", "manual", "street_rate"). Each series is two fixed-width
+column files:
+
+    <dir>/<country>/<source>/<rate>.dates     int32 day ordinals (date.toordinal())
+    <dir>/<country>/<source>/<rate>.values    float64
+
+Writes only ever append (value first, then date: a torn write leaves a
+value without a date, which load() truncates off both files). A series is loaded lazily
+into array('i') / array('d') columns; the sorted date column is the index,
+so a range query is two bisects and a slice. One value per day - a later
+write for the same day wins; compact() rewrites a series without the
+superseded entries.
+"""
+
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .storage import atomic_write
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".rate_history")
+
+# Дата, которую пользователь указал для каждого курса (settings.json / GUI)
+MANUAL_RATE_DATES = {"nbg_rate": "nbg_date", "direct_rate": "direct_date", "eur_usd": "transfer_date",
+                     "usd_gel": "transfer_date", "street_rate": "cash_date"}
+
+_DATE_ITEM = array("i").itemsize
+_VALUE_ITEM = array("d").itemsize
+
+
+def _check_name(name: str) -> str:
+    if not name or name.startswith(".") or any(c in name for c in "/\\:"):
+        raise ValueError(f"Invalid history key part: {name!r}")
+    return name
+
+
+def parse_day(text: str, default: Optional[date] = None) -> date:
+    """'DD.MM.YYYY' (the GUI date fields) -> date; ``default`` (today) if invalid"""
+    try:
+        return datetime.strptime(str(text).strip(), "%d.%m.%Y").date()
+    except ValueError:
+        return default or date.today()
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+class RateSeries:
+    """One rate's history: sorted date column (the index) + value column"""
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.dates = array("i")
+        self.values = array("d")
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _paths(self) -> Tuple[str, str]:
+        return self.base_path + ".dates", self.base_path + ".values"
+
+    def _load(self):
+        dates_path, values_path = self._paths
+        dates_raw, values_raw = _read(dates_path), _read(values_path)
+        if dates_raw is None and values_raw is None:
+            return
+        n = min(len(dates_raw or b"") // _DATE_ITEM, len(values_raw or b"") // _VALUE_ITEM)
+        dates, values = array("i"), array("d")
+        dates.frombytes(dates_raw[:n * _DATE_ITEM] if dates_raw else b"")
+        values.frombytes(values_raw[:n * _VALUE_ITEM] if values_raw else b"")
+        # Хвост недописанной записи обрезается и в файлах, иначе следующая
+        # дозапись сопоставит осиротевшее значение с новой датой
+        for path, raw, size in ((dates_path, dates_raw, n * _DATE_ITEM),
+                                (values_path, values_raw, n * _VALUE_ITEM)):
+            if raw is not None and len(raw) != size:
+                os.truncate(path, size)
+
+        if all(a < b for a, b in zip(dates, dates[1:])):
+            self.dates, self.values = dates, values
+            return
+        # Дозаписи задним числом / повтор за день: последняя запись побеждает
+        latest = dict(zip(dates, values))
+        ordered = sorted(latest)
+        self.dates = array("i", ordered)
+        self.values = array("d", (latest[d] for d in ordered))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def append(self, day: date, value: float) -> bool:
+        """Record a value; False if it repeats the value already stored for that day"""
+        ordinal = day.toordinal()
+        value = float(value)
+        with self._lock:
+            i = bisect_left(self.dates, ordinal)
+            if i < len(self.dates) and self.dates[i] == ordinal:
+                if self.values[i] == value:
+                    return False
+                self.values[i] = value
+            else:
+                self.dates.insert(i, ordinal)
+                self.values.insert(i, value)
+
+            dates_path, values_path = self._paths
+            os.makedirs(os.path.dirname(dates_path), exist_ok=True)
+            with open(values_path, "ab") as f:
+                values_size = f.tell()
+                f.write(array("d", [value]).tobytes())
+            try:
+                with open(dates_path, "ab") as f:
+                    f.write(array("i", [ordinal]).tobytes())
+            except OSError:
+                # Дата не записалась: убираем и значение, файлы остаются выровненными
+                os.truncate(values_path, values_size)
+                raise
+        return True
+
+    def range(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[array, array]:
+        """(dates, values) columns for start <= day <= end (both inclusive, open if None)"""
+        with self._lock:
+            lo = bisect_left(self.dates, start.toordinal()) if start else 0
+            hi = bisect_right(self.dates, end.toordinal()) if end else len(self.dates)
+            return self.dates[lo:hi], self.values[lo:hi]
+
+    def items(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Tuple[date, float]]:
+        dates, values = self.range(start, end)
+        return [(date.fromordinal(d), v) for d, v in zip(dates, values)]
+
+    def at(self, day: date) -> Optional[float]:
+        """Value in effect on ``day`` (latest on or before it), None if none yet"""
+        with self._lock:
+            i = bisect_right(self.dates, day.toordinal())
+            return self.values[i - 1] if i else None
+
+    def latest(self) -> Optional[Tuple[date, float]]:
+        with self._lock:
+            if not self.dates:
+                return None
+            return date.fromordinal(self.dates[-1]), self.values[-1]
+
+    def compact(self) -> int:
+        """Rewrite the files without superseded entries; returns bytes saved"""
+        dates_path, values_path = self._paths
+        with self._lock:
+            try:
+                before = os.path.getsize(dates_path) + os.path.getsize(values_path)
+            except OSError:
+                return 0
+            # Значения раньше дат: после сбоя между записями лишнее значение отбрасывается
+            atomic_write(values_path, self.values.tobytes())
+            atomic_write(dates_path, self.dates.tobytes())
+            return before - len(self.dates) * (_DATE_ITEM + _VALUE_ITEM)
+
+
+class HistoryStore:
+    """All rate series under one directory, loaded on first use"""
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        self.directory = directory
+        self._series: Dict[Tuple[str, str, str], RateSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, country: str, source: str, rate: str) -> RateSeries:
+        key = (country, source, rate)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                base = os.path.join(self.directory, *(_check_name(part) for part in key))
+                series = self._series[key] = RateSeries(base)
+            return series
+
+    def record(self, country: str, source: str, rates: Dict[str, float],
+               day: Optional[date] = None) -> int:
+        """Append every rate of one source; returns how many values were new"""
+        day = day or date.today()
+        written = 0
+        for rate, value in rates.items():
+            if value:
+                written += self.series(country, source, rate).append(day, value)
+        return written
+
+    def query(self, country: str, source: str, rate: str,
+              start: Optional[date] = None, end: Optional[date] = None) -> List[Tuple[date, float]]:
+        return self.series(country, source, rate).items(start, end)
+
+    def keys(self, country: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """(country, source, rate) of every series on disk"""
+        out = []
+        countries = [country] if country else _listdir(self.directory)
+        for c in countries:
+            for source in _listdir(os.path.join(self.directory, c)):
+                for name in _listdir(os.path.join(self.directory, c, source)):
+                    if name.endswith(".dates"):
+                        out.append((c, source, name[:-len(".dates")]))
+        return sorted(out)
+
+    def compact(self, keys: Optional[Iterable[Tuple[str, str, str]]] = None) -> int:
+        return sum(self.series(*key).compact() for key in (keys or self.keys()))
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return sorted(name for name in os.listdir(path) if not name.startswith("."))
+    except OSError:
+        return []
+
+
+# Общее хранилище процесса (RateFetcher, GUI)
+HISTORY = HistoryStore()
@@ -0,0 +1,282 @@
+"""
+Pluggable exchange-method registry.
+
+Each method declares a formula (a Python expression over ``amount`` and
+named inputs) and any inputs of its own beyond the shared ones the
+calculator already has. A country profile lists which methods it shows:
+
+    "methods": ["direct", "transfer", "cash",
+                {"key": "wise", "formula": "(amount - wise_fee_fix) * wise_rate", ...}]
+
+For every distinct method list the registry generates and compiles one
+Python function that evaluates all formulas and picks the winner inline,
+so the per-call cost is one function call regardless of how the methods
+were declared.
+"""
+
+import ast
+import keyword
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Inputs the calculator always provides (Calculator.compare keywords)
+SHARED_INPUTS = ("nbg_rate", "direct_rate", "eur_usd", "usd_gel", "street_rate",
+                 "ibt_fee", "atm_fee_pct", "atm_fee_fix")
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.IfExp, ast.Compare, ast.BoolOp,
+    ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.And, ast.Or,
+)
+_ALLOWED_CALLS = ("min", "max", "abs")
+# Степень - только числовой показатель не больше этого и без вложенных степеней
+# (9**9**9 или ((9**8)**8)**8 повесили бы приложение)
+MAX_EXPONENT = 8
+
+
+class ExchangeMethod:
+    """One way of turning EUR into local currency"""
+
+    def __init__(self, key: str, formula: str, label: str = "", name: str = "",
+                 subtitle: str = "", icon: str = "💱",
+                 inputs: Optional[Dict[str, Tuple[str, float]]] = None):
+        if not key.isidentifier():
+            raise ValueError(f"Method key must be an identifier: {key!r}")
+        self.key = key
+        self.formula = formula
+        self.icon = icon
+        self.name = name or key
+        self.label = label or f"{icon} {self.name}"
+        self.subtitle = subtitle
+        # Own inputs: name -> (field label, default value)
+        self.inputs = dict(inputs or {})
+        for name in self.inputs:
+            # "_" зарезервирован для локальных переменных сгенерированного кода
+            # Ключевые слова проходят isidentifier(), но ломают сгенерированный код
+            if (not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_")
+                    or name in _ALLOWED_CALLS + ("amount",)):
+                raise ValueError(f"Invalid input name for method {key!r}: {name!r}")
+        self.names = _validate(formula, set(SHARED_INPUTS) | set(self.inputs) | {"amount"})
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExchangeMethod":
+        """Build from a profile / settings.json entry"""
+        inputs = {k: (v[0], float(v[1])) if isinstance(v, (list, tuple)) else (k, float(v))
+                  for k, v in (data.get("inputs") or {}).items()}
+        return cls(data["key"], data["formula"], data.get("label", ""), data.get("name", ""),
+                   data.get("subtitle", ""), data.get("icon", "💱"), inputs)
+
+    def to_dict(self) -> dict:
+        return {"key": self.key, "formula": self.formula, "label": self.label, "name": self.name,
+                "subtitle": self.subtitle, "icon": self.icon,
+                "inputs": {k: list(v) for k, v in self.inputs.items()}}
+
+    def signature(self) -> tuple:
+        return (self.key, self.formula, tuple(sorted(self.inputs)))
+
+
+def _validate(formula: str, allowed_names: set) -> List[str]:
+    """Parse a formula, allowing arithmetic only; return the names it uses"""
+    try:
+        tree = ast.parse(formula, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid formula {formula!r}: {e.msg}")
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in formula {formula!r}: {type(node).__name__}")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            exponent = _constant(node.right)
+            if exponent is None or abs(exponent) > MAX_EXPONENT:
+                raise ValueError(f"Exponent must be a number up to {MAX_EXPONENT} in {formula!r}")
+            if any(isinstance(inner, ast.BinOp) and isinstance(inner.op, ast.Pow)
+                   for inner in ast.walk(node.left)):
+                raise ValueError(f"Nested powers are not allowed in {formula!r}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _ALLOWED_CALLS or node.keywords:
+                raise ValueError(f"Only {', '.join(_ALLOWED_CALLS)} calls are allowed in {formula!r}")
+        elif isinstance(node, ast.Name):
+            if node.id in _ALLOWED_CALLS:
+                continue
+            if node.id not in allowed_names:
+                raise ValueError(f"Unknown input {node.id!r} in formula {formula!r}")
+            if node.id not in names:
+                names.append(node.id)
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numeric constants are allowed in {formula!r}")
+    return names
+
+
+def _constant(node: ast.AST) -> Optional[float]:
+    """Value of a (possibly signed) numeric literal, None for anything else"""
+    sign = 1
+    while isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        sign = -sign if isinstance(node.op, ast.USub) else sign
+        node = node.operand
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool):
+        return sign * node.value
+    return None
+
+
+class CompiledMethods:
+    """A fixed list of methods compiled into one evaluation function"""
+
+    def __init__(self, methods: List[ExchangeMethod]):
+        if not methods:
+            raise ValueError("At least one method is required")
+        keys = [m.key for m in methods]
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"Duplicate method keys: {keys}")
+        self.methods = list(methods)
+        self.keys = tuple(keys)
+        self.by_key = {m.key: m for m in self.methods}
+
+        extra = []
+        for m in self.methods:
+            for name in m.inputs:
+                if name not in extra and name not in SHARED_INPUTS:
+                    extra.append(name)
+        self.extra_inputs = tuple(extra)
+        self.input_names = SHARED_INPUTS + self.extra_inputs
+        self._defaults = {}
+        for m in self.methods:
+            for name, (_, default) in m.inputs.items():
+                self._defaults.setdefault(name, default)
+        self.source = self._generate()
+        namespace = {"min": min, "max": max, "abs": abs, "_KEYS": self.keys}
+        exec(compile(self.source, f"<methods {','.join(self.keys)}>", "exec"), namespace)
+        self.evaluate = namespace["evaluate"]
+        self._compare = namespace["compare"]
+
+    def _generate(self) -> str:
+        """Source of evaluate(amount, *inputs) and compare(amount, inputs)"""
+        n = len(self.methods)
+        body = []
+        for i, m in enumerate(self.methods):
+            body.append(f"    _v{i} = {m.formula}")
+        body.append("    _best = 0")
+        body.append("    _top = _v0")
+        for i in range(1, n):
+            # Строго больше: при равенстве побеждает метод, объявленный раньше
+            body.append(f"    if _v{i} > _top:")
+            body.append(f"        _best = {i}")
+            body.append(f"        _top = _v{i}")
+
+        params = ", ".join(("amount",) + self.input_names)
+        values = ", ".join(f"_v{i}" for i in range(n))
+        lines = [f"def evaluate({params}):", "    _nbg = amount * nbg_rate"]
+        lines += body
+        lines.append(f"    return _nbg, ({values},), _best")
+        lines.append("")
+
+        # compare(): same dict as Calculator.compare, built without loops
+        lines.append("def compare(amount, _inputs):")
+        for name in SHARED_INPUTS:
+            lines.append(f"    {name} = _inputs[{name!r}]")
+        for name in self.extra_inputs:
+            lines.append(f"    {name} = _inputs.get({name!r}, {self._defaults[name]!r})")
+        lines.append("    _nbg = amount * nbg_rate")
+        lines += body
+        lines.append("    if _nbg > 0:")
+        for i in range(n):
+            lines.append(f"        _l{i} = ((_nbg - _v{i}) / _nbg) * 100")
+        lines.append("    else:")
+        lines.append(f"        {' = '.join(f'_l{i}' for i in range(n))} = 0.0")
+        items = ", ".join(f"{k!r}: {{'gel': _v{i}, 'loss': _l{i}}}" for i, k in enumerate(self.keys))
+        lines.append(f"    return {{'nbg': _nbg, {items}, 'winner': _KEYS[_best]}}")
+        return "\n".join(lines) + "\n"
+
+    def defaults(self) -> Dict[str, float]:
+        """Default values of the methods' own inputs"""
+        return dict(self._defaults)
+
+    def compare(self, amount: float, inputs: dict) -> dict:
+        """Same shape as Calculator.compare, for this method list"""
+        return self._compare(amount, inputs)
+
+
+class MethodRegistry:
+    """Known methods by key, plus a cache of compiled method lists"""
+
+    def __init__(self, methods: Iterable[ExchangeMethod] = ()):
+        self._methods: Dict[str, ExchangeMethod] = {}
+        self._compiled: Dict[tuple, CompiledMethods] = {}
+        self._lock = threading.Lock()
+        for m in methods:
+            self.register(m)
+
+    def register(self, method: ExchangeMethod):
+        with self._lock:
+            self._methods[method.key] = method
+            self._compiled.clear()
+
+    def get(self, key: str) -> ExchangeMethod:
+        try:
+            return self._methods[key]
+        except KeyError:
+            raise KeyError(f"Unknown exchange method: {key}")
+
+    def keys(self) -> List[str]:
+        return list(self._methods)
+
+    def resolve(self, entries: Iterable) -> List[ExchangeMethod]:
+        """Profile "methods" entries (keys or dicts) -> ExchangeMethod list"""
+        out = []
+        for entry in entries:
+            if isinstance(entry, ExchangeMethod):
+                out.append(entry)
+            elif isinstance(entry, dict):
+                if "formula" in entry:
+                    out.append(ExchangeMethod.from_dict(entry))
+                else:
+                    # Переопределение подписей встроенного метода
+                    base = self.get(entry["key"]).to_dict()
+                    base.update(entry)
+                    out.append(ExchangeMethod.from_dict(base))
+            else:
+                out.append(self.get(entry))
+        return out
+
+    def compile(self, entries: Iterable) -> CompiledMethods:
+        methods = self.resolve(entries)
+        signature = tuple(m.signature() + (m.label, m.name, m.subtitle, m.icon) for m in methods)
+        with self._lock:
+            compiled = self._compiled.get(signature)
+            if compiled is None:
+                compiled = CompiledMethods(methods)
+                self._compiled[signature] = compiled
+        return compiled
+
+    def for_profile(self, profile: dict) -> CompiledMethods:
+        """Compiled methods of a country profile (default: the three built-ins)"""
+        return self.compile(profile.get("methods") or DEFAULT_METHODS)
+
+
+# ============================================================================
+# Встроенные методы (формулы = Calculator.calc_*, тот же порядок операций)
+# ============================================================================
+
+BUILTIN_METHODS = (
+    ExchangeMethod("direct", "amount * direct_rate",
+                   label="💳 Прямая оплата IBT", name="Карта IBT",
+                   subtitle="Прямая оплата", icon="💳"),
+    ExchangeMethod("transfer", "amount / (1 + ibt_fee / 100) * eur_usd * usd_gel",
+                   label="📲 Перевод IBT→Credo", name="Перевод Credo",
+                   subtitle="Через приложение", icon="📲"),
+    ExchangeMethod("cash", "0.0 if amount <= atm_fee_fix else "
+                           "(amount - atm_fee_fix) / (1 + atm_fee_pct / 100) * street_rate",
+                   label="💵 Наличные (ATM+Обменник)", name="Наличные",
+                   subtitle="ATM + Обменник", icon="💵"),
+    # Пример дополнительного метода; включается через "methods" в профиле
+    ExchangeMethod("wise", "max(amount - wise_fee_fix, 0.0) / (1 + wise_fee_pct / 100) * wise_rate",
+                   label="🌐 Wise", name="Wise", subtitle="Мультивалютная карта", icon="🌐",
+                   inputs={"wise_rate": ("Курс Wise (1 EUR = ?)", 3.12),
+                           "wise_fee_pct": ("Комиссия Wise (%)", 0.45),
+                           "wise_fee_fix": ("Фикс. комиссия Wise (EUR)", 0.5)}),
+)
+
+DEFAULT_METHODS = ("direct", "transfer", "cash")
+
+REGISTRY = MethodRegistry(BUILTIN_METHODS)
@@ -0,0 +1,231 @@
+"""
+Monte Carlo risk simulation of the exchange methods under rate volatility.
+
+Saved rates carry the date they were entered (nbg_date, direct_date,
+transfer_date, cash_date in settings.json). The older a rate, the further
+the real rate may have moved, so each path draws correlated lognormal
+shocks for the four market rates the methods use:
+
+    direct_rate  <- direct_date     eur_usd, usd_gel <- transfer_date
+    street_rate  <- cash_date
+
+with volatility sigma_daily * sqrt(age in days). Fees are fixed. Results
+are accumulated per chunk (sums, win counts, fixed-bin histograms), so
+memory does not grow with the number of paths and workers merge exactly.
+Values outside the histogram range (+-8 sigma) land in the edge bins.
+"""
+
+import math
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .calculator import HAS_NUMPY, METHODS, BatchCalculator
+
+FACTORS = ("direct_rate", "eur_usd", "usd_gel", "street_rate")
+
+# Дневная волатильность (лог-доходность) - грубые оценки для GEL-пар
+DAILY_VOL = {"direct_rate": 0.004, "eur_usd": 0.004, "usd_gel": 0.003, "street_rate": 0.0045}
+
+# EUR/GEL (карта, обменник) ~ EUR/USD * USD/GEL -> сильно связаны между собой
+CORRELATION = (
+    (1.00, 0.60, 0.45, 0.85),
+    (0.60, 1.00, -0.10, 0.55),
+    (0.45, -0.10, 1.00, 0.45),
+    (0.85, 0.55, 0.45, 1.00),
+)
+
+FACTOR_DATES = {"direct_rate": "direct_date", "eur_usd": "transfer_date",
+                "usd_gel": "transfer_date", "street_rate": "cash_date"}
+
+CHUNK_PATHS = 500_000
+HIST_BINS = 4096
+HIST_SIGMAS = 8.0
+
+
+def rate_ages(dates: Dict[str, str], today: Optional[datetime] = None) -> Dict[str, float]:
+    """Age in days of each factor's rate from 'DD.MM.YYYY' dates (min 1 day).
+
+    ``dates`` is anything with .get(), e.g. the SettingsManager.
+    """
+    today = today or datetime.now()
+    ages = {}
+    for factor, key in FACTOR_DATES.items():
+        try:
+            entered = datetime.strptime(str(dates.get(key) or ""), "%d.%m.%Y")
+            days = (today - entered).days
+        except ValueError:
+            days = 0
+        ages[factor] = float(max(days, 1))
+    return ages
+
+
+def cholesky(matrix) -> List[List[float]]:
+    """Lower-triangular L with L @ L.T == matrix (small, pure Python)"""
+    n = len(matrix)
+    lower = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            s = sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                value = matrix[i][i] - s
+                if value <= 0:
+                    raise ValueError("Correlation matrix is not positive definite")
+                lower[i][j] = math.sqrt(value)
+            else:
+                lower[i][j] = (matrix[i][j] - s) / lower[j][j]
+    return lower
+
+
+class _Accumulator:
+    """Mergeable per-method statistics: sums, win counts, histograms"""
+
+    def __init__(self, lows: Dict[str, float], highs: Dict[str, float]):
+        self.lows = lows
+        self.highs = highs
+        self.paths = 0
+        self.wins = {m: 0 for m in METHODS}
+        self.sums = {m: 0.0 for m in METHODS}
+        self.sumsq = {m: 0.0 for m in METHODS}
+        self.hist = {m: [0] * HIST_BINS for m in METHODS}
+
+    def _bin(self, method: str, value: float) -> int:
+        lo, hi = self.lows[method], self.highs[method]
+        if hi <= lo:
+            return 0
+        return min(HIST_BINS - 1, max(0, int((value - lo) / (hi - lo) * HIST_BINS)))
+
+    def merge(self, other: "_Accumulator"):
+        self.paths += other.paths
+        for m in METHODS:
+            self.wins[m] += other.wins[m]
+            self.sums[m] += other.sums[m]
+            self.sumsq[m] += other.sumsq[m]
+            self.hist[m] = [a + b for a, b in zip(self.hist[m], other.hist[m])]
+
+    def quantile(self, method: str, q: float) -> float:
+        target = q * self.paths
+        lo, hi = self.lows[method], self.highs[method]
+        width = (hi - lo) / HIST_BINS
+        seen = 0
+        for i, count in enumerate(self.hist[method]):
+            if count and seen + count >= target:
+                # Линейная интерполяция внутри корзины
+                return lo + (i + (target - seen) / count) * width
+            seen += count
+        return hi
+
+    def summary(self) -> dict:
+        methods = {}
+        for m in METHODS:
+            mean = self.sums[m] / self.paths if self.paths else 0.0
+            var = max(self.sumsq[m] / self.paths - mean * mean, 0.0) if self.paths else 0.0
+            methods[m] = {
+                "mean": mean,
+                "std": math.sqrt(var),
+                "p5": self.quantile(m, 0.05),
+                "p50": self.quantile(m, 0.50),
+                "p95": self.quantile(m, 0.95),
+            }
+        return {
+            "paths": self.paths,
+            "win_prob": {m: self.wins[m] / self.paths if self.paths else 0.0 for m in METHODS},
+            "methods": methods,
+        }
+
+
+class MonteCarlo:
+    """Simulate received local currency per method for one amount.
+
+    ``inputs`` are the Calculator.compare keywords (e.g. default_inputs());
+    ``ages`` maps FACTORS to days since the rate was entered (rate_ages()).
+    """
+
+    def __init__(self, amount: float, inputs: dict, ages: Dict[str, float],
+                 vols: Optional[Dict[str, float]] = None, correlation=CORRELATION,
+                 use_numpy: Optional[bool] = None):
+        self.amount = float(amount)
+        self.inputs = {k: float(v) for k, v in inputs.items()}
+        vols = dict(DAILY_VOL, **(vols or {}))
+        self.sigmas = [vols[f] * math.sqrt(max(ages.get(f, 1.0), 0.0)) for f in FACTORS]
+        self.lower = cholesky(correlation)
+        self.use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+
+        # Границы гистограмм: +-HIST_SIGMAS от базового результата каждого метода
+        spread = math.exp(HIST_SIGMAS * math.sqrt(sum(s * s for s in self.sigmas)))
+        base = BatchCalculator(use_numpy=False).evaluate([self.amount], **self.inputs)
+        self.lows = {m: base[m][0] / spread for m in METHODS}
+        self.highs = {m: base[m][0] * spread for m in METHODS}
+
+    def run(self, paths: int = 1_000_000, seed: Optional[int] = None, workers: int = 1) -> dict:
+        """Return {"paths", "win_prob": {m: p}, "methods": {m: mean/std/p5/p50/p95}}"""
+        if workers <= 1:
+            return self._simulate(paths, seed).summary()
+
+        from concurrent.futures import ProcessPoolExecutor
+        seeds = random.Random(seed).sample(range(2 ** 32), workers)
+        shares = [paths // workers + (1 if i < paths % workers else 0) for i in range(workers)]
+        total = _Accumulator(self.lows, self.highs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(self._simulate, shares, seeds):
+                total.merge(part)
+        return total.summary()
+
+    def _simulate(self, paths: int, seed: Optional[int]) -> _Accumulator:
+        acc = _Accumulator(self.lows, self.highs)
+        if self.use_numpy:
+            import numpy as np
+            rng = np.random.default_rng(seed)
+            for start in range(0, paths, CHUNK_PATHS):
+                self._chunk_numpy(np, rng, min(CHUNK_PATHS, paths - start), acc)
+        else:
+            rng = random.Random(seed)
+            for start in range(0, paths, CHUNK_PATHS):
+                self._chunk_python(rng, min(CHUNK_PATHS, paths - start), acc)
+        return acc
+
+    def _chunk_numpy(self, np, rng, n: int, acc: _Accumulator):
+        z = rng.standard_normal((n, len(FACTORS))) @ np.asarray(self.lower).T
+        sigmas = np.asarray(self.sigmas)
+        # Лог-нормальный шок без сдвига среднего: E[rate] = текущий курс
+        shocks = np.exp(z * sigmas - 0.5 * sigmas * sigmas)
+        inputs = dict(self.inputs)
+        for k, factor in enumerate(FACTORS):
+            inputs[factor] = self.inputs[factor] * shocks[:, k]
+        cols = BatchCalculator(use_numpy=True).evaluate(np.full(n, self.amount), **inputs)
+
+        acc.paths += n
+        counts = np.bincount(cols["winner_index"], minlength=len(METHODS))
+        for i, m in enumerate(METHODS):
+            values = cols[m]
+            acc.wins[m] += int(counts[i])
+            acc.sums[m] += float(values.sum())
+            acc.sumsq[m] += float(np.dot(values, values))
+            clipped = np.clip(values, acc.lows[m], acc.highs[m])
+            hist, _ = np.histogram(clipped, bins=HIST_BINS, range=(acc.lows[m], acc.highs[m]))
+            acc.hist[m] = [a + int(b) for a, b in zip(acc.hist[m], hist)]
+
+    def _chunk_python(self, rng: random.Random, n: int, acc: _Accumulator):
+        lower, sigmas = self.lower, self.sigmas
+        drift = [-0.5 * s * s for s in sigmas]
+        base = [self.inputs[f] for f in FACTORS]
+        inputs = dict(self.inputs)
+        batch = BatchCalculator(use_numpy=False)
+        columns = {f: [] for f in FACTORS}
+        for _ in range(n):
+            z = [rng.gauss(0.0, 1.0) for _ in FACTORS]
+            for i, factor in enumerate(FACTORS):
+                corr = sum(lower[i][k] * z[k] for k in range(i + 1))
+                columns[factor].append(base[i] * math.exp(corr * sigmas[i] + drift[i]))
+        inputs.update(columns)
+        cols = batch.evaluate([self.amount] * n, **inputs)
+
+        acc.paths += n
+        for i, m in enumerate(METHODS):
+            values = cols[m]
+            acc.wins[m] += sum(1 for w in cols["winner_index"] if w == i)
+            acc.sums[m] += sum(values)
+            acc.sumsq[m] += sum(v * v for v in values)
+            hist = acc.hist[m]
+            for v in values:
+                hist[acc._bin(m, v)] += 1
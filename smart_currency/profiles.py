@@ -0,0 +1,222 @@
+"""
+Country profiles and default settings.
+"""
+
+# ==============================================================================
+# COUNTRY PROFILES
+# ==============================================================================
+
+COUNTRY_PROFILES = {
+    # ===== КАВКАЗ И ЗАКАВКАЗЬЕ =====
+    "georgia": {
+        "name": "Грузия", "flag": "🇬🇪", "city": "Батуми",
+        "local_currency": "GEL", "local_symbol": "₾", "local_name": "Лари",
+        "central_bank": "НБГ", "central_bank_full": "Центробанк Грузии",
+        "central_bank_api": "https://nbg.gov.ge/gw/api/ct/monetarypolicy/currencies",
+        "street_exchange": "Valuto/Rico",
+        "default_rates": {"nbg_rate": 3.16, "street_rate": 3.14, "direct_rate": 3.02, "eur_usd_rate": 1.08, "usd_gel_rate": 2.9}
+    },
+    "armenia": {
+        "name": "Армения", "flag": "🇦🇲", "city": "Ереван",
+        "local_currency": "AMD", "local_symbol": "֏", "local_name": "Драм",
+        "central_bank": "ЦБА", "central_bank_full": "ЦБ Армении",
+        "central_bank_api": "", "street_exchange": "Обменник",
+        "default_rates": {"nbg_rate": 430.0, "street_rate": 428.0, "direct_rate": 420.0, "eur_usd_rate": 1.08, "usd_gel_rate": 400.0}
+    },
+    "azerbaijan": {
+        "name": "Азербайджан", "flag": "🇦🇿", "city": "Баку",
+        "local_currency": "AZN", "local_symbol": "₼", "local_name": "Манат",
+        "central_bank": "ЦБА", "central_bank_full": "ЦБ Азербайджана",
+        "central_bank_api": "", "street_exchange": "Обменник",
+        "default_rates": {"nbg_rate": 1.84, "street_rate": 1.82, "direct_rate": 1.78, "eur_usd_rate": 1.08, "usd_gel_rate": 1.7}
+    },
+    
+    # ===== БАЛКАНЫ =====
+    "serbia": {
+        "name": "Сербия", "flag": "🇷🇸", "city": "Белград",
+        "local_currency": "RSD", "local_symbol": "дин", "local_name": "Динар",
+        "central_bank": "НБС", "central_bank_full": "Народный Банк Сербии",
+        "central_bank_api": "https://nbs.rs/", "street_exchange": "Menjačnica",
+        "default_rates": {"nbg_rate": 117.0, "street_rate": 116.5, "direct_rate": 115.0, "eur_usd_rate": 1.08, "usd_gel_rate": 108.0}
+    },
+    "albania": {
+        "name": "Албания", "flag": "🇦🇱", "city": "Тирана",
+        "local_currency": "ALL", "local_symbol": "L", "local_name": "Лек",
+        "central_bank": "БА", "central_bank_full": "Банк Албании",
+        "central_bank_api": "", "street_exchange": "Këmbim Valutor",
+        "default_rates": {"nbg_rate": 100.0, "street_rate": 99.0, "direct_rate": 97.0, "eur_usd_rate": 1.08, "usd_gel_rate": 93.0}
+    },
+    "north_macedonia": {
+        "name": "Сев. Македония", "flag": "🇲🇰", "city": "Скопье",
+        "local_currency": "MKD", "local_symbol": "ден", "local_name": "Денар",
+        "central_bank": "НБМ", "central_bank_full": "НБ Македонии",
+        "central_bank_api": "", "street_exchange": "Менувачница",
+        "default_rates": {"nbg_rate": 61.5, "street_rate": 61.0, "direct_rate": 60.0, "eur_usd_rate": 1.08, "usd_gel_rate": 57.0}
+    },
+    "bosnia": {
+        "name": "Босния", "flag": "🇧🇦", "city": "Сараево",
+        "local_currency": "BAM", "local_symbol": "KM", "local_name": "Марка",
+        "central_bank": "ЦББиГ", "central_bank_full": "ЦБ Боснии",
+        "central_bank_api": "", "street_exchange": "Mjenjačnica",
+        "default_rates": {"nbg_rate": 1.96, "street_rate": 1.95, "direct_rate": 1.92, "eur_usd_rate": 1.08, "usd_gel_rate": 1.81}
+    },
+    
+    # ===== ВОСТОЧНАЯ ЕВРОПА =====
+    "ukraine": {
+        "name": "Украина", "flag": "🇺🇦", "city": "Киев",
+        "local_currency": "UAH", "local_symbol": "₴", "local_name": "Гривна",
+        "central_bank": "НБУ", "central_bank_full": "НБ Украины",
+        "central_bank_api": "", "street_exchange": "Обмін валют",
+        "default_rates": {"nbg_rate": 44.0, "street_rate": 43.5, "direct_rate": 42.0, "eur_usd_rate": 1.08, "usd_gel_rate": 41.0}
+    },
+    "moldova": {
+        "name": "Молдова", "flag": "🇲🇩", "city": "Кишинёв",
+        "local_currency": "MDL", "local_symbol": "L", "local_name": "Лей",
+        "central_bank": "НБМ", "central_bank_full": "НБ Молдовы",
+        "central_bank_api": "", "street_exchange": "Schimb Valutar",
+        "default_rates": {"nbg_rate": 19.5, "street_rate": 19.3, "direct_rate": 19.0, "eur_usd_rate": 1.08, "usd_gel_rate": 18.0}
+    },
+    "belarus": {
+        "name": "Беларусь", "flag": "🇧🇾", "city": "Минск",
+        "local_currency": "BYN", "local_symbol": "Br", "local_name": "Рубль",
+        "central_bank": "НББ", "central_bank_full": "НБ Беларуси",
+        "central_bank_api": "", "street_exchange": "Обменник",
+        "default_rates": {"nbg_rate": 3.5, "street_rate": 3.45, "direct_rate": 3.4, "eur_usd_rate": 1.08, "usd_gel_rate": 3.2}
+    },
+    "russia": {
+        "name": "Россия", "flag": "🇷🇺", "city": "Москва",
+        "local_currency": "RUB", "local_symbol": "₽", "local_name": "Рубль",
+        "central_bank": "ЦБР", "central_bank_full": "ЦБ России",
+        "central_bank_api": "https://cbr.ru/", "street_exchange": "Обменник",
+        "default_rates": {"nbg_rate": 105.0, "street_rate": 103.0, "direct_rate": 100.0, "eur_usd_rate": 1.08, "usd_gel_rate": 97.0}
+    },
+    
+    # ===== ЦЕНТРАЛЬНАЯ ЕВРОПА =====
+    "poland": {
+        "name": "Польша", "flag": "🇵🇱", "city": "Варшава",
+        "local_currency": "PLN", "local_symbol": "zł", "local_name": "Злотый",
+        "central_bank": "НБП", "central_bank_full": "НБ Польши",
+        "central_bank_api": "https://nbp.pl/", "street_exchange": "Kantor",
+        "default_rates": {"nbg_rate": 4.3, "street_rate": 4.25, "direct_rate": 4.15, "eur_usd_rate": 1.08, "usd_gel_rate": 4.0}
+    },
+    "czechia": {
+        "name": "Чехия", "flag": "🇨🇿", "city": "Прага",
+        "local_currency": "CZK", "local_symbol": "Kč", "local_name": "Крона",
+        "central_bank": "ЧНБ", "central_bank_full": "ЧНБ",
+        "central_bank_api": "https://cnb.cz/", "street_exchange": "Směnárna",
+        "default_rates": {"nbg_rate": 25.3, "street_rate": 25.0, "direct_rate": 24.5, "eur_usd_rate": 1.08, "usd_gel_rate": 23.5}
+    },
+    "hungary": {
+        "name": "Венгрия", "flag": "🇭🇺", "city": "Будапешт",
+        "local_currency": "HUF", "local_symbol": "Ft", "local_name": "Форинт",
+        "central_bank": "МНБ", "central_bank_full": "НБ Венгрии",
+        "central_bank_api": "https://mnb.hu/", "street_exchange": "Pénzváltó",
+        "default_rates": {"nbg_rate": 395.0, "street_rate": 390.0, "direct_rate": 380.0, "eur_usd_rate": 1.08, "usd_gel_rate": 365.0}
+    },
+    "romania": {
+        "name": "Румыния", "flag": "🇷🇴", "city": "Бухарест",
+        "local_currency": "RON", "local_symbol": "lei", "local_name": "Лей",
+        "central_bank": "НБР", "central_bank_full": "НБ Румынии",
+        "central_bank_api": "https://bnr.ro/", "street_exchange": "Casa de Schimb",
+        "default_rates": {"nbg_rate": 4.97, "street_rate": 4.92, "direct_rate": 4.85, "eur_usd_rate": 1.08, "usd_gel_rate": 4.6}
+    },
+    "bulgaria": {
+        "name": "Болгария", "flag": "🇧🇬", "city": "София",
+        "local_currency": "BGN", "local_symbol": "лв", "local_name": "Лев",
+        "central_bank": "БНБ", "central_bank_full": "БНБ",
+        "central_bank_api": "https://bnb.bg/", "street_exchange": "Обменно бюро",
+        "default_rates": {"nbg_rate": 1.96, "street_rate": 1.94, "direct_rate": 1.90, "eur_usd_rate": 1.08, "usd_gel_rate": 1.81}
+    },
+    
+    # ===== СКАНДИНАВИЯ =====
+    "sweden": {
+        "name": "Швеция", "flag": "🇸🇪", "city": "Стокгольм",
+        "local_currency": "SEK", "local_symbol": "kr", "local_name": "Крона",
+        "central_bank": "Риксбанк", "central_bank_full": "Riksbank",
+        "central_bank_api": "https://riksbank.se/", "street_exchange": "Forex",
+        "default_rates": {"nbg_rate": 11.5, "street_rate": 11.3, "direct_rate": 11.0, "eur_usd_rate": 1.08, "usd_gel_rate": 10.6}
+    },
+    "norway": {
+        "name": "Норвегия", "flag": "🇳🇴", "city": "Осло",
+        "local_currency": "NOK", "local_symbol": "kr", "local_name": "Крона",
+        "central_bank": "Norges Bank", "central_bank_full": "Norges Bank",
+        "central_bank_api": "https://norges-bank.no/", "street_exchange": "Forex",
+        "default_rates": {"nbg_rate": 11.8, "street_rate": 11.6, "direct_rate": 11.3, "eur_usd_rate": 1.08, "usd_gel_rate": 10.9}
+    },
+    "denmark": {
+        "name": "Дания", "flag": "🇩🇰", "city": "Копенгаген",
+        "local_currency": "DKK", "local_symbol": "kr", "local_name": "Крона",
+        "central_bank": "Danmarks NB", "central_bank_full": "Danmarks Nationalbank",
+        "central_bank_api": "https://nationalbanken.dk/", "street_exchange": "Forex",
+        "default_rates": {"nbg_rate": 7.46, "street_rate": 7.4, "direct_rate": 7.3, "eur_usd_rate": 1.08, "usd_gel_rate": 6.9}
+    },
+    "iceland": {
+        "name": "Исландия", "flag": "🇮🇸", "city": "Рейкьявик",
+        "local_currency": "ISK", "local_symbol": "kr", "local_name": "Крона",
+        "central_bank": "Seðlabanki", "central_bank_full": "ЦБ Исландии",
+        "central_bank_api": "", "street_exchange": "Gjaldeyrisskipti",
+        "default_rates": {"nbg_rate": 150.0, "street_rate": 148.0, "direct_rate": 145.0, "eur_usd_rate": 1.08, "usd_gel_rate": 139.0}
+    },
+    
+    # ===== ЗАПАДНАЯ ЕВРОПА (не EUR) =====
+    "uk": {
+        "name": "Великобритания", "flag": "🇬🇧", "city": "Лондон",
+        "local_currency": "GBP", "local_symbol": "£", "local_name": "Фунт",
+        "central_bank": "BoE", "central_bank_full": "Bank of England",
+        "central_bank_api": "https://bankofengland.co.uk/", "street_exchange": "Bureau de Change",
+        "default_rates": {"nbg_rate": 0.84, "street_rate": 0.83, "direct_rate": 0.82, "eur_usd_rate": 1.08, "usd_gel_rate": 0.78}
+    },
+    "switzerland": {
+        "name": "Швейцария", "flag": "🇨🇭", "city": "Цюрих",
+        "local_currency": "CHF", "local_symbol": "Fr", "local_name": "Франк",
+        "central_bank": "SNB", "central_bank_full": "Swiss National Bank",
+        "central_bank_api": "https://snb.ch/", "street_exchange": "Wechselstube",
+        "default_rates": {"nbg_rate": 0.94, "street_rate": 0.93, "direct_rate": 0.91, "eur_usd_rate": 1.08, "usd_gel_rate": 0.87}
+    },
+    
+    # ===== ТУРЦИЯ =====
+    "turkey": {
+        "name": "Турция", "flag": "🇹🇷", "city": "Стамбул",
+        "local_currency": "TRY", "local_symbol": "₺", "local_name": "Лира",
+        "central_bank": "TCMB", "central_bank_full": "ЦБ Турции",
+        "central_bank_api": "https://tcmb.gov.tr/", "street_exchange": "Döviz Bürosu",
+        "default_rates": {"nbg_rate": 35.0, "street_rate": 34.8, "direct_rate": 34.0, "eur_usd_rate": 1.08, "usd_gel_rate": 32.5}
+    }
+}
+
+# ==============================================================================
+# DEFAULTS
+# ==============================================================================
+
+DEFAULT_SETTINGS = {
+    "country": "georgia",             # Выбранная страна
+    "nbg_rate": 3.1595,               # Курс ЦБ EUR -> Local
+    "eur_usd_rate": 1.16,             # IBT cross-rate EUR -> USD
+    "usd_gel_rate": 2.69,             # Credo USD -> Local
+    "street_rate": 3.143,             # Обменник
+    "direct_implied_rate": 3.02,      # Эффективный курс карты IBT
+    "ibt_transfer_fee": 1.5,          # Комиссия перевода IBT %
+    "atm_fee_pct": 1.5,               # Комиссия банкомата %
+    "atm_fee_fix": 1.0,               # Фикс комиссия банкомата EUR
+    "last_amount": 100.0,             # Последняя введенная сумма
+    "auto_refresh": False,            # Обновлять курсы в фоне по расписанию
+    "theme": "dark"                   # Тема: dark или light
+}
+
+
+def default_inputs(country_key: str, countries: dict = COUNTRY_PROFILES) -> dict:
+    """Calculator inputs for a country: profile default rates + default fees.
+
+    Keys match the Calculator.compare / BatchCalculator.evaluate arguments.
+    """
+    rates = countries[country_key].get("default_rates", {})
+    return {
+        "nbg_rate": rates.get("nbg_rate", 1.0),
+        "direct_rate": rates.get("direct_rate", 1.0),
+        "eur_usd": rates.get("eur_usd_rate", 1.0),
+        "usd_gel": rates.get("usd_gel_rate", 1.0),
+        "street_rate": rates.get("street_rate", 1.0),
+        "ibt_fee": DEFAULT_SETTINGS["ibt_transfer_fee"],
+        "atm_fee_pct": DEFAULT_SETTINGS["atm_fee_pct"],
+        "atm_fee_fix": DEFAULT_SETTINGS["atm_fee_fix"],
+    }
@@ -0,0 +1,117 @@
+"""
+Memoized comparisons keyed by normalized inputs.
+
+The GUI re-runs calculate() with unchanged fields (Enter pressed twice, a
+theme toggle rebuilding the UI), and service clients repeat the same
+quotes. A QuoteCache maps
+
+    (country, method keys, amount, *input values)
+
+to the compare() result (QuoteService stores its formatted response under
+its own method tag). Inputs are the floats callers already parse
+(_get_float in the GUI, _number in the service), so "3,02" and "3.02"
+give the same key; int and float, 0.0 and -0.0 compare and hash equal
+in Python, so no extra rounding is needed. The cache is bounded (least
+recently used entries are evicted first), thread-safe, and is cleared per
+country when rates are refreshed.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from .calculator import METHODS, Calculator
+
+DEFAULT_MAXSIZE = 1024
+
+
+def quote_key(country: str, amount: float, inputs: dict, methods: Iterable[str] = METHODS) -> tuple:
+    """Hashable cache key.
+
+    Names are part of the key, so two callers building ``inputs`` in a
+    different order only miss each other's entries, never collide.
+    """
+    return (country, tuple(methods), amount, tuple(inputs.items()))
+
+
+def _calculator_compare(amount: float, inputs: dict) -> dict:
+    return Calculator.compare(amount, **inputs)
+
+
+def _copy(result: dict) -> dict:
+    """Callers mutate the per-method dicts (GUI adds "name"), so hand out copies"""
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in result.items()}
+
+
+class QuoteCache:
+    """Size-bounded LRU of compare() results with hit/miss statistics"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], dict]) -> dict:
+        """Cached value for key, calling compute() on a miss.
+
+        The value is shared between callers and must not be mutated; key[0]
+        is the country that invalidate() matches on.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            self._misses += 1
+
+        # Считаем без блокировки: расчёт дешёвый, двойной расчёт безвреден
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def compare(self, country: str, amount: float, inputs: dict,
+                compare: Optional[Callable[[float, dict], dict]] = None,
+                methods: Iterable[str] = METHODS) -> dict:
+        """compare(amount, inputs) through the cache.
+
+        ``compare`` defaults to Calculator.compare; pass a CompiledMethods'
+        compare and its keys for profiles with their own method list.
+        """
+        compare = compare or _calculator_compare
+        return _copy(self.get_or_compute(quote_key(country, amount, inputs, methods),
+                                         lambda: compare(amount, inputs)))
+
+    def invalidate(self, country: Optional[str] = None) -> int:
+        """Drop all entries (or one country's); returns how many were dropped"""
+        with self._lock:
+            if country is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == country]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "evictions": self._evictions,
+                    "size": len(self._entries), "maxsize": self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Общий кэш процесса: GUI, сервис и CLI
+QUOTE_CACHE = QuoteCache()
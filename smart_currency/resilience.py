@@ -0,0 +1,317 @@
+"""
+Hedged requests and circuit breakers for rate sources.
+
+Every source fetch goes through its SourceHealth (one per source and
+country, see health_key - one country's bad answers do not switch the
+source off for the others):
+
+- circuit breaker: after FAILURE_THRESHOLD consecutive transport failures
+  (TRANSPORT_ERRORS: connection errors, HTTP errors, timeouts; a reply
+  that does not parse is counted but does not trip the breaker) the source
+  is skipped for RESET_TIMEOUT seconds (doubling up to MAX_RESET_TIMEOUT
+  while probes keep failing); then one probe request is let through. An
+  open source is answered from the HTTP cache only (stale copy, no
+  network) or fails at once with CircuitOpen instead of waiting out its
+  timeout.
+- hedging: once a source has HEDGE_MIN_SAMPLES network latencies, a
+  request still running after their HEDGE_PERCENTILE gets a second,
+  identical request; the first successful answer wins (like fetchWithRace
+  in the web front end, but only for the slow tail).
+
+The counters (calls, failures, stale copies, hedges, latency percentiles,
+breaker state) are shown by the GUI after a refresh and by the service's
+/health.
+
+``cache`` arguments are duck-typed HttpCache objects: ``offline()`` (no
+network in this thread), ``last_outcome()`` ("hits", "misses",
+"revalidated" or "stale" for this thread's last request) and
+``last_fetched_at()``.
+"""
+
+import http.client
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 30.0         # сек до первой пробы
+MAX_RESET_TIMEOUT = 600.0
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MIN_DELAY = 0.05       # сек; раньше дублировать бессмысленно
+LATENCY_WINDOW = 50
+HEDGE_WORKERS = 16
+
+_NETWORK = frozenset(("misses", "revalidated"))
+
+# Ошибки связи (HTTPError и таймауты - подклассы OSError); ошибки разбора сюда не входят
+TRANSPORT_ERRORS = (OSError, http.client.HTTPException)
+
+
+def health_key(name: str, country: Optional[str] = None) -> str:
+    """Registry key of a source as used for one country ("ECB/poland")"""
+    return name if country is None else f"{name}/{country}"
+
+
+class CircuitOpen(ConnectionError):
+    """Source skipped: its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures -> half-open probe"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 max_reset_timeout: float = MAX_RESET_TIMEOUT, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.base_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0              # подряд
+        self.reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self.opened = 0                # сколько раз размыкался
+
+    def allow(self) -> bool:
+        """May a request go out now? In half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_timeout
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # Проба не удалась: ждём вдвое дольше
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        self.opened += 1
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe (0 unless open)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="Hedge")
+        return _pool
+
+
+class SourceHealth:
+    """Breaker, recent latencies and counters of one source"""
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None,
+                 window: int = LATENCY_WINDOW):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.stale = 0                 # источник не ответил, отдана старая копия из кэша
+        self.short_circuited = 0       # запрос не отправлялся (размыкатель открыт)
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.last_error: Optional[str] = None
+        self.last_ok: Optional[float] = None   # time.time()
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile over the recent network requests (None if no data)"""
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def hedge_delay(self, timeout: float) -> Optional[float]:
+        """When to send the second request, None to not hedge.
+
+        The second request only gets what is left of ``timeout``; if that
+        is less than a typical (median) answer, hedging cannot help.
+        """
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+        delay = max(HEDGE_MIN_DELAY, self.percentile(HEDGE_PERCENTILE))
+        return delay if timeout - delay >= self.percentile(0.5) else None
+
+    # -----------------------------------------------------------------------
+    def call(self, fetch: Callable[[float], Any], timeout: float, cache=None,
+             stamp: Optional[dict] = None, hedge: bool = True) -> Any:
+        """fetch(timeout) through the breaker, hedged on the slow tail.
+
+        ``stamp`` receives the cache's "outcome" and "fetched_at" of the
+        answer; ``hedge=False`` never sends a second request (callers that
+        cap requests per host).
+        """
+        with self._lock:
+            self.calls += 1
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            if cache is not None:
+                with cache.offline():
+                    try:
+                        result = fetch(timeout)      # только копия из кэша, без сети
+                    except OSError:
+                        pass
+                    else:
+                        _stamp(stamp, _origin(cache))
+                        return result
+            raise CircuitOpen(f"{self.name}: circuit open, next probe in {self.breaker.retry_in():.0f} s")
+
+        started = time.monotonic()
+        try:
+            result, origin = self._hedged(fetch, timeout, cache, hedge)
+        except Exception as e:
+            self._failed(str(e) or type(e).__name__, isinstance(e, TRANSPORT_ERRORS))
+            raise
+        _stamp(stamp, origin)
+        outcome = origin[0]
+        if outcome == "stale":
+            with self._lock:
+                self.stale += 1
+            self._failed("unreachable, served cached copy")
+            return result
+        if outcome is None or outcome in _NETWORK:
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+        with self._lock:
+            self.last_ok = time.time()
+        self.breaker.success()
+        return result
+
+    def _failed(self, error: str, transport: bool = True):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+        if transport:
+            self.breaker.failure()
+        else:
+            # Источник ответил, но ответ не разобрался: связь в порядке
+            self.breaker.success()
+
+    def _hedged(self, fetch, timeout: float, cache,
+                hedge: bool = True) -> Tuple[Any, Tuple[Optional[str], Optional[float]]]:
+        def attempt(budget: float):
+            # Исход читается в потоке запроса: у кэша он поточно-локальный
+            return fetch(budget), _origin(cache)
+
+        delay = self.hedge_delay(timeout) if hedge else None
+        if delay is None:
+            return attempt(timeout)
+
+        started = time.monotonic()
+        pool = _hedge_pool()
+        primary = pool.submit(attempt, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedged += 1
+        # Дубль укладывается в остаток общего таймаута источника
+        deadline = started + timeout
+        backup = pool.submit(attempt, max(0.001, deadline - time.monotonic()))
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"{self.name}: no answer in {timeout:.0f} s")
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is backup:
+                    with self._lock:
+                        self.hedge_wins += 1
+                # Проигравший запрос доработает в фоне, его ответ отбрасывается
+                return result
+        raise error
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p90 = self.percentile(0.5), self.percentile(0.9)
+        with self._lock:
+            counters = {"calls": self.calls, "failures": self.failures, "stale": self.stale,
+                        "short_circuited": self.short_circuited, "hedged": self.hedged,
+                        "hedge_wins": self.hedge_wins, "last_error": self.last_error,
+                        "last_ok": self.last_ok}
+        counters.update({
+            "state": self.breaker.state,
+            "retry_in": round(self.breaker.retry_in(), 1),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p90_ms": round(p90 * 1000, 1) if p90 is not None else None,
+        })
+        return counters
+
+
+def _origin(cache) -> Tuple[Optional[str], Optional[float]]:
+    if cache is None:
+        return None, None
+    return cache.last_outcome(), cache.last_fetched_at()
+
+
+def _stamp(stamp: Optional[dict], origin: Tuple[Optional[str], Optional[float]]):
+    if stamp is not None:
+        stamp["outcome"], stamp["fetched_at"] = origin
+
+
+class HealthRegistry:
+    """SourceHealth per source (and country, see health_key), created on first use"""
+
+    def __init__(self, breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker):
+        self._breaker_factory = breaker_factory
+        self._sources: Dict[str, SourceHealth] = {}
+        self._lock = threading.Lock()
+
+    def source(self, name: str, country: Optional[str] = None) -> SourceHealth:
+        key = health_key(name, country)
+        with self._lock:
+            health = self._sources.get(key)
+            if health is None:
+                health = self._sources[key] = SourceHealth(key, self._breaker_factory())
+            return health
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            sources = dict(self._sources)
+        return {name: sources[name].snapshot() for name in sorted(sources)}
+
+
+# Общий реестр процесса: RateFetcher, адаптеры, GUI и /health сервиса
+HEALTH = HealthRegistry()
@@ -0,0 +1,184 @@
+"""
+Incremental parser for the rico.ge exchange-rate page.
+
+The page is fed in chunks (bytes as they arrive from the socket or the
+cache). A small precompiled tag scanner walks the markup (carrying a cut
+tag or number over to the next chunk) and text is tokenized outside
+<script>/<style> only once a wanted currency code shows up; a code token
+opens a quote and the next two rate-like numbers in the same row (or
+block) are its buy and sell prices. Parsing stops as soon as every wanted
+currency has a quote, so the rest of the page is never tokenized.
+
+    quotes = parse_quotes(chunks, ("EUR", "USD"))
+    quotes["EUR"].buy, quotes["EUR"].sell
+"""
+
+import codecs
+import re
+from html import unescape
+from typing import Dict, Iterable, NamedTuple, Optional
+
+_RATE = re.compile(r"^\d{1,4}[.,]\d{2,6}$")
+_TOKEN = re.compile(r"\b[A-Za-z]{3}\b|\d+(?:[.,]\d+)?")
+# После кода валюты столько текстовых токенов без чисел -> это не строка курса
+_MAX_GAP = 6
+_ROW_TAGS = frozenset(("tr", "li", "section", "article"))
+_SKIP_TAGS = frozenset(("script", "style", "noscript", "svg"))
+_SKIP_END = {tag: re.compile(r"</%s\s*>" % tag, re.IGNORECASE) for tag in _SKIP_TAGS}
+_TAIL = 16
+# Комментарий, (закрывающий) тег с атрибутами, <!DOCTYPE>, <?xml?>
+_MARKUP = re.compile(r"<!--.*?-->|<(/?)([A-Za-z][A-Za-z0-9]*)\b[^>]*>|<![^>]*>|<\?[^>]*>", re.DOTALL)
+
+
+class Quote(NamedTuple):
+    buy: float
+    sell: float
+
+
+class _Done(Exception):
+    pass
+
+
+class RicoRateParser:
+    """Collects buy/sell quotes for ``currencies``; feed_chunk() text, check .done"""
+
+    def __init__(self, currencies: Iterable[str] = ("EUR", "USD"), local: str = "GEL"):
+        self.wanted = frozenset(c.upper() for c in currencies)
+        self.local = local.upper()
+        self._codes = re.compile(r"\b(?:%s)\b" % "|".join(sorted(self.wanted)), re.IGNORECASE)
+        self.quotes: Dict[str, Quote] = {}
+        self.done = False
+        self._pending = ""       # незаконченный тег / текст на границе чанков
+        self._skip: Optional[str] = None
+        self._code: Optional[str] = None
+        self._numbers = []
+        self._gap = 0
+
+    def feed_chunk(self, text: str) -> bool:
+        """Feed decoded text; True once every wanted quote is found"""
+        if not self.done:
+            try:
+                self._scan(self._pending + text)
+            except _Done:
+                self.done = True
+        return self.done
+
+    def close(self) -> bool:
+        """End of input: flush text held back at the last chunk boundary"""
+        if not self.done and self._pending and self._skip is None:
+            try:
+                self._data(self._pending)
+            except _Done:
+                self.done = True
+        self._pending = ""
+        return self.done
+
+    def _scan(self, buf: str):
+        pos, end = 0, len(buf)
+        while pos < end:
+            if self._skip is not None:
+                closing = _SKIP_END[self._skip].search(buf, pos)
+                if closing is None:
+                    # Держим хвост: закрывающий тег может быть разрезан чанком
+                    self._pending = buf[max(pos, end - _TAIL):]
+                    return
+                pos, self._skip = closing.end(), None
+                continue
+            lt = buf.find("<", pos)
+            if lt < 0:
+                # Число или код валюты могут продолжиться в следующем чанке
+                self._pending = buf[pos:]
+                return
+            if lt > pos:
+                self._data(buf[pos:lt])
+            markup = _MARKUP.match(buf, lt)
+            if markup is None:
+                if buf.find(">", lt) < 0 or buf.startswith("<!--", lt):
+                    self._pending = buf[lt:]
+                    return
+                pos = lt + 1          # одиночный "<" в тексте
+                continue
+            pos = markup.end()
+            tag = markup.group(2)
+            if tag:
+                tag = tag.lower()
+                if tag in _ROW_TAGS:
+                    self._reset()
+                elif tag in _SKIP_TAGS and not markup.group(1):
+                    self._skip = tag
+        self._pending = ""
+
+    def _data(self, data: str):
+        if self._code is None:
+            # Быстрый путь: текст без нужных кодов валют не токенизируем
+            found = self._codes.search(data)
+            if found is None:
+                return
+            data = data[found.start():]
+        if "&" in data:
+            data = unescape(data)
+        for token in _TOKEN.findall(data):
+            upper = token.upper()
+            if upper in self.wanted:
+                self._code, self._numbers, self._gap = upper, [], 0
+            elif self._code is None:
+                continue
+            elif _RATE.match(token):
+                self._numbers.append(float(token.replace(",", ".")))
+                if len(self._numbers) == 2:
+                    self._finish()
+            else:
+                self._gap += 1
+                if self._gap > _MAX_GAP or token.isalpha() and token.isupper() and token != self.local:
+                    # Другой код валюты (кроме "EUR/GEL") или просто текст - строка закончилась
+                    self._reset()
+
+    # -------------------------------------------------------------------
+    def _finish(self):
+        buy, sell = self._numbers
+        code = self._code
+        self._reset()
+        # Обменник покупает дешевле, чем продаёт; иначе это не котировка
+        if 0 < buy <= sell and code not in self.quotes:
+            self.quotes[code] = Quote(buy, sell)
+            if self.wanted <= self.quotes.keys():
+                raise _Done
+
+    def _reset(self):
+        self._code, self._numbers, self._gap = None, [], 0
+
+
+def parse_quotes(chunks: Iterable[bytes], currencies: Iterable[str] = ("EUR", "USD"),
+                 encoding: str = "utf-8") -> Dict[str, Quote]:
+    """Buy/sell quotes from a stream of chunks (bytes or str); stops reading once complete.
+
+    A generator source is closed on the early exit (HttpCache.iter_body
+    then stops the download and caches the part read so far).
+    """
+    parser = RicoRateParser(currencies)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    try:
+        for chunk in chunks:
+            text = chunk if isinstance(chunk, str) else decoder.decode(chunk)
+            if parser.feed_chunk(text):
+                break
+        else:
+            parser.feed_chunk(decoder.decode(b"", final=True))
+            parser.close()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    return parser.quotes
+
+
+def street_rates(quotes: Dict[str, Quote]) -> Dict[str, float]:
+    """Quotes -> RateFetcher keys: the exchange buys EUR/USD from the user at ``buy``"""
+    rates = {}
+    if "EUR" in quotes:
+        rates["street_eur"] = quotes["EUR"].buy
+        rates["street_eur_sell"] = quotes["EUR"].sell
+    if "USD" in quotes:
+        rates["credo_usd"] = quotes["USD"].buy
+        rates["credo_usd_sell"] = quotes["USD"].sell
+    return rates
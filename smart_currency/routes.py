@@ -0,0 +1,220 @@
+"""
+Best conversion route over a graph of currencies and providers.
+
+Every edge converts ``x`` units of its source currency into
+
+    (x - fee_fix) / (1 + fee_pct / 100) * rate        (x > fee_fix, else unusable)
+
+- the same shape as Calculator.calc_cash; calc_direct and calc_transfer are
+the fee-free / percentage-only special cases. Parallel edges (several
+providers for one pair) are allowed.
+
+Search, for a fixed target currency:
+
+1. Bellman-Ford on log weights -log(rate / (1 + fee_pct/100)) over the
+   reversed graph gives, for every currency, the best proportional
+   multiplier B(v) to the target (and detects arbitrage cycles). Cached
+   per target until the graph changes.
+2. x * B(v) is an upper bound on what x units of v can still become, and
+   edge functions - fixed fees included - never beat their proportional
+   part, so the bound is consistent. A max-amount Dijkstra/A* ordered by
+   it applies the exact edge functions and is exact; it stops as soon as
+   the target is settled, which prunes most of a large graph.
+"""
+
+import heapq
+import math
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class RouteError(ValueError):
+    """Invalid graph (e.g. an arbitrage cycle)"""
+
+
+class Edge(NamedTuple):
+    src: str
+    dst: str
+    rate: float
+    fee_pct: float
+    fee_fix: float
+    provider: str
+
+    def convert(self, amount: float) -> float:
+        """Amount received in dst for ``amount`` of src (0.0 if fees eat it all)"""
+        if amount <= self.fee_fix:
+            return 0.0
+        return (amount - self.fee_fix) / (1 + self.fee_pct / 100) * self.rate
+
+    @property
+    def gain(self) -> float:
+        """Proportional multiplier, ignoring the fixed fee"""
+        return self.rate / (1 + self.fee_pct / 100)
+
+
+class Hop(NamedTuple):
+    edge: Edge
+    amount_in: float
+    amount_out: float
+
+
+class Route(NamedTuple):
+    amount_in: float
+    amount_out: float
+    hops: Tuple[Hop, ...]
+
+    def describe(self) -> str:
+        parts = [f"{self.amount_in:.2f} {self.hops[0].edge.src}" if self.hops else f"{self.amount_in:.2f}"]
+        for hop in self.hops:
+            via = f" [{hop.edge.provider}]" if hop.edge.provider else ""
+            parts.append(f"{hop.amount_out:.2f} {hop.edge.dst}{via}")
+        return " → ".join(parts)
+
+
+class RateGraph:
+    """Currencies as nodes, provider conversions as directed edges"""
+
+    def __init__(self):
+        self.adjacency: Dict[str, List[Edge]] = {}
+        self._potentials: Dict[str, Dict[str, float]] = {}
+        self._search: Dict[str, tuple] = {}
+
+    def add_currency(self, code: str):
+        self.adjacency.setdefault(code, [])
+
+    def add_edge(self, src: str, dst: str, rate: float, fee_pct: float = 0.0,
+                 fee_fix: float = 0.0, provider: str = "") -> Edge:
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive: {src}->{dst} {rate}")
+        edge = Edge(src, dst, float(rate), float(fee_pct), float(fee_fix), provider)
+        self.add_currency(dst)
+        self.adjacency.setdefault(src, []).append(edge)
+        self._potentials.clear()
+        self._search.clear()
+        return edge
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(edges) for edges in self.adjacency.values())
+
+    # ------------------------------------------------------------------
+    def potentials(self, dst: str) -> Dict[str, float]:
+        """Shortest -log multiplier from each currency to dst (cached).
+
+        Queue-based Bellman-Ford (SPFA) on the reversed graph; raises
+        RouteError on an arbitrage cycle, where the proportional part
+        would be unbounded.
+        """
+        cached = self._potentials.get(dst)
+        if cached is not None:
+            return cached
+
+        reverse: Dict[str, List[Tuple[str, float]]] = {}
+        for edges in self.adjacency.values():
+            for edge in edges:
+                reverse.setdefault(edge.dst, []).append((edge.src, -math.log(edge.gain)))
+
+        dist = {dst: 0.0}
+        in_queue = {dst}
+        hops = {dst: 0}   # рёбер в текущем кратчайшем пути
+        queue = deque([dst])
+        limit = len(self.adjacency)
+        while queue:
+            v = queue.popleft()
+            in_queue.discard(v)
+            dv = dist[v]
+            for u, weight in reverse.get(v, ()):
+                du = dv + weight
+                # Допуск: без него шум округления на нейтральных циклах
+                # (EUR->USD->EUR по одному курсу) выглядел бы как арбитраж
+                if u not in dist or du < dist[u] - 1e-12:
+                    dist[u] = du
+                    hops[u] = hops[v] + 1
+                    if hops[u] >= limit:
+                        raise RouteError(f"Arbitrage cycle through {u}")
+                    if u not in in_queue:
+                        in_queue.add(u)
+                        queue.append(u)
+        self._potentials[dst] = dist
+        return dist
+
+    def _search_data(self, dst: str):
+        """Per-target bounds and the adjacency restricted to currencies that reach dst"""
+        data = self._search.get(dst)
+        if data is None:
+            potential = self.potentials(dst)
+            bound = {v: math.exp(-d) for v, d in potential.items()}
+            adjacency = {
+                u: [(e.dst, e.fee_fix, 1 + e.fee_pct / 100, e.rate, e) for e in edges if e.dst in bound]
+                for u, edges in self.adjacency.items() if u in bound
+            }
+            data = self._search[dst] = (bound, adjacency)
+        return data
+
+    def best_route(self, amount: float, src: str, dst: str) -> Optional[Route]:
+        """Route that delivers the most ``dst`` for ``amount`` of ``src``; None if unreachable"""
+        if src == dst:
+            return Route(amount, amount, ())
+        bound, adjacency = self._search_data(dst)
+        if src not in bound:
+            return None
+
+        best = {src: amount}
+        came_from: Dict[str, Tuple[str, Edge]] = {}
+        heap = [(-amount * bound[src], src)]
+        settled = set()
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in settled:
+                continue   # устаревшая запись
+            if u == dst:
+                break
+            settled.add(u)
+            x = best[u]
+            for v, fee_fix, divisor, rate, edge in adjacency[u]:
+                if x <= fee_fix or v in settled:
+                    continue
+                # Тот же порядок операций, что в Edge.convert / Calculator
+                out = (x - fee_fix) / divisor * rate
+                if out > best.get(v, 0.0):
+                    best[v] = out
+                    came_from[v] = (u, edge)
+                    heapq.heappush(heap, (-out * bound[v], v))
+
+        if dst not in best:
+            return None
+        hops = []
+        node = dst
+        while node != src:
+            prev, edge = came_from[node]
+            hops.append(edge)
+            node = prev
+        hops.reverse()
+        return self._replay(amount, hops)
+
+    @staticmethod
+    def _replay(amount: float, edges: List[Edge]) -> Route:
+        out = []
+        x = amount
+        for edge in edges:
+            y = edge.convert(x)
+            out.append(Hop(edge, x, y))
+            x = y
+        return Route(amount, x, tuple(out))
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_rates(cls, inputs: dict, local: str = "GEL") -> "RateGraph":
+        """Graph of the app's three methods from Calculator.compare inputs.
+
+        EUR -> local by card, EUR -> USD -> local by IBT transfer + Credo,
+        EUR -> local by ATM + street exchange. The best route's amount equals
+        the winning method's result.
+        """
+        graph = cls()
+        graph.add_edge("EUR", local, inputs["direct_rate"], provider="direct")
+        graph.add_edge("EUR", "USD", inputs["eur_usd"], fee_pct=inputs["ibt_fee"], provider="transfer")
+        graph.add_edge("USD", local, inputs["usd_gel"], provider="transfer")
+        graph.add_edge("EUR", local, inputs["street_rate"], fee_pct=inputs["atm_fee_pct"],
+                       fee_fix=inputs["atm_fee_fix"], provider="cash")
+        return graph
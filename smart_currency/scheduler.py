@@ -0,0 +1,288 @@
+"""
+Background rate refresh on per-source cadences.
+
+A RateScheduler keeps one job per (country, source) of the countries it
+watches. Each job refreshes on its source's cadence (SOURCE_CADENCES,
+matching how often the source publishes - the central bank a few times a
+day, street rates every few minutes), stretched by up to JITTER so that
+jobs sharing a host drift apart. Cadences equal the sources' CACHE_TTLS
+and jitter only lengthens them, so a scheduled run always finds the
+cached copy expired and reaches the source (or gets a 304). A failed
+fetch is retried after RETRY_BASE seconds, doubling per failure up to the
+cadence. Fetches go through RateFetcher.call_source (single-flight, HTTP
+cache, circuit breaker, hedging), so a GUI refresh running at the same
+time shares the request.
+
+Every rate is stamped with its source and the time the source produced
+it (StampedRate). Readers get a RatesSnapshot: an immutable mapping that
+the scheduler replaces, never mutates (copy-on-write per country), so
+the GUI and the service read a consistent set of rates without locks:
+
+    scheduler = RateScheduler(["georgia"]).start()
+    snap = scheduler.snapshot()
+    snap.rates("georgia")["EUR"]        # StampedRate(value, source, fetched_at, stale)
+    snap.inputs("georgia")              # {"nbg_rate": ..., "street_rate": ...}
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .adapters import get_adapter, has_adapter
+from .fetchers import RateFetcher
+from .quotecache import QUOTE_CACHE, QuoteCache
+
+# Секунды между обновлениями источника (совпадают с CACHE_TTLS; джиттер
+# только удлиняет интервал, поэтому к сроку запуска копия в кэше уже
+# устарела и запрос по расписанию доходит до источника или получает 304)
+SOURCE_CADENCES = {"NBG": 6 * 3600, "ECB": 6 * 3600, "Frankfurter": 3600, "Rico": 10 * 60}
+DEFAULT_CADENCE = 3600
+JITTER = 0.1            # интервал * [1, 1 + 10%]
+RETRY_BASE = 30.0       # первая повторная попытка после ошибки, сек
+START_SPREAD = 2.0      # первые запросы разбросаны по стольким секундам
+
+# Ключи загруженных курсов -> входы Calculator (как _apply_fetched_rates в GUI)
+FETCHED_INPUTS = {"EUR": "nbg_rate", "street_eur": "street_rate", "credo_usd": "usd_gel",
+                  "eur_usd": "eur_usd"}
+
+
+class StampedRate(NamedTuple):
+    value: float
+    source: str
+    fetched_at: float       # time.time() ответа источника (для копии из кэша - её время)
+    stale: bool = False     # источник недоступен, значение из старого ответа
+
+
+class RatesSnapshot:
+    """Immutable country -> rate key -> StampedRate view; replaced, never mutated"""
+
+    __slots__ = ("version", "taken_at", "_rates")
+
+    def __init__(self, rates: Optional[Dict[str, Mapping[str, StampedRate]]] = None, version: int = 0):
+        self.version = version
+        self.taken_at = time.time()
+        self._rates = MappingProxyType(dict(rates or {}))
+
+    def countries(self) -> List[str]:
+        return sorted(self._rates)
+
+    def rates(self, country: str) -> Mapping[str, StampedRate]:
+        return self._rates.get(country, MappingProxyType({}))
+
+    def values(self, country: str) -> Dict[str, float]:
+        """Plain {key: value}, the shape RateFetcher.fetch_sources returns"""
+        return {key: rate.value for key, rate in self.rates(country).items()}
+
+    def inputs(self, country: str) -> Dict[str, float]:
+        """Calculator inputs covered by the fetched rates"""
+        rates = self.rates(country)
+        inputs = {FETCHED_INPUTS[key]: rate.value for key, rate in rates.items() if key in FETCHED_INPUTS}
+        if "eur_usd" not in inputs and "EUR" in rates and "USD" in rates:
+            inputs["eur_usd"] = rates["EUR"].value / rates["USD"].value
+        return inputs
+
+    def age(self, country: str, key: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since the source produced the rate (None if unknown)"""
+        rate = self.rates(country).get(key)
+        if rate is None:
+            return None
+        return (now or time.time()) - rate.fetched_at
+
+    def with_rates(self, country: str, source: str, rates: Dict[str, float],
+                   fetched_at: float, stale: bool = False) -> "RatesSnapshot":
+        """Copy with one source's rates replaced; other countries are shared, not copied"""
+        merged = dict(self._rates)
+        current = dict(merged.get(country, {}))
+        for key, value in rates.items():
+            if value:
+                current[key] = StampedRate(float(value), source, fetched_at, stale)
+        merged[country] = MappingProxyType(current)
+        return RatesSnapshot(merged, self.version + 1)
+
+    def only(self, countries: Iterable[str]) -> "RatesSnapshot":
+        """Copy without the rates of countries not in ``countries``"""
+        keep = set(countries)
+        return RatesSnapshot({country: rates for country, rates in self._rates.items() if country in keep},
+                             self.version + 1)
+
+    def to_dict(self) -> dict:
+        return {"version": self.version, "taken_at": self.taken_at,
+                "rates": {country: {key: rate._asdict() for key, rate in sorted(rates.items())}
+                          for country, rates in sorted(self._rates.items())}}
+
+
+class _Job:
+    __slots__ = ("country", "source", "cadence", "due", "running", "failures",
+                 "last_run", "last_ok", "last_error")
+
+    def __init__(self, country: str, source: str, cadence: float, due: float):
+        self.country = country
+        self.source = source
+        self.cadence = cadence
+        self.due = due
+        self.running = False
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_ok: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class RateScheduler:
+    """Refreshes the sources of ``countries`` in the background"""
+
+    def __init__(self, countries: Optional[Iterable[str]] = None, cadences: Optional[Dict[str, float]] = None,
+                 jitter: float = JITTER, retry_base: float = RETRY_BASE, max_workers: int = 4,
+                 timeouts: Optional[Dict[str, float]] = None, cache: Optional[QuoteCache] = QUOTE_CACHE,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic):
+        self.cadences = dict(SOURCE_CADENCES, **(cadences or {}))
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.max_workers = max_workers
+        self.timeouts = timeouts or {}
+        self.cache = cache
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._snapshot = RatesSnapshot()
+        self._jobs: Dict[Tuple[str, str], _Job] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stopping = False
+        self.set_countries(countries if countries is not None else [])
+
+    # -- readers --------------------------------------------------------------
+    def snapshot(self) -> RatesSnapshot:
+        """Current rates; never blocks on a refresh (plain attribute read)"""
+        return self._snapshot
+
+    def wait_for(self, version: int, timeout: Optional[float] = None) -> RatesSnapshot:
+        """Block until the snapshot is newer than ``version`` (or timeout)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._snapshot.version > version or self._stopping, timeout)
+            return self._snapshot
+
+    def status(self) -> Dict[str, dict]:
+        """Per "country/source": cadence, next run in, failures, last error"""
+        now = self._clock()
+        with self._cond:
+            return {f"{job.country}/{job.source}": {
+                "cadence": job.cadence, "next_in": round(max(0.0, job.due - now), 1),
+                "running": job.running, "failures": job.failures,
+                "last_ok": job.last_ok, "last_error": job.last_error,
+            } for job in sorted(self._jobs.values(), key=lambda j: (j.country, j.source))}
+
+    # -- control --------------------------------------------------------------
+    def set_countries(self, countries: Iterable[str]):
+        """Watch exactly these countries (jobs and rates of others are dropped, new ones run soon)"""
+        now = self._clock()
+        countries = list(countries)
+        wanted = {}
+        for country in countries:
+            if not has_adapter(country):
+                continue
+            for name in get_adapter(country).source_names:
+                wanted[(country, name)] = self.cadences.get(name, DEFAULT_CADENCE)
+        with self._cond:
+            for key in list(self._jobs):
+                if key not in wanted:
+                    del self._jobs[key]
+            for (country, name), cadence in wanted.items():
+                if (country, name) not in self._jobs:
+                    due = now + self._rng.uniform(0, START_SPREAD)
+                    self._jobs[(country, name)] = _Job(country, name, cadence, due)
+            # Курсы неотслеживаемых стран больше не обновляются - не отдаём их читателям
+            if set(self._snapshot.countries()) - set(countries):
+                self._snapshot = self._snapshot.only(countries)
+            self._cond.notify_all()
+
+    def refresh_now(self, country: Optional[str] = None):
+        """Make the jobs of ``country`` (or all) due immediately"""
+        now = self._clock()
+        with self._cond:
+            for job in self._jobs.values():
+                if country is None or job.country == country:
+                    job.due = now
+            self._cond.notify_all()
+
+    def start(self) -> "RateScheduler":
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="RateJob")
+                self._thread = threading.Thread(target=self._loop, name="RateScheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 1.0):
+        """Stop scheduling; running fetches finish in the background"""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            pool, self._pool = self._pool, None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # -- worker ---------------------------------------------------------------
+    def _loop(self):
+        with self._cond:
+            while not self._stopping:
+                now = self._clock()
+                waiting = [job for job in self._jobs.values() if not job.running]
+                for job in waiting:
+                    if job.due <= now:
+                        job.running = True
+                        self._pool.submit(self._run, job)
+                idle = [job.due for job in waiting if not job.running]
+                self._cond.wait(min(idle) - now if idle else None)
+
+    def _run(self, job: _Job):
+        stamp = {}
+        rates, error = None, None
+        try:
+            sources = {s.name: s for s in get_adapter(job.country).sources()}
+            source = sources[job.source]
+            timeout = self.timeouts.get(job.source) or RateFetcher.SOURCE_TIMEOUTS.get(
+                job.source, RateFetcher.DEFAULT_TIMEOUT)
+            rates = RateFetcher.call_source(job.source, source.fetch, timeout, stamp, job.country)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        stale = stamp.get("outcome") == "stale"
+        if rates and not stale:
+            RateFetcher._record_history(job.country, {job.source: rates})
+        if rates:
+            self._publish(job, rates, stamp.get("fetched_at") or time.time(), stale)
+
+        with self._cond:
+            now = self._clock()
+            job.running = False
+            job.last_run = time.time()
+            if error is None and rates and not stale:
+                job.failures = 0
+                job.last_ok, job.last_error = job.last_run, None
+                interval = job.cadence
+            else:
+                job.failures += 1
+                job.last_error = error or ("source unreachable, cached copy" if stale else "no rates")
+                interval = min(job.cadence, self.retry_base * 2 ** (job.failures - 1))
+            # Не раньше интервала: иначе запуск попадёт в TTL кэша и не дойдёт до источника
+            job.due = now + interval * self._rng.uniform(1, 1 + self.jitter)
+            self._cond.notify_all()
+
+    def _publish(self, job: _Job, rates: Dict[str, float], fetched_at: float, stale: bool):
+        with self._cond:
+            if (job.country, job.source) not in self._jobs:
+                return          # страну перестали отслеживать, пока шёл запрос
+            before = self._snapshot.rates(job.country)
+            changed = any(before.get(key) is None or before[key].value != float(value)
+                          for key, value in rates.items() if value)
+            # Присваивание ссылки атомарно: читатели видят старый или новый снимок целиком
+            self._snapshot = self._snapshot.with_rates(job.country, job.source, rates, fetched_at, stale)
+            self._cond.notify_all()
+        if changed and self.cache is not None:
+            self.cache.invalidate(job.country)
@@ -0,0 +1,300 @@
+"""
+Local HTTP JSON quote service over Calculator (stdlib http.server only).
+
+Endpoints:
+    GET  /health          -> {"status": "ok", "quote_cache": {hits, misses, ...},
+                              "sources": {name: {state, failures, p90_ms, hedged, ...}},
+                              "flights": {in_flight, executed, shared},
+                              "rates_version": n}  (with --live-rates)
+    GET  /countries       -> {key: {name, local_currency, ...}}
+    GET  /rates           -> scheduled rates with source and fetch time (--live-rates)
+    POST /quote           -> one comparison
+    POST /quote/batch     -> many comparisons in one request
+
+Quote request::
+
+    {"amount": 600, "country": "georgia", "rates": {"nbg_rate": 3.1566, ...}}
+
+``rates`` is optional; missing keys fall back to the latest scheduled
+rates (with --live-rates, see scheduler.RateScheduler), then to the
+country's default rates and the default fees (see profiles.default_inputs).
+A batch request is either ``{"country", "rates", "amounts": [...]}`` (vectorized through
+BatchCalculator) or ``{"items": [<quote request>, ...]}``.
+
+HTTP/1.1 keep-alive is supported; run with ``python -m smart_currency.service``.
+"""
+
+import argparse
+import json
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .calculator import METHODS, BatchCalculator, Calculator
+from .profiles import COUNTRY_PROFILES, default_inputs
+from .quotecache import QUOTE_CACHE, QuoteCache, quote_key
+from .resilience import HEALTH
+from .singleflight import FLIGHTS
+
+MAX_BODY = 16 * 1024 * 1024
+MAX_BATCH = 1_000_000
+_QUOTE_TAG = ("service",) + METHODS   # ответы сервиса не смешиваются с результатами compare()
+# Курсы должны быть > 0, комиссии в % > -100 (иначе деление на ноль), фикс. комиссия >= 0
+_RATE_INPUTS = ("nbg_rate", "direct_rate", "eur_usd", "usd_gel", "street_rate")
+_PCT_INPUTS = ("ibt_fee", "atm_fee_pct")
+
+
+class QuoteError(ValueError):
+    """Bad quote request (reported as HTTP 400)"""
+
+
+class QuoteService:
+    """Transport-independent request handling, shared by the HTTP handler"""
+
+    def __init__(self, countries: Optional[dict] = None, cache: Optional[QuoteCache] = QUOTE_CACHE,
+                 rates=None):
+        self.countries = countries if countries is not None else COUNTRY_PROFILES
+        self.batch = BatchCalculator()
+        # None отключает кэш (например, для нагрузочных тестов самого расчёта)
+        self.cache = cache
+        # RateScheduler (или что угодно с .snapshot()): живые курсы вместо значений профиля
+        self.rates = rates
+
+    def _inputs(self, payload: dict):
+        country = payload.get("country", "georgia")
+        if not isinstance(country, str):
+            raise QuoteError("'country' must be a string")
+        if country not in self.countries:
+            raise QuoteError(f"Unknown country: {country}")
+        inputs = default_inputs(country, self.countries)
+        if self.rates is not None:
+            # Один снимок на запрос: все курсы из одного согласованного набора
+            live = self.rates.snapshot().inputs(country)
+            inputs.update((key, value) for key, value in live.items() if key in inputs)
+        rates = payload.get("rates") or {}
+        if not isinstance(rates, dict):
+            raise QuoteError("'rates' must be an object")
+        for key, value in rates.items():
+            if key not in inputs:
+                raise QuoteError(f"Unknown rate: {key}")
+            inputs[key] = _number(value, key)
+        _check_inputs(inputs)
+        return country, inputs
+
+    def quote(self, payload: dict) -> dict:
+        """One comparison; with a cache the returned dict is shared, do not mutate it"""
+        country, inputs = self._inputs(payload)
+        amount = _number(payload.get("amount"), "amount")
+        if amount <= 0:
+            raise QuoteError("'amount' must be positive")
+        if self.cache is None:
+            return self._quote(country, amount, inputs)
+        # Кэшируется готовый ответ: форматирование дороже самого расчёта
+        return self.cache.get_or_compute(quote_key(country, amount, inputs, _QUOTE_TAG),
+                                         lambda: self._quote(country, amount, inputs))
+
+    def _quote(self, country: str, amount: float, inputs: dict) -> dict:
+        result = Calculator.compare(amount, **inputs)
+        return self._format(country, amount, result["nbg"],
+                            {k: (result[k]["gel"], result[k]["loss"]) for k in METHODS},
+                            result["winner"])
+
+    def quote_batch(self, payload: dict) -> dict:
+        if "items" in payload:
+            items = payload["items"]
+            if not isinstance(items, list):
+                raise QuoteError("'items' must be a list")
+            if len(items) > MAX_BATCH:
+                raise QuoteError(f"Too many 'items': at most {MAX_BATCH:,} per batch")
+            if not all(isinstance(item, dict) for item in items):
+                raise QuoteError("'items' must be quote request objects")
+            return {"results": [self.quote(item) for item in items]}
+
+        country, inputs = self._inputs(payload)
+        amounts = payload.get("amounts")
+        if not isinstance(amounts, list):
+            raise QuoteError("'amounts' must be a list")
+        if len(amounts) > MAX_BATCH:
+            raise QuoteError(f"Too many 'amounts': at most {MAX_BATCH:,} per batch")
+        amounts = [_number(a, "amounts") for a in amounts]
+        if any(a <= 0 for a in amounts):
+            raise QuoteError("'amounts' must be positive")
+
+        cols = self.batch.evaluate(amounts, **inputs)
+        results = []
+        for i, amount in enumerate(amounts):
+            results.append(self._format(
+                country, amount, float(cols["nbg"][i]),
+                {k: (float(cols[k][i]), float(cols[f"{k}_loss"][i])) for k in METHODS},
+                str(cols["winner"][i])))
+        return {"results": results}
+
+    def _format(self, country: str, amount: float, nbg: float, methods: dict, winner: str) -> dict:
+        # Infinity/NaN нельзя отдать в JSON (огромная сумма переполняет float)
+        if not math.isfinite(nbg) or not all(math.isfinite(v) for pair in methods.values() for v in pair):
+            raise QuoteError(f"Result out of range for amount {amount}")
+        profile = self.countries[country]
+        return {
+            "country": country,
+            "currency": profile["local_currency"],
+            "amount_eur": amount,
+            "nbg": nbg,
+            "methods": {
+                key: {"received": received, "loss_pct": loss, "loss_local": nbg - received}
+                for key, (received, loss) in methods.items()
+            },
+            "winner": winner,
+        }
+
+    def live_rates(self) -> dict:
+        if self.rates is None:
+            return {"version": 0, "rates": {}, "jobs": {}}
+        return dict(self.rates.snapshot().to_dict(), jobs=self.rates.status())
+
+    def countries_summary(self) -> dict:
+        return {key: {"name": p["name"], "flag": p["flag"], "local_currency": p["local_currency"],
+                      "central_bank": p["central_bank"]}
+                for key, p in self.countries.items()}
+
+
+def _check_inputs(inputs: dict):
+    for key in _RATE_INPUTS:
+        if inputs[key] <= 0:
+            raise QuoteError(f"'{key}' must be positive")
+    for key in _PCT_INPUTS:
+        if inputs[key] <= -100:
+            raise QuoteError(f"'{key}' must be greater than -100 (%)")
+    if inputs["atm_fee_fix"] < 0:
+        raise QuoteError("'atm_fee_fix' must not be negative")
+
+
+def _number(value, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise QuoteError(f"'{name}' must be a number")
+    value = float(value)
+    # json.loads принимает NaN/Infinity, а в ответе они дают невалидный JSON
+    if not math.isfinite(value):
+        raise QuoteError(f"'{name}' must be a finite number")
+    return value
+
+
+class QuoteRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server_version = "SmartCurrency/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            health = {"status": "ok"}
+            if self.server.service.cache is not None:
+                health["quote_cache"] = self.server.service.cache.stats()
+            health["sources"] = HEALTH.snapshot()
+            health["flights"] = FLIGHTS.stats()
+            if self.server.service.rates is not None:
+                health["rates_version"] = self.server.service.rates.snapshot().version
+            self._send_json(200, health)
+        elif path == "/countries":
+            self._send_json(200, self.server.service.countries_summary())
+        elif path == "/rates":
+            self._send_json(200, self.server.service.live_rates())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        routes = {"/quote": self.server.service.quote,
+                  "/quote/batch": self.server.service.quote_batch}
+        handler = routes.get(path)
+        if handler is None:
+            self._drain_body()
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            payload = self._read_json()
+            self._send_json(200, handler(payload))
+        except QuoteError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Quote service error: {e}")
+            self._send_json(500, {"error": "Internal error"})
+
+    def _drain_body(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if 0 < length <= MAX_BODY:
+            self.rfile.read(length)
+        elif length:
+            self.close_connection = True
+
+    def _read_json(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            # Тело не прочитано: поток keep-alive рассинхронизирован
+            self.close_connection = True
+            raise QuoteError("Bad Content-Length")
+        if length <= 0 or length > MAX_BODY:
+            self.close_connection = True
+            raise QuoteError("Request body required (JSON, up to 16 MB)")
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise QuoteError("Invalid JSON")
+        if not isinstance(payload, dict):
+            raise QuoteError("JSON object expected")
+        return payload
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QuoteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 8765), service: Optional[QuoteService] = None,
+                 verbose: bool = False):
+        super().__init__(address, QuoteRequestHandler)
+        self.service = service or QuoteService()
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Currency comparison JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    parser.add_argument("--live-rates", action="store_true",
+                        help="refresh rates in the background and use them as defaults")
+    args = parser.parse_args(argv)
+
+    scheduler = None
+    if args.live_rates:
+        from .adapters import ADAPTERS
+        from .scheduler import RateScheduler
+        scheduler = RateScheduler(list(ADAPTERS)).start()
+    server = QuoteServer((args.host, args.port), QuoteService(rates=scheduler), verbose=args.verbose)
+    print(f"Quote service on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if scheduler is not None:
+            scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
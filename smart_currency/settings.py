@@ -0,0 +1,139 @@
+"""
+settings.json persistence.
+"""
+
+import json
+import os
+import threading
+from typing import Optional
+
+from .profiles import COUNTRY_PROFILES, DEFAULT_SETTINGS
+from .storage import atomic_write
+
+# settings.json лежит в корне проекта, рядом с GUI-скриптом
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "settings.json")
+
+
+class SettingsManager:
+    """settings.json persistence.
+
+    ``save()`` writes immediately, ``request_save()`` coalesces bursts of
+    calls into one write after ``debounce`` seconds of quiet. Writes are
+    skipped when the content did not change and are atomic (temp file +
+    rename), so a crash mid-write cannot truncate the file.
+    """
+    
+    def __init__(self, filepath: str = SETTINGS_FILE, debounce: float = 1.0):
+        self.filepath = filepath
+        self.debounce = debounce
+        self.write_count = 0
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._last_saved: Optional[bytes] = None
+        self.settings = self.load()
+        self.countries = self._load_countries()
+    
+    def load(self) -> dict:
+        """Settings from disk over DEFAULT_SETTINGS (defaults if missing or unreadable)"""
+        try:
+            if os.path.exists(self.filepath):
+                with open(self.filepath, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                    settings = {**DEFAULT_SETTINGS, **loaded}
+                    self._last_saved = self._serialize(settings)
+                    return settings
+        except Exception as e:
+            print(f"Settings load error: {e}")
+        return DEFAULT_SETTINGS.copy()
+    
+    def _load_countries(self) -> dict:
+        """Load countries: built-in + custom from settings.json"""
+        # Start with built-in countries
+        countries = COUNTRY_PROFILES.copy()
+        
+        # Add custom countries from settings if present
+        custom = self.settings.get("custom_countries", {})
+        if custom and isinstance(custom, dict):
+            for key, profile in custom.items():
+                # Validate minimum required fields
+                required = ["name", "flag", "local_currency", "local_symbol"]
+                if all(field in profile for field in required):
+                    # Fill in defaults for missing fields
+                    defaults = {
+                        "city": profile.get("name", ""),
+                        "local_name": profile.get("local_currency", ""),
+                        "central_bank": "ЦБ",
+                        "central_bank_full": "Центробанк",
+                        "central_bank_api": "",
+                        "street_exchange": "Обменник",
+                        "default_rates": {
+                            "nbg_rate": 1.0,
+                            "street_rate": 1.0,
+                            "direct_rate": 1.0,
+                            "eur_usd_rate": 1.0,
+                            "usd_gel_rate": 1.0,
+                        }
+                    }
+                    countries[key] = {**defaults, **profile}
+        
+        return countries
+    
+    def get_countries(self) -> dict:
+        """Return all countries (built-in + custom)"""
+        return self.countries
+    
+    def add_country(self, key: str, profile: dict):
+        """Add a custom country"""
+        custom = self.settings.get("custom_countries", {})
+        custom[key] = profile
+        self.settings["custom_countries"] = custom
+        self.countries[key] = profile
+        self.save()
+    
+    @staticmethod
+    def _serialize(settings: dict) -> bytes:
+        return json.dumps(settings, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    def save(self):
+        """Write now (cancels a pending debounced write)"""
+        with self._lock:
+            self._cancel_timer()
+            self.flush()
+    
+    def request_save(self):
+        """Schedule a write; repeated calls within the debounce window coalesce"""
+        with self._lock:
+            self._cancel_timer()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self) -> bool:
+        """Write settings if they changed since the last write"""
+        with self._lock:
+            self._timer = None
+            try:
+                data = self._serialize(self.settings)
+                if data == self._last_saved:
+                    return False
+                atomic_write(self.filepath, data)
+                self._last_saved = data
+                self.write_count += 1
+                return True
+            except Exception as e:
+                print(f"Settings save error: {e}")
+                return False
+    
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def get(self, key: str, default=None):
+        """Get a setting value"""
+        return self.settings.get(key, default)
+    
+    def set(self, key: str, value):
+        """Set a setting value (in memory; save() / request_save() write it)"""
+        with self._lock:
+            self.settings[key] = value
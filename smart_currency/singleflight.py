@@ -0,0 +1,80 @@
+"""
+Request coalescing (single-flight) for upstream rate fetches.
+
+While a fetch for a key is in flight, other callers asking for the same
+key do not start their own: they wait for it and get the same result
+(or the same exception). Nothing is cached - once the call returns, the
+next caller starts a new one (caching is HttpCache's job). RateFetcher
+keys its source calls by (source, country), so the quote service, the
+scheduler and several GUI windows refreshing one country at once make a
+single request per source:
+
+    rates = FLIGHTS.do(("NBG", "georgia"), lambda: fetch(timeout))
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """At most one call in flight per key; concurrent callers share its outcome"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0      # вызовов fn (запросов к источнику)
+        self.shared = 0        # вызывающих, получивших чужой результат
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() for the first caller of ``key``; later concurrent callers wait for it"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Сначала убираем ключ, потом будим ждущих: новый вызов не получит
+            # уже завершённый результат
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
+
+
+# Общий для процесса: RateFetcher, планировщик, сервис и все окна GUI
+FLIGHTS = SingleFlight()
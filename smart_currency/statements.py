@@ -0,0 +1,341 @@
+"""
+Implied card rates from bank statement exports (CSV or OFX-like).
+
+A card payment abroad shows up in the statement as the account debit in
+EUR plus the original amount in local currency; their ratio is the rate
+the bank actually applied (what the GUI's "rate from transaction" box
+computes for a single pair). The importer streams the file once and keeps
+bounded state per day and per merchant:
+
+- exact count / sum / min / max,
+- a fixed-size uniform reservoir sample of rates, from which the median
+  and trimmed mean are taken (exact while a group has at most
+  RESERVOIR_SIZE transactions, a sample estimate above that).
+
+CSV columns are recognised by header name (see COLUMN_ALIASES); OFX
+transactions by their <STMTTRN> blocks, with the original amount taken
+from <ORIGCURRENCY><CURRATE> or from "19.00 GEL" in the memo.
+
+Refunds are skipped, not counted as spending: in OFX a debit is a
+negative TRNAMT; a CSV may sign debits either way, so its spending sign is
+the one most of its transactions carry. A CSV without a currency column
+loses its rows with equal amounts (paid in EUR, implied rate 1).
+"""
+
+import csv
+import io
+import random
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+RESERVOIR_SIZE = 128
+TRIM = 0.1          # доля отбрасываемых значений с каждой стороны
+RECENT_DAYS = 30    # окно для итогового курса (для поля "Используемый курс")
+
+COLUMN_ALIASES = {
+    "date": ("date", "transaction date", "posting date", "booking date", "value date",
+             "дата", "дата операции"),
+    "merchant": ("merchant", "description", "payee", "name", "details", "narrative",
+                 "описание", "получатель"),
+    "amount": ("amount eur", "account amount", "billing amount", "debit", "amount",
+               "сумма", "сумма в валюте счета"),
+    "original_amount": ("original amount", "transaction amount", "amount in original currency",
+                        "foreign amount", "сумма в валюте операции"),
+    "original_currency": ("original currency", "transaction currency", "currency of transaction",
+                          "валюта операции"),
+}
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%Y%m%d", "%m/%d/%Y")
+
+
+class StatementError(ValueError):
+    """Unrecognised statement layout"""
+
+
+class Transaction(NamedTuple):
+    day: date
+    merchant: str
+    amount_eur: float       # со знаком из выписки: списание или возврат
+    amount_local: float
+
+    @property
+    def rate(self) -> float:
+        return abs(self.amount_local / self.amount_eur)
+
+
+def _number(text: str) -> Optional[float]:
+    text = (text or "").strip().replace(" ", "").replace("\u00a0", "")
+    if not text:
+        return None
+    # Десятичный разделитель - тот, что стоит последним: 1,234.56 и 1.234,56
+    if text.rfind(",") > text.rfind("."):
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _day(text: str) -> Optional[date]:
+    return _parse_day((text or "").strip()[:10])
+
+
+@lru_cache(maxsize=4096)
+def _parse_day(text: str) -> Optional[date]:
+    # strptime медленный, а в выписке одни и те же даты повторяются сотни раз
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# ============================================================================
+# Parsers: text lines -> Transaction (streaming)
+# ============================================================================
+
+def _match_columns(header: List[str]) -> Dict[str, int]:
+    names = [h.strip().lower() for h in header]
+    found = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names and names.index(alias) not in found.values():
+                found[field] = names.index(alias)
+                break
+    missing = {"date", "amount", "original_amount"} - set(found)
+    if missing:
+        raise StatementError(f"Statement columns not found: {', '.join(sorted(missing))}")
+    return found
+
+
+def read_csv(lines: Iterable[str], local_currency: str = "GEL") -> Iterator[Transaction]:
+    """Card transactions in ``local_currency`` from a CSV statement"""
+    sample = []
+    lines = iter(lines)
+    for line in lines:
+        sample.append(line)
+        if len(sample) >= 2:
+            break
+    try:
+        dialect = csv.Sniffer().sniff("".join(sample), delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    rows = csv.reader(_chain(sample, lines), dialect)
+    header = next(rows, None)
+    if header is None:
+        return
+    cols = _match_columns(header)
+    currency_col = cols.get("original_currency")
+    merchant_col = cols.get("merchant")
+    local = local_currency.upper()
+    for row in rows:
+        try:
+            if currency_col is not None and row[currency_col].strip().upper() != local:
+                continue
+            day = _day(row[cols["date"]])
+            eur = _number(row[cols["amount"]])
+            original = _number(row[cols["original_amount"]])
+            merchant = row[merchant_col].strip() if merchant_col is not None else ""
+        except IndexError:
+            continue
+        if not (day and eur and original):
+            continue
+        if currency_col is None and abs(eur) == abs(original):
+            continue        # операция в EUR: курс 1 исказил бы медиану дня
+        yield Transaction(day, merchant, eur, abs(original))
+
+
+def _chain(first: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from first
+    yield from rest
+
+
+_OFX_TAG = re.compile(r"<([A-Z.]+)>([^<\r\n]*)")
+
+
+def read_ofx(lines: Iterable[str], local_currency: str = "GEL") -> Iterator[Transaction]:
+    """Card transactions from an OFX/QFX export (SGML or XML flavour)"""
+    local = local_currency.upper()
+    memo_amount = re.compile(r"(\d+(?:[.,]\d+)?)\s*" + re.escape(local), re.IGNORECASE)
+    block: Optional[List[str]] = None
+    for line in lines:
+        # Несколько тегов в одной строке или весь файл одной строкой
+        for part in re.split(r"(?=<STMTTRN>)|(?<=</STMTTRN>)", line):
+            if part.startswith("<STMTTRN>"):
+                block = []
+            if block is None:
+                continue
+            block.append(part)
+            if part.rstrip().endswith("</STMTTRN>"):
+                txn = _ofx_transaction("".join(block), local, memo_amount)
+                block = None
+                if txn:
+                    yield txn
+
+
+def _ofx_transaction(text: str, local: str, memo_amount) -> Optional[Transaction]:
+    tags = {}
+    for tag, value in _OFX_TAG.findall(text):
+        tags.setdefault(tag, value.strip())
+    day = _day(tags.get("DTPOSTED", "")[:8])   # YYYYMMDD[HHMMSS[.XXX]][TZ]
+    eur = _number(tags.get("TRNAMT", ""))
+    if not day or not eur:
+        return None
+    original = None
+    if tags.get("CURSYM", "").upper() == local:
+        rate = _number(tags.get("CURRATE", ""))
+        if rate:
+            # CURRATE: сколько валюты счёта (EUR) за единицу CURSYM
+            original = abs(eur) / rate
+    if original is None:
+        found = memo_amount.search(tags.get("MEMO", "") + " " + tags.get("NAME", ""))
+        original = _number(found.group(1)) if found else None
+    if not original:
+        return None
+    return Transaction(day, tags.get("NAME", ""), eur, original)
+
+
+# ============================================================================
+# Robust statistics with bounded memory
+# ============================================================================
+
+class RateStats:
+    """Count/sum/min/max plus a uniform reservoir sample of rates"""
+
+    __slots__ = ("count", "total", "low", "high", "sample", "_rng")
+
+    def __init__(self, rng: random.Random):
+        self.count = 0
+        self.total = 0.0
+        self.low = float("inf")
+        self.high = float("-inf")
+        self.sample: List[float] = []
+        self._rng = rng
+
+    def add(self, rate: float):
+        self.count += 1
+        self.total += rate
+        if rate < self.low:
+            self.low = rate
+        if rate > self.high:
+            self.high = rate
+        if len(self.sample) < RESERVOIR_SIZE:
+            self.sample.append(rate)
+        else:
+            # Алгоритм R: каждая ставка остаётся в выборке с вероятностью K/count
+            j = self._rng.randrange(self.count)
+            if j < RESERVOIR_SIZE:
+                self.sample[j] = rate
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def median(self) -> float:
+        return _median(sorted(self.sample))
+
+    def trimmed_mean(self, trim: float = TRIM) -> float:
+        return _trimmed_mean(sorted(self.sample), trim)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.sample)
+        return {"count": self.count, "mean": self.mean, "median": _median(ordered),
+                "trimmed_mean": _trimmed_mean(ordered, TRIM), "min": self.low, "max": self.high}
+
+
+def _median(ordered: List[float]) -> float:
+    n = len(ordered)
+    if not n:
+        return 0.0
+    mid = n // 2
+    return ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _trimmed_mean(ordered: List[float], trim: float) -> float:
+    cut = int(len(ordered) * trim)
+    kept = ordered[cut:len(ordered) - cut] or ordered
+    return sum(kept) / len(kept) if kept else 0.0
+
+
+class StatementSummary:
+    """Per-day and per-merchant implied-rate statistics of one statement"""
+
+    def __init__(self, seed: Optional[int] = 0):
+        self._rng = random.Random(seed)
+        self.by_day: Dict[date, RateStats] = {}
+        self.by_merchant: Dict[str, RateStats] = {}
+        self.transactions = 0
+        self.refunds = 0        # пропущено операций с обратным знаком
+
+    def add(self, txn: Transaction):
+        rate = txn.rate
+        stats = self.by_day.get(txn.day)
+        if stats is None:
+            stats = self.by_day[txn.day] = RateStats(self._rng)
+        stats.add(rate)
+        merchant = txn.merchant or "?"
+        stats = self.by_merchant.get(merchant)
+        if stats is None:
+            stats = self.by_merchant[merchant] = RateStats(self._rng)
+        stats.add(rate)
+        self.transactions += 1
+
+    def days(self) -> Dict[date, dict]:
+        return {day: self.by_day[day].summary() for day in sorted(self.by_day)}
+
+    def merchants(self) -> Dict[str, dict]:
+        return {name: stats.summary() for name, stats in
+                sorted(self.by_merchant.items(), key=lambda item: -item[1].count)}
+
+    def suggested_rate(self, recent_days: int = RECENT_DAYS) -> Optional[float]:
+        """Median rate over the last ``recent_days`` of the statement (for direct_rate)"""
+        if not self.by_day:
+            return None
+        last = max(self.by_day)
+        since = last - timedelta(days=recent_days - 1)
+        # Объединённые выборки дней (дни с > RESERVOIR_SIZE операций слегка недовзвешены)
+        pooled = []
+        for day, stats in self.by_day.items():
+            if day >= since:
+                pooled.extend(stats.sample)
+        return _median(sorted(pooled))
+
+    def record_history(self, store, country: str) -> int:
+        """Daily median rates -> history series (country, "statement", "direct_rate")"""
+        series = store.series(country, "statement", "direct_rate")
+        return sum(series.append(day, self.by_day[day].median) for day in sorted(self.by_day))
+
+
+def import_statement(lines: Iterable[str], fmt: Optional[str] = None, local_currency: str = "GEL",
+                     seed: Optional[int] = 0) -> StatementSummary:
+    """Stream a statement once; ``fmt`` is "csv" or "ofx" (sniffed from the first line if None)"""
+    lines = iter(lines)
+    first = next(lines, "")
+    if fmt is None:
+        head = first.lstrip("\ufeff").lstrip()
+        fmt = "ofx" if head.startswith(("OFXHEADER", "<?xml", "<OFX")) else "csv"
+    reader = read_ofx if fmt == "ofx" else read_csv
+    # Списания и возвраты копятся раздельно; знак списаний известен только в OFX
+    by_sign = {True: StatementSummary(seed), False: StatementSummary(seed)}
+    for txn in reader(_chain([first.lstrip("\ufeff")], lines), local_currency):
+        by_sign[txn.amount_eur < 0].add(txn)
+    if fmt == "ofx":
+        negative = True
+    else:
+        negative = by_sign[True].transactions >= by_sign[False].transactions
+    summary = by_sign[negative]
+    summary.refunds = by_sign[not negative].transactions
+    return summary
+
+
+def import_file(path: str, local_currency: str = "GEL") -> StatementSummary:
+    fmt = "ofx" if path.lower().endswith((".ofx", ".qfx")) else None
+    with io.open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        return import_statement(f, fmt, local_currency)
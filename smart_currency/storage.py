@@ -0,0 +1,22 @@
+"""
+File helpers shared by settings and caches.
+"""
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: bytes):
+    """Write via temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
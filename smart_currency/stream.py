@@ -0,0 +1,299 @@
+"""
+Streaming batch mode for transaction files (CSV or JSONL).
+
+Rows of (date, amount_eur, country) are read lazily, scored in fixed-size
+chunks through BatchCalculator and written out as they are produced, so
+memory stays constant no matter how large the export is. Rows that cannot
+be parsed (bad, non-positive or non-finite amount, unknown country) are
+skipped and counted.
+
+Usage:
+    python -m smart_currency.stream transactions.csv -o scored.csv [--workers 4]
+    python currency_calculator_standalone.py batch transactions.jsonl -o -
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .calculator import METHODS, BatchCalculator
+from .profiles import COUNTRY_PROFILES, default_inputs
+
+CHUNK_SIZE = 10_000
+OUTPUT_FIELDS = ("date", "amount_eur", "country", "nbg") + METHODS + ("winner",)
+INPUT_KEYS = ("nbg_rate", "direct_rate", "eur_usd", "usd_gel", "street_rate",
+              "ibt_fee", "atm_fee_pct", "atm_fee_fix")
+
+Row = Tuple[str, float, str]
+
+
+class StreamStats:
+    """Counters for one run (read / written / skipped rows)"""
+
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.skipped = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.written / self.elapsed if self.elapsed > 0 else 0.0
+
+
+# ============================================================================
+# Чтение / запись
+# ============================================================================
+
+def _detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def read_rows(lines: Iterable[str], fmt: str, default_country: str = "georgia",
+              stats: Optional[StreamStats] = None) -> Iterator[Row]:
+    """Yield (date, amount_eur, country) from CSV or JSONL lines, skipping bad rows.
+
+    ``fmt="records"`` accepts already-parsed dicts.
+    """
+    if fmt == "csv":
+        records = csv.DictReader(lines)
+    elif fmt == "jsonl":
+        records = (_json_record(line) for line in lines if line.strip())
+    else:
+        records = lines
+
+    for record in records:
+        if stats is not None:
+            stats.read += 1
+        try:
+            amount = record.get("amount_eur", record.get("amount"))
+            if isinstance(amount, bool):
+                raise TypeError("amount is a boolean")     # JSON true -> 1.0
+            amount = float(amount)
+            if not math.isfinite(amount) or amount <= 0:
+                raise ValueError(f"bad amount {amount!r}")
+            country = (record.get("country") or default_country).strip().lower()
+            if country not in COUNTRY_PROFILES:
+                raise ValueError(f"unknown country {country!r}")
+        except (TypeError, ValueError, AttributeError):
+            if stats is not None:
+                stats.skipped += 1
+            continue
+        yield (str(record.get("date") or ""), amount, country)
+
+
+def _json_record(line: str):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterator into lists of at most ``size`` items"""
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def format_rows(rows: List[tuple], fmt: str) -> str:
+    """Serialize scored rows (no CSV header)"""
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(rows)
+        return buf.getvalue()
+    return "".join(json.dumps(dict(zip(OUTPUT_FIELDS, row))) + "\n" for row in rows)
+
+
+# ============================================================================
+# Расчёт
+# ============================================================================
+
+_batch = None
+
+
+def score_chunk(chunk: List[Row], overrides: Optional[Dict[str, float]] = None) -> List[tuple]:
+    """Score rows in a single BatchCalculator call (per-row rate columns)"""
+    global _batch
+    if _batch is None:
+        _batch = BatchCalculator()
+    if not chunk:
+        return []
+
+    per_country = {}
+    for _, _, country in chunk:
+        if country not in per_country:
+            inputs = default_inputs(country)
+            inputs.update(overrides or {})
+            per_country[country] = inputs
+
+    amounts = [row[1] for row in chunk]
+    params = {key: [per_country[row[2]][key] for row in chunk] for key in INPUT_KEYS}
+    cols = _batch.evaluate(amounts, **params)
+
+    columns = [cols["nbg"]] + [cols[k] for k in METHODS]
+    if _batch.use_numpy:
+        columns = [c.tolist() for c in columns]
+        winners = cols["winner"].tolist()
+    else:
+        winners = cols["winner"]
+    return [row + values for row, values in zip(chunk, zip(*columns, winners))]
+
+
+def process_lines(lines: List[str], in_format: str, out_format: str,
+                  fieldnames: Optional[List[str]] = None, default_country: str = "georgia",
+                  overrides: Optional[Dict[str, float]] = None) -> Tuple[str, int, int]:
+    """Parse, score and serialize one chunk of raw lines.
+
+    Module-level so ProcessPoolExecutor can pickle it; the parent process
+    only moves text around. Returns (output text, rows read, rows skipped).
+    """
+    stats = StreamStats()
+    if in_format == "csv":
+        lines = csv.DictReader(lines, fieldnames=fieldnames)
+        rows = read_rows(lines, "records", default_country, stats)
+    else:
+        rows = read_rows(lines, in_format, default_country, stats)
+    scored = score_chunk(list(rows), overrides)
+    return format_rows(scored, out_format), stats.read, stats.skipped
+
+
+def run_batch(source, dest, in_format: str = "csv", out_format: str = "csv", workers: int = 1,
+              chunk_size: int = CHUNK_SIZE, default_country: str = "georgia",
+              overrides: Optional[Dict[str, float]] = None, progress=None) -> StreamStats:
+    """Stream ``source`` (text file object) into ``dest``; returns StreamStats.
+
+    The input is cut into chunks of ``chunk_size`` lines, so CSV fields must
+    not contain embedded newlines. With ``workers > 1`` chunks go to a
+    process pool; at most ``2 * workers`` chunks are in flight, so the
+    reader never runs ahead of the writer and memory stays bounded.
+    """
+    stats = StreamStats()
+    fieldnames = None
+    if in_format == "csv":
+        fieldnames = next(csv.reader([source.readline()]), None)
+        if not fieldnames:
+            return stats
+    if out_format == "csv":
+        dest.write(",".join(OUTPUT_FIELDS) + "\n")
+
+    jobs = ((chunk, in_format, out_format, fieldnames, default_country, overrides)
+            for chunk in chunked(source, chunk_size))
+
+    def consume(result):
+        text, read, skipped = result
+        dest.write(text)
+        stats.read += read
+        stats.skipped += skipped
+        stats.written += read - skipped
+        if progress:
+            progress(stats)
+
+    if workers <= 1:
+        for job in jobs:
+            consume(process_lines(*job))
+        return stats
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(process_lines, *job))
+            if len(pending) >= 2 * workers:
+                consume(pending.popleft().result())
+        while pending:
+            consume(pending.popleft().result())
+    return stats
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _parse_override(text: str) -> Tuple[str, float]:
+    key, sep, value = text.partition("=")
+    if not sep or key not in INPUT_KEYS:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE with KEY in {', '.join(INPUT_KEYS)}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value!r}")
+    if not math.isfinite(number):
+        raise argparse.ArgumentTypeError(f"not a finite number: {value!r}")
+    return key, number
+
+
+def _open_text(path: str, mode: str):
+    # utf-8-sig при чтении: BOM (Excel) иначе попадёт в имя первой колонки CSV
+    encoding = "utf-8-sig" if mode == "r" else "utf-8"
+    if path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding=encoding, newline="")
+        return stream
+    return open(path, mode, encoding=encoding, newline="")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="batch", description="Score a CSV/JSONL of (date, amount_eur, country) transactions")
+    parser.add_argument("input", help="CSV or JSONL file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--output-format", choices=("csv", "jsonl"))
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread chunks across")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--country", default="georgia", help="for rows without a country column")
+    parser.add_argument("--rate", action="append", type=_parse_override, default=[],
+                        metavar="KEY=VALUE", help="override a rate/fee for every row")
+    args = parser.parse_args(argv)
+
+    if args.country not in COUNTRY_PROFILES:
+        parser.error(f"unknown country: {args.country}")
+    in_format = _detect_format(args.input, args.input_format)
+    out_format = _detect_format(args.output, args.output_format)
+
+    last_report = [time.perf_counter()]
+
+    def report(stats):
+        now = time.perf_counter()
+        if now - last_report[0] >= 2.0:
+            last_report[0] = now
+            print(f"  {stats.written:,} rows, {stats.rows_per_sec:,.0f} rows/s", file=sys.stderr)
+
+    source = _open_text(args.input, "r")
+    dest = _open_text(args.output, "w")
+    try:
+        stats = run_batch(source, dest, in_format, out_format, max(1, args.workers),
+                          max(1, args.chunk_size), args.country, dict(args.rate), report)
+    finally:
+        if args.input != "-":
+            source.close()
+        if args.output != "-":
+            dest.close()
+        else:
+            dest.flush()
+
+    print(f"{stats.written:,} rows in {stats.elapsed:.2f}s ({stats.rows_per_sec:,.0f} rows/s), "
+          f"{stats.skipped:,} skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Parameter sweeps: which method wins over a Cartesian grid of inputs.
+
+    grid = SweepGrid(600, {"street_rate": linspace(3.0, 3.3, 301),
+                           "atm_fee_fix": linspace(0, 10, 101)},
+                     base=default_inputs("georgia"))
+    result = grid.run(derivatives=True)
+    result.winner          # int8 grid, indexes into METHODS
+    result.derivatives     # {"street_rate": float32 grid, ...}
+
+The grid is evaluated in chunks of flat cells through BatchCalculator, so
+only the int8 winner grid (and the optional float32 derivative grids) are
+kept for the whole sweep. ``iter_chunks`` streams results without keeping
+anything.
+"""
+
+from array import array
+from itertools import islice, product
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .calculator import HAS_NUMPY, METHODS, BatchCalculator
+
+SWEEP_PARAMS = ("amount", "nbg_rate", "direct_rate", "eur_usd", "usd_gel", "street_rate",
+                "ibt_fee", "atm_fee_pct", "atm_fee_fix")
+CHUNK_CELLS = 250_000
+
+
+def linspace(start: float, stop: float, num: int) -> List[float]:
+    """``num`` evenly spaced values from start to stop inclusive"""
+    if num <= 1:
+        return [float(start)]
+    step = (stop - start) / (num - 1)
+    return [start + i * step for i in range(num)]
+
+
+class SweepResult:
+    """Winner grid (+ optional partial derivatives) of a finished sweep"""
+
+    def __init__(self, params, axes, winner, derivatives, wins):
+        self.params = params
+        self.axes = axes
+        self.shape = tuple(len(a) for a in axes)
+        self.winner = winner
+        self.derivatives = derivatives
+        self.wins = wins
+
+    def winner_at(self, *indexes: int) -> str:
+        """Winning method name at grid position (i, j, ...)"""
+        if HAS_NUMPY and hasattr(self.winner, "shape"):
+            return METHODS[int(self.winner[indexes])]
+        flat = 0
+        for index, size in zip(indexes, self.shape):
+            flat = flat * size + index
+        return METHODS[self.winner[flat]]
+
+
+def method_partials(param: str, amount, inputs: dict) -> tuple:
+    """Analytic d(received)/d(param) for (direct, transfer, cash).
+
+    Works on floats and NumPy arrays alike. The cash value is only valid
+    above atm_fee_fix (below it cash is 0 and so is its derivative). The
+    received amounts do not depend on nbg_rate.
+    """
+    p = inputs
+    transfer_net = amount / (1 + p["ibt_fee"] / 100)
+    cash_net = (amount - p["atm_fee_fix"]) / (1 + p["atm_fee_pct"] / 100)
+    cash_slope = p["street_rate"] / (1 + p["atm_fee_pct"] / 100)
+    if param == "amount":
+        return p["direct_rate"], p["eur_usd"] * p["usd_gel"] / (1 + p["ibt_fee"] / 100), cash_slope
+    if param == "direct_rate":
+        return amount, 0.0, 0.0
+    if param == "eur_usd":
+        return 0.0, transfer_net * p["usd_gel"], 0.0
+    if param == "usd_gel":
+        return 0.0, transfer_net * p["eur_usd"], 0.0
+    if param == "ibt_fee":
+        return 0.0, -transfer_net * p["eur_usd"] * p["usd_gel"] / (100 + p["ibt_fee"]), 0.0
+    if param == "street_rate":
+        return 0.0, 0.0, cash_net
+    if param == "atm_fee_pct":
+        return 0.0, 0.0, -cash_net * p["street_rate"] / (100 + p["atm_fee_pct"])
+    if param == "atm_fee_fix":
+        return 0.0, 0.0, -cash_slope
+    return 0.0, 0.0, 0.0
+
+
+class SweepGrid:
+    """Cartesian grid over any subset of the calculate() inputs.
+
+    ``ranges`` maps parameter name -> sequence of values; every other
+    parameter is taken from ``base`` (e.g. profiles.default_inputs()).
+    ``amount`` can be swept as well.
+    """
+
+    def __init__(self, amount: float, ranges: Dict[str, Sequence[float]], base: dict,
+                 use_numpy: Optional[bool] = None):
+        unknown = set(ranges) - set(SWEEP_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+        self.params = [p for p in SWEEP_PARAMS if p in ranges]
+        self.axes = [[float(v) for v in ranges[p]] for p in self.params]
+        if any(not axis for axis in self.axes):
+            raise ValueError("Sweep ranges must not be empty")
+        self.amount = float(amount)
+        self.fixed = {p: float(base[p]) for p in SWEEP_PARAMS[1:] if p not in ranges}
+        self.batch = BatchCalculator(use_numpy)
+        self.shape = tuple(len(a) for a in self.axes)
+        self.size = 1
+        for n in self.shape:
+            self.size *= n
+
+    def _columns(self, start: int, stop: int, cells: Iterator[tuple]) -> Dict[str, Sequence[float]]:
+        """Per-cell values of the swept parameters (and amount) for flat cells [start, stop).
+
+        ``cells`` is the shared product() iterator of the pure-Python path.
+        """
+        n = stop - start
+        if self.batch.use_numpy:
+            import numpy as np
+            index = np.unravel_index(np.arange(start, stop), self.shape)
+            columns = {p: np.asarray(axis)[i] for p, axis, i in zip(self.params, self.axes, index)}
+            columns.setdefault("amount", np.full(n, self.amount))
+        else:
+            cells = list(islice(cells, n))
+            columns = {p: [cell[k] for cell in cells] for k, p in enumerate(self.params)}
+            columns.setdefault("amount", [self.amount] * n)
+        return columns
+
+    def iter_chunks(self, chunk_cells: int = CHUNK_CELLS,
+                    derivatives: bool = False) -> Iterator[dict]:
+        """Yield {"start", "stop", "winner", "received"[, "d_<param>"]} per chunk.
+
+        ``winner`` indexes into METHODS, ``received`` is the winning
+        method's amount and ``d_<param>`` its partial derivative w.r.t.
+        each swept parameter.
+        """
+        cells = product(*self.axes)
+        for start in range(0, self.size, chunk_cells):
+            stop = min(start + chunk_cells, self.size)
+            columns = self._columns(start, stop, cells)
+            amounts = columns.pop("amount")
+            inputs = dict(self.fixed, **columns)
+            cols = self.batch.evaluate(amounts, **inputs)
+            winners = cols["winner_index"]
+
+            chunk = {"start": start, "stop": stop, "winner": winners}
+            if self.batch.use_numpy:
+                chunk["received"] = self._pick(winners, [cols[k] for k in METHODS])
+            else:
+                chunk["received"] = [cols[METHODS[w]][i] for i, w in enumerate(winners)]
+            if derivatives:
+                for param, column in self._winner_partials(amounts, inputs, winners).items():
+                    chunk[f"d_{param}"] = column
+            yield chunk
+
+    @staticmethod
+    def _pick(winners, per_method):
+        """Select per_method[winner[i]][i] for every cell (NumPy)"""
+        import numpy as np
+        stacked = np.stack([np.broadcast_to(np.asarray(m, dtype=np.float64), winners.shape)
+                            for m in per_method])
+        return np.take_along_axis(stacked, winners[None, :], axis=0)[0]
+
+    def _winner_partials(self, amounts, inputs: dict, winners) -> Dict[str, Sequence[float]]:
+        """d(received of the winning method)/d(param) per cell, for every swept param"""
+        cash = METHODS.index("cash")
+        if self.batch.use_numpy:
+            import numpy as np
+            a = np.asarray(amounts, dtype=np.float64)
+            v = {k: np.asarray(val, dtype=np.float64) for k, val in inputs.items()}
+            alive = a > v["atm_fee_fix"]
+            out = {}
+            for param in self.params:
+                partials = list(method_partials(param, a, v))
+                partials[cash] = np.where(alive, partials[cash], 0.0)
+                out[param] = self._pick(winners, partials)
+            return out
+
+        out = {param: [] for param in self.params}
+        swept = [k for k, val in inputs.items() if isinstance(val, list)]
+        cell = dict(inputs)
+        for i, w in enumerate(winners):
+            for k in swept:
+                cell[k] = inputs[k][i]
+            dead = w == cash and amounts[i] <= cell["atm_fee_fix"]
+            for param in self.params:
+                out[param].append(0.0 if dead else method_partials(param, amounts[i], cell)[w])
+        return out
+
+    def run(self, derivatives: bool = False, chunk_cells: int = CHUNK_CELLS) -> SweepResult:
+        """Evaluate the whole grid; memory is the int8 winner grid (+ float32 partials)"""
+        use_numpy = self.batch.use_numpy
+        if use_numpy:
+            import numpy as np
+            winner = np.empty(self.size, dtype=np.int8)
+            partials = {p: np.empty(self.size, dtype=np.float32) for p in self.params} if derivatives else {}
+        else:
+            winner = array("b", bytes(self.size))
+            partials = {p: array("f", bytes(4 * self.size)) for p in self.params} if derivatives else {}
+
+        for chunk in self.iter_chunks(chunk_cells, derivatives):
+            start, stop = chunk["start"], chunk["stop"]
+            if use_numpy:
+                winner[start:stop] = chunk["winner"]
+                for p in partials:
+                    partials[p][start:stop] = chunk[f"d_{p}"]
+            else:
+                winner[start:stop] = array("b", chunk["winner"])
+                for p in partials:
+                    partials[p][start:stop] = array("f", chunk[f"d_{p}"])
+
+        if use_numpy:
+            counts = np.bincount(winner, minlength=len(METHODS))
+            wins = {m: int(counts[i]) for i, m in enumerate(METHODS)}
+            winner = winner.reshape(self.shape)
+            partials = {p: grid.reshape(self.shape) for p, grid in partials.items()}
+        else:
+            wins = {m: winner.count(i) for i, m in enumerate(METHODS)}
+        return SweepResult(self.params, self.axes, winner, partials, wins)